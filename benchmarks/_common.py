@@ -0,0 +1,153 @@
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time as T
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+RESULTS_PATH = os.environ.get("SHIELDX_BENCH_RESULTS", "benchmarks/results")
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile of `samples` (q in [0, 100])."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def time_case(fn: Callable[[], object], repeat: int, min_time: float) -> Tuple[float, int]:
+    """Returns the best ns/op over `repeat` runs, each at least `min_time` seconds long."""
+    loops = 1
+    while True:
+        t0 = T.perf_counter_ns()
+        for _ in range(loops):
+            fn()
+        if (T.perf_counter_ns() - t0) / 1e9 >= min_time:
+            break
+        loops *= 2
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = T.perf_counter_ns()
+        for _ in range(loops):
+            fn()
+        best = min(best, (T.perf_counter_ns() - t0) / loops)
+    return best, loops
+
+
+class Probe:
+    """
+    Accumulates wall-clock latency, CPU time and RSS growth of a measured section.
+
+    RSS growth is sampled around each `with probe:` section, outside the timed window, so
+    probes whose sections interleave (the pipeline stages) each report only their own
+    growth. Probes fed with `record()` report the growth between creation and `summary()`.
+
+    Usage:
+        probe = Probe("insert")
+        with probe:
+            await repository.insert_one(event)
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.cpu = 0.0
+        self.rss_start = rss_bytes()
+        self.rss_end = self.rss_start
+        self.rss_growth = 0
+        self.sections = 0
+        self._rss0 = 0
+        self._t0 = 0.0
+        self._cpu0 = 0.0
+
+    def __enter__(self):
+        self._rss0 = rss_bytes()
+        self._cpu0 = T.process_time()
+        self._t0 = T.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.latencies.append(T.perf_counter() - self._t0)
+        self.cpu += T.process_time() - self._cpu0
+        self.rss_growth += rss_bytes() - self._rss0
+        self.sections += 1
+        return False
+
+    def record(self, latency: float):
+        self.latencies.append(latency)
+
+    def summary(self, wall: Optional[float] = None) -> Dict[str, float]:
+        """
+        Args:
+            wall: Elapsed seconds of the whole run; defaults to the sum of the latencies
+                (right for sequential sections, too high for concurrent ones).
+        """
+        self.rss_end = rss_bytes()
+        count = len(self.latencies)
+        elapsed = wall if wall is not None else sum(self.latencies)
+        growth = self.rss_growth if self.sections else self.rss_end - self.rss_start
+        return {
+            "count": count,
+            "seconds": elapsed,
+            "events_per_sec": count / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(self.latencies, 50) * 1e3,
+            "p99_ms": percentile(self.latencies, 99) * 1e3,
+            "mean_ms": (sum(self.latencies) / count * 1e3) if count else 0.0,
+            "cpu_seconds": self.cpu,
+            "cpu_us_per_event": (self.cpu / count * 1e6) if count else 0.0,
+            "rss_mb_growth": growth / 2**20,
+            "rss_mb_end": self.rss_end / 2**20,
+        }
+
+
+def write_results(suite: str, params: dict, results: dict, output: Optional[str] = None) -> str:
+    """Writes a machine-readable result file and returns its path."""
+    commit = git_commit()
+    document = {
+        "suite": suite,
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    if output is None:
+        os.makedirs(RESULTS_PATH, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_PATH, f"{suite}-{commit or 'nogit'}-{stamp}.json")
+    with open(output, "w") as f:
+        json.dump(document, f, indent=2)
+    return output
+
+
+def print_table(results: Dict[str, Dict[str, float]], columns: List[str]):
+    """Prints one row per result and one column per metric."""
+    width = max([len(name) for name in results] + [8])
+    print(f"{'':<{width}} " + " ".join(f"{c:>16}" for c in columns))
+    for name, row in results.items():
+        print(f"{name:<{width}} " + " ".join(f"{row.get(c, 0.0):>16.3f}" for c in columns))
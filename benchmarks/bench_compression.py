@@ -0,0 +1,119 @@
+"""
+Storage savings vs CPU cost of event payload compression.
+
+For several payload shapes, compresses a fixed corpus with each codec/level (and with a
+dictionary trained on other payloads of the same shape) and reports the stored/raw ratio,
+the bytes saved per event and the compress/decompress cost per payload. Costs include the
+JSON (de)serialization the repository does around the codec. No MongoDB needed.
+
+Usage:
+    python -m benchmarks.bench_compression [--filter zstd] [--events 200] [--repeat 5]
+"""
+import argparse
+import json
+import random
+from typing import Callable, Dict, List
+
+from benchmarks._common import print_table, time_case, write_results
+from shieldx.compression import ZLIB, ZSTD, PayloadCodec, train_dictionary, zstandard
+
+COLUMNS = ["raw_bytes", "stored_bytes", "ratio", "saved_bytes", "compress_us", "decompress_us", "compress_mb_s"]
+
+CODECS = [(ZLIB, 1), (ZLIB, 6), (ZSTD, 1), (ZSTD, 3), (ZSTD, 9)]
+
+
+def storage_event(i: int, rng: random.Random) -> dict:
+    """Small object-store event (~500 B): where dictionaries matter most."""
+    return {
+        "bucket_id": "shieldx-bucket",
+        "key": f"object-{i}-{rng.randrange(10**6)}",
+        "replication_factor": rng.choice([1, 2, 3]),
+        "chunks": [{"index": n, "size": rng.randrange(1 << 20), "node": f"peer-{rng.randrange(8)}"} for n in range(4)],
+        "status": rng.choice(["ok", "retry", "degraded"]),
+    }
+
+
+def metrics_event(i: int, rng: random.Random) -> dict:
+    """Medium metrics snapshot (~8 KB) with repeated keys."""
+    return {
+        "host": f"node-{rng.randrange(16)}",
+        "samples": [
+            {"metric": name, "value": round(rng.random() * 100, 3), "unit": "ms", "labels": {"region": "mx-1", "tier": "edge"}}
+            for name in ("latency", "cpu", "memory", "disk", "net_in", "net_out") for _ in range(12)
+        ],
+    }
+
+
+def matrix_event(i: int, rng: random.Random) -> dict:
+    """Large numeric payload (~64 KB): little repetition, tests the codec on entropy."""
+    return {"rows": 64, "cols": 64, "data": [[round(rng.gauss(0, 1), 4) for _ in range(64)] for _ in range(64)]}
+
+
+SHAPES = {"storage": storage_event, "metrics": metrics_event, "matrix": matrix_event}
+
+
+def corpus(shape: Callable[[int, random.Random], dict], n: int, seed: int) -> List[dict]:
+    rng = random.Random(seed)
+    return [shape(i, rng) for i in range(n)]
+
+
+def measure(codec: PayloadCodec, payloads: List[dict], event_type: str, repeat: int, min_time: float) -> Dict[str, float]:
+    compressed = [codec.compress(p, event_type) for p in payloads]
+    raw = sum(len(json.dumps(p, separators=(",", ":"))) for p in payloads)
+    # Payloads that do not shrink are stored as they are
+    stored = sum(len(c["data"]) if c else len(json.dumps(p, separators=(",", ":"))) for c, p in zip(compressed, payloads))
+    kept = [c for c in compressed if c]
+    compress_ns, _ = time_case(lambda: [codec.compress(p, event_type) for p in payloads], repeat, min_time)
+    decompress_ns, _ = time_case(lambda: [codec.decompress(c) for c in kept], repeat, min_time) if kept else (0.0, 0)
+    n = len(payloads)
+    return {
+        "raw_bytes": raw / n,
+        "stored_bytes": stored / n,
+        "ratio": stored / raw,
+        "saved_bytes": (raw - stored) / n,
+        "compress_us": compress_ns / n / 1e3,
+        "decompress_us": decompress_ns / max(len(kept), 1) / 1e3,
+        "compress_mb_s": raw / (compress_ns / 1e9) / 2**20,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ShieldX payload compression benchmark")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--events", type=int, default=200, help="Payloads per shape")
+    parser.add_argument("--dict-size", type=int, default=16 * 1024, help="Trained dictionary size in bytes")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (best is kept)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timed run")
+    parser.add_argument("--output", default=None, help="Result file (defaults to benchmarks/results/)")
+    args = parser.parse_args()
+
+    if zstandard is None:
+        print("zstandard is not installed: zstd cases fall back to zlib")
+
+    results: Dict[str, Dict[str, float]] = {}
+    for shape_name, shape in SHAPES.items():
+        payloads = corpus(shape, args.events, seed=1)
+        # Dictionaries are trained on a disjoint sample, as they would be on past events
+        samples = [json.dumps(p, separators=(",", ":")).encode() for p in corpus(shape, max(args.events, 200), seed=2)]
+        for codec_name, level in CODECS:
+            variants = [("", None)]
+            if level == (3 if codec_name == ZSTD else 6):
+                effective = ZLIB if codec_name == ZSTD and zstandard is None else codec_name
+                variants.append((".dict", train_dictionary(samples, effective, args.dict_size)))
+            for suffix, dictionary in variants:
+                name = f"{shape_name}.{codec_name}-{level}{suffix}"
+                if args.filter not in name:
+                    continue
+                codec = PayloadCodec(codec=codec_name, level=level, threshold=1, dictionary_path="")
+                if dictionary is not None:
+                    codec.add_dictionary(shape_name, codec.codec, dictionary)
+                results[name] = measure(codec, payloads, shape_name, args.repeat, args.min_time)
+
+    print_table(results, COLUMNS)
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    path = write_results("compression", params, results, args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == "__main__":
+    main()
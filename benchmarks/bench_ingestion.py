@@ -0,0 +1,196 @@
+"""
+End-to-end ingestion benchmark.
+
+Drives the ShieldX ingestion pipeline in-process against the MongoDB configured by
+MONGODB_URI / MONGO_DATABASE_NAME (point it at a scratch database):
+
+- rest-single: one POST /events at a time through the ASGI app.
+- rest-batch:  POST /events in concurrent bursts of --batch-size requests.
+- broker:      publish_event -> InMemoryTransport shard queues -> consumer -> Mongo.
+- stages:      per-stage breakdown of the pipeline (decode, validate, type lookup, insert, log).
+
+rss_mb_growth is the resident memory each case (or, for stages, each stage's own sections)
+added; rss_mb_end in the result file is the whole-process RSS when the case finished.
+
+Usage:
+    python -m benchmarks.bench_ingestion --events 2000 --payload-bytes 1024 --event-types 20
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/head.json
+"""
+import argparse
+import asyncio
+import json
+import time as T
+import uuid
+from typing import Dict, List
+
+from benchmarks._common import Probe, print_table, write_results
+from shieldx.broker import AsyncRabbitMQService, InMemoryTransport
+from shieldx.db import connect_to_mongo, close_mongo_connection, get_database
+from shieldx.db.indexes import create_indexes
+from shieldx.log.logger_config import get_logger
+from shieldx.models import EventModel
+from shieldx.repositories import EventsRepository, EventTypeRepository
+from shieldx.services import EventsService
+from shieldx import config
+
+MODES = ["rest-single", "rest-batch", "broker", "stages"]
+STAGES = ["decode", "validate", "type_lookup", "insert", "log"]
+COLUMNS = ["count", "events_per_sec", "p50_ms", "p99_ms", "cpu_us_per_event", "rss_mb_growth"]
+
+
+def make_payload(size: int) -> dict:
+    """Builds a JSON payload of roughly `size` bytes spread over several fields."""
+    fields = max(1, size // 64)
+    chunk = max(1, size // fields - 12)
+    return {f"field_{i}": "x" * chunk for i in range(fields)}
+
+
+def make_bodies(args, run_id: str) -> List[bytes]:
+    payload = make_payload(args.payload_bytes)
+    return [
+        json.dumps({
+            "service_id": f"bench-{run_id}-svc-{i % args.services}",
+            "microservice_id": f"micro-{i % 7}",
+            "function_id": f"func-{i % 11}",
+            "event_type": f"BenchType-{i % args.event_types}",
+            "payload": payload,
+        }).encode()
+        for i in range(args.events)
+    ]
+
+
+async def ensure_event_types(count: int):
+    collection = get_database()["event_types"]
+    for k in range(count):
+        await collection.update_one({"event_type": f"BenchType-{k}"}, {"$setOnInsert": {"event_type": f"BenchType-{k}"}}, upsert=True)
+
+
+async def run_rest(bodies: List[bytes], batch_size: int, name: str) -> Dict[str, float]:
+    # Imported here so the broker and stage modes run without the HTTP stack
+    from httpx import AsyncClient, ASGITransport
+    from shieldx.server import app
+
+    probe = Probe(name)
+    url = f"{config.SHIELDX_API_PREFIX}/events"
+    headers = {"content-type": "application/json"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        async def post(body: bytes):
+            t0 = T.perf_counter()
+            response = await client.post(url, content=body, headers=headers)
+            probe.record(T.perf_counter() - t0)
+            if response.status_code != 201:
+                raise RuntimeError(f"POST /events returned {response.status_code}: {response.text}")
+
+        cpu0, t0 = T.process_time(), T.perf_counter()
+        for i in range(0, len(bodies), batch_size):
+            await asyncio.gather(*(post(body) for body in bodies[i:i + batch_size]))
+        wall = T.perf_counter() - t0
+        probe.cpu = T.process_time() - cpu0
+    return probe.summary(wall)
+
+
+class TimedEventsService:
+    """Wraps EventsService and records publish-to-stored latency carried in the payload."""
+
+    def __init__(self, inner: EventsService, probe: Probe):
+        self.inner = inner
+        self.probe = probe
+
+    async def create_event(self, event: EventModel):
+        created = await self.inner.create_event(event)
+        self.probe.record(T.perf_counter() - event.payload["_bench_t0"])
+        return created
+
+
+async def run_broker(bodies: List[bytes], shards: int) -> Dict[str, float]:
+    db = get_database()
+    probe = Probe("broker")
+    transport = InMemoryTransport()
+    events_service = TimedEventsService(EventsService(EventsRepository(db), EventTypeRepository(db)), probe)
+    publisher = AsyncRabbitMQService(shard_count=shards, transport=transport, publisher=True)
+    consumer = AsyncRabbitMQService(shards=list(range(shards)), shard_count=shards, transport=transport, events_service=events_service)
+    await publisher.connect()
+
+    cpu0, t0 = T.process_time(), T.perf_counter()
+    task = asyncio.create_task(consumer.start_consuming())
+    for body in bodies:
+        event = EventModel.model_validate_json(body)
+        event.payload = {**event.payload, "_bench_t0": T.perf_counter()}
+        await publisher.publish_event(event)
+    await transport.join()
+    wall = T.perf_counter() - t0
+    probe.cpu = T.process_time() - cpu0
+    await consumer.close()
+    await task
+    return probe.summary(wall)
+
+
+async def run_stages(bodies: List[bytes]) -> Dict[str, Dict[str, float]]:
+    db = get_database()
+    event_type_repo = EventTypeRepository(db)
+    events_repo = EventsRepository(db)
+    logger = get_logger("shieldx.bench")
+    probes = {stage: Probe(stage) for stage in STAGES}
+    for body in bodies:
+        with probes["decode"]:
+            data = json.loads(body)
+        with probes["validate"]:
+            event = EventModel.model_validate(data)
+        with probes["type_lookup"]:
+            await event_type_repo.get_by_name(event.event_type)
+        with probes["insert"]:
+            event_id = await events_repo.insert_one(event)
+        with probes["log"]:
+            logger.info({"event": "EVENT.CREATED", "event_id": event_id, "time": 0.0})
+    return {f"stage.{stage}": probe.summary() for stage, probe in probes.items()}
+
+
+async def main(args):
+    run_id = uuid.uuid4().hex[:8]
+    await connect_to_mongo()
+    await create_indexes()
+    await ensure_event_types(args.event_types)
+    bodies = make_bodies(args, run_id)
+
+    results: Dict[str, Dict[str, float]] = {}
+    try:
+        for mode in args.modes:
+            if mode == "rest-single":
+                results[mode] = await run_rest(bodies, 1, mode)
+            elif mode == "rest-batch":
+                results[mode] = await run_rest(bodies, args.batch_size, mode)
+            elif mode == "broker":
+                results[mode] = await run_broker(bodies, args.shards)
+            elif mode == "stages":
+                results.update(await run_stages(bodies))
+    finally:
+        if not args.keep:
+            await get_database()["events"].delete_many({"service_id": {"$regex": f"^bench-{run_id}-"}})
+        await close_mongo_connection()
+
+    print_table(results, COLUMNS)
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    path = write_results("ingestion", params, results, args.output)
+    print(f"\nResults written to {path}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ShieldX end-to-end ingestion benchmark")
+    parser.add_argument("--events", type=int, default=1000, help="Events ingested per mode")
+    parser.add_argument("--payload-bytes", type=int, default=256, help="Approximate JSON size of each payload")
+    parser.add_argument("--event-types", type=int, default=10, help="Distinct event types used by the events")
+    parser.add_argument("--services", type=int, default=50, help="Distinct service_id values")
+    parser.add_argument("--batch-size", type=int, default=50, help="Concurrent requests per burst in rest-batch")
+    parser.add_argument("--shards", type=int, default=4, help="Shard queues used by the broker mode")
+    parser.add_argument("--modes", type=lambda s: s.split(","), default=MODES, help=f"Comma separated subset of {MODES}")
+    parser.add_argument("--output", default=None, help="Result file (defaults to benchmarks/results/)")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark events in MongoDB")
+    args = parser.parse_args()
+    unknown = set(args.modes) - set(MODES)
+    if unknown:
+        parser.error(f"Unknown modes: {sorted(unknown)}")
+    return args
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
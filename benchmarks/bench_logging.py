@@ -0,0 +1,89 @@
+"""
+Micro-benchmarks of the logging hot path.
+
+Measures the caller-side cost of one log call when the level is suppressed (eager dict
+vs lazy callable) and when it is emitted, plus the formatting cost of the compact and
+pretty JSON formats and their output size. Emitted records go to an in-memory sink, so
+no file or console I/O is timed.
+
+Usage:
+    python -m benchmarks.bench_logging [--filter emitted.] [--repeat 5]
+"""
+import argparse
+import logging
+import time as T
+from typing import Callable, Dict
+
+from benchmarks._common import print_table, time_case, write_results
+from shieldx.log import AsyncLogPipeline, AsyncQueueHandler, JsonFormatter, Log
+
+COLUMNS = ["ns_per_op", "ops_per_sec", "bytes_per_op"]
+
+
+class NullSink(logging.Handler):
+    """Formats each record and discards the result."""
+
+    def emit(self, record):
+        self.format(record)
+
+
+def make_logger(name: str, level: int, handler: logging.Handler) -> Log:
+    logger = Log(name=name, level=level, disabled=True)
+    logger.addHandler(handler)
+    return logger
+
+
+def build_cases(pipeline: AsyncLogPipeline) -> Dict[str, Callable[[], object]]:
+    cases: Dict[str, Callable[[], object]] = {}
+    t1 = T.time()
+    sync_sink = NullSink()
+    sync_sink.setFormatter(JsonFormatter(compact=True))
+    suppressed = make_logger("bench.suppressed", logging.INFO, sync_sink)
+    emitted = make_logger("bench.emitted", logging.DEBUG, sync_sink)
+    queued = make_logger("bench.queued", logging.DEBUG, AsyncQueueHandler([logging.NullHandler()], pipeline=pipeline))
+
+    cases["suppressed.eager"] = lambda: suppressed.debug({"event": "BENCH.RECORD", "count": 10, "time": T.time() - t1})
+    cases["suppressed.lazy"] = lambda: suppressed.debug(lambda: {"event": "BENCH.RECORD", "count": 10, "time": T.time() - t1})
+    cases["emitted.sync_compact"] = lambda: emitted.debug(lambda: {"event": "BENCH.RECORD", "count": 10, "time": T.time() - t1})
+    cases["emitted.async_enqueue"] = lambda: queued.debug(lambda: {"event": "BENCH.RECORD", "count": 10, "time": T.time() - t1})
+
+    record = logging.LogRecord("bench", logging.INFO, __file__, 0, {"event": "BENCH.RECORD", "count": 10, "time": 0.001}, None, None)
+    for mode, formatter in [("compact", JsonFormatter(compact=True)), ("pretty", JsonFormatter(compact=False))]:
+        cases[f"format.{mode}"] = lambda f=formatter: f.format(record)
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ShieldX logging micro-benchmarks")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (best is kept)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timed run")
+    parser.add_argument("--output", default=None, help="Result file (defaults to benchmarks/results/)")
+    args = parser.parse_args()
+
+    # Large queue so the async case measures enqueueing, not the drop policy
+    pipeline = AsyncLogPipeline(maxsize=1_000_000, policy="block")
+    results: Dict[str, Dict[str, float]] = {}
+    for name, fn in build_cases(pipeline).items():
+        if args.filter not in name:
+            continue
+        ns_per_op, loops = time_case(fn, args.repeat, args.min_time)
+        output = fn()
+        results[name] = {
+            "ns_per_op": ns_per_op,
+            "ops_per_sec": 1e9 / ns_per_op,
+            # Formatted size for the format cases; 0 for log calls, which return None
+            "bytes_per_op": len(output.encode()) if isinstance(output, str) else 0,
+            "loops": loops,
+        }
+    pipeline.stop()
+
+    print_table(results, COLUMNS)
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    params["dropped"] = pipeline.stats()["dropped"]
+    path = write_results("logging", params, results, args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Micro-benchmarks of the model layer hot paths.
+
+Times construction, validation, `model_dump(by_alias=True, exclude_none=True)` and the
+DTO round-trips done by the controllers for EventModel, RuleModel, TriggerModel and
+EventTypeModel over several payload shapes. Reports ns/op plus allocated bytes per op
+(tracemalloc): `bytes_per_op` is what each result keeps alive, `peak_bytes_per_op`
+includes the temporaries created while building it.
+
+Usage:
+    python -m benchmarks.bench_models [--filter event.] [--repeat 5]
+"""
+import argparse
+import gc
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks._common import print_table, time_case, write_results
+from shieldx.models import EventModel, EventTypeModel, RuleModel, TriggerModel
+
+COLUMNS = ["ns_per_op", "ops_per_sec", "bytes_per_op", "peak_bytes_per_op"]
+
+PAYLOADS = {
+    "empty": None,
+    "flat": {f"key_{i}": f"value_{i}" for i in range(8)},
+    "nested": {"level_1": {"level_2": {"level_3": {"items": list(range(16)), "tags": ["a", "b", "c"]}}}},
+    "1kb": {f"field_{i}": "x" * 48 for i in range(16)},
+    "64kb": {f"field_{i}": "x" * 1000 for i in range(64)},
+}
+
+RULES = {
+    "known_target": {
+        "target": "mictlanx.put",
+        "parameters": {
+            name: {"type": "string", "description": f"{name} parameter"}
+            for name in ["bucket_id", "key", "source_path", "replication_factor", "num_chunks"]
+        },
+    },
+    "free_target": {
+        "target": "custom.module.handler",
+        "parameters": {f"param_{i}": {"type": "int", "description": "numeric parameter"} for i in range(10)},
+    },
+}
+
+
+def event_document(payload) -> dict:
+    return {
+        "service_id": "service-a",
+        "microservice_id": "micro-a",
+        "function_id": "func-a",
+        "event_type": "EncryptStart",
+        "timestamp": datetime.now(timezone.utc),
+        "payload": payload,
+    }
+
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    cases: Dict[str, Callable[[], object]] = {}
+    for shape, payload in PAYLOADS.items():
+        document = event_document(payload)
+        stored = {**document, "_id": "66200e847a824ad0dbb622e1"}
+        event = EventModel(**document)
+        cases[f"event.{shape}.construct"] = lambda d=document: EventModel(**d)
+        cases[f"event.{shape}.validate"] = lambda d=stored: EventModel.model_validate(d)
+        cases[f"event.{shape}.validate_json"] = lambda j=event.model_dump_json(): EventModel.model_validate_json(j)
+        cases[f"event.{shape}.dump"] = lambda e=event: e.model_dump(by_alias=True, exclude_none=True)
+
+    for shape, document in RULES.items():
+        rule = RuleModel.model_validate(document)
+        cases[f"rule.{shape}.validate"] = lambda d=document: RuleModel.model_validate(d)
+        cases[f"rule.{shape}.dump"] = lambda r=rule: r.model_dump(by_alias=True, exclude_none=True)
+
+    trigger = TriggerModel(name="on-encrypt")
+    event_type = EventTypeModel(event_type="EncryptStart")
+    cases["trigger.validate"] = lambda: TriggerModel.model_validate({"_id": "66200e847a824ad0dbb622e1", "name": "on-encrypt"})
+    cases["trigger.dump"] = lambda: trigger.model_dump(by_alias=True, exclude_none=True)
+    cases["event_type.validate"] = lambda: EventTypeModel.model_validate({"_id": "661f8d933e3a2eac62cce7ad", "event_type": "EncryptStart"})
+    cases["event_type.dump"] = lambda: event_type.model_dump(by_alias=True, exclude_none=True)
+    cases.update(build_dto_cases())
+    return cases
+
+
+def build_dto_cases() -> Dict[str, Callable[[], object]]:
+    """Controller conversions; skipped when shieldx-core is not installed."""
+    try:
+        import shieldx_core.dtos as DTOS
+    except ImportError:
+        print("shieldx-core is not installed: skipping DTO round-trips")
+        return {}
+    cases: Dict[str, Callable[[], object]] = {}
+    for shape, payload in PAYLOADS.items():
+        event = EventModel(**{**event_document(payload), "_id": "66200e847a824ad0dbb622e1"})
+        # GET /events validates the model directly; GET /events/{id} goes through model_dump first
+        cases[f"dto.event.{shape}.from_model"] = lambda e=event: DTOS.EventResponseDTO.model_validate(e)
+        cases[f"dto.event.{shape}.from_dump"] = lambda e=event: DTOS.EventResponseDTO.model_validate(e.model_dump(by_alias=True))
+    for shape, document in RULES.items():
+        rule = RuleModel.model_validate({**document, "_id": "662019dd2d132a9aa4fbe27b"})
+        cases[f"dto.rule.{shape}.from_dump"] = lambda r=rule: DTOS.RuleResponseDTO.model_validate(r.model_dump(by_alias=True))
+    trigger = TriggerModel.model_validate({"_id": "66200e847a824ad0dbb622e1", "name": "on-encrypt"})
+    cases["dto.trigger.from_dump"] = lambda: DTOS.TriggerResponseDTO.model_validate(trigger.model_dump(by_alias=True))
+    return cases
+
+
+def measure_allocations(fn: Callable[[], object], ops: int = 200) -> Tuple[float, float]:
+    """Returns (retained bytes per op, peak bytes per op) while keeping `ops` results alive."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    results: List[object] = [fn() for _ in range(ops)]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return (current - before) / ops, (peak - before) / ops
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ShieldX model-layer micro-benchmarks")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case (best is kept)")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per timed run")
+    parser.add_argument("--output", default=None, help="Result file (defaults to benchmarks/results/)")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name, fn in build_cases().items():
+        if args.filter not in name:
+            continue
+        ns_per_op, loops = time_case(fn, args.repeat, args.min_time)
+        bytes_per_op, peak_bytes_per_op = measure_allocations(fn)
+        results[name] = {
+            "ns_per_op": ns_per_op,
+            "ops_per_sec": 1e9 / ns_per_op,
+            "bytes_per_op": bytes_per_op,
+            "peak_bytes_per_op": peak_bytes_per_op,
+            "loops": loops,
+        }
+
+    print_table(results, COLUMNS)
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    path = write_results("models", params, results, args.output)
+    print(f"\nResults written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compares two benchmark result files and flags regressions.
+
+Usage:
+    python -m benchmarks.compare BASE.json HEAD.json [--threshold 0.10]
+
+Exits with status 1 when any metric regresses by more than the threshold.
+"""
+import argparse
+import json
+import sys
+
+# Metrics where a higher value is better; every other compared metric is "lower is better"
+HIGHER_IS_BETTER = {"events_per_sec", "ops_per_sec", "ratio"}
+COMPARED = ["events_per_sec", "p50_ms", "p99_ms", "cpu_us_per_event", "ns_per_op", "bytes_per_op", "ratio"]
+
+
+def compare(base: dict, head: dict, threshold: float):
+    rows, regressions = [], []
+    for name, head_row in head["results"].items():
+        base_row = base["results"].get(name)
+        if base_row is None:
+            continue
+        for metric in COMPARED:
+            if metric not in head_row or metric not in base_row or not base_row[metric]:
+                continue
+            change = (head_row[metric] - base_row[metric]) / base_row[metric]
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            rows.append((name, metric, base_row[metric], head_row[metric], change))
+            if worse > threshold:
+                regressions.append((name, metric, change))
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two ShieldX benchmark result files")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change tolerated before flagging")
+    args = parser.parse_args()
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    if base.get("suite") != head.get("suite"):
+        parser.error(f"Suites differ: {base.get('suite')} vs {head.get('suite')}")
+
+    rows, regressions = compare(base, head, args.threshold)
+    print(f"{base.get('commit')} -> {head.get('commit')} ({head.get('suite')})")
+    for name, metric, before, after, change in rows:
+        print(f"{name:<32} {metric:<18} {before:>14.3f} {after:>14.3f} {change:>+9.1%}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}:")
+        for name, metric, change in regressions:
+            print(f"  {name} {metric} {change:+.1%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from shieldx import config
+from shieldx.log.logger_config import get_logger
+
+L = get_logger(__name__)
+
+# Llaves válidas: digest SHA-256 en hexadecimal
+BLOB_KEY = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobNotFound(Exception):
+    """
+    El objeto no existe en el almacén.
+    """
+
+
+def is_blob_key(key) -> bool:
+    return isinstance(key, str) and BLOB_KEY.match(key) is not None
+
+
+class BlobStore(ABC):
+    """
+    Almacén de objetos para los payloads que no conviene guardar dentro del documento.
+
+    Las llaves son el digest SHA-256 del contenido, así un mismo payload se guarda una vez.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def put(self, key: str, data: bytes):
+        """Guarda `data` con la llave `key` (idempotente)."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """
+        Raises:
+            BlobNotFound: Si no existe un objeto con esa llave.
+        """
+
+    async def check(self):
+        """
+        Comprueba que se pueda escribir en el almacén; lanza una excepción si no.
+        """
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Almacén en el sistema de archivos local (`root/ab/cd/<llave>`). Sirve como sustituto de
+    un object store en desarrollo o con un volumen compartido entre los procesos.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str = config.SHIELDX_BLOBSTORE_PATH):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        # Only digests: a key never names a path outside `root`
+        if not is_blob_key(key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return os.path.join(self.root, key[:2], key[2:4], key)
+
+    def _write(self, key: str, data: bytes):
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see a partial object
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _read(self, key: str) -> bytes:
+        if not is_blob_key(key):
+            raise BlobNotFound(key)
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BlobNotFound(key)
+
+    async def put(self, key: str, data: bytes):
+        await asyncio.to_thread(self._write, key, data)
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._read, key)
+
+    def _check(self):
+        os.makedirs(self.root, exist_ok=True)
+        with tempfile.TemporaryFile(dir=self.root):
+            pass
+
+    async def check(self):
+        await asyncio.to_thread(self._check)
+
+
+class MictlanxBlobStore(BlobStore):
+    """
+    Almacén en MictlanX: un bucket (`SHIELDX_MICTLANX_BUCKET_ID`) al que se llega por los
+    routers de `SHIELDX_MICTLANX_ROUTERS`. El cliente es síncrono y se usa desde un hilo.
+    """
+
+    name = "mictlanx"
+
+    def __init__(
+        self,
+        bucket_id: str = config.SHIELDX_MICTLANX_BUCKET_ID,
+        routers: str = config.SHIELDX_MICTLANX_ROUTERS,
+        protocol: str = config.SHIELDX_MICTLANX_PROTOCOL,
+    ):
+        from mictlanx.utils.index import Utils
+        from mictlanx.v4.client import Client
+
+        self.bucket_id = bucket_id
+        self.client = Client(
+            client_id=f"shieldx-{os.getpid()}",
+            routers=list(Utils.routers_from_str(routers, protocol=protocol)),
+            bucket_id=bucket_id,
+            debug=False,
+        )
+
+    def _put(self, key: str, data: bytes):
+        result = self.client.put(value=data, key=key, bucket_id=self.bucket_id, tags={"source": "shieldx"})
+        if result.is_err:
+            raise result.unwrap_err()
+
+    def _get(self, key: str) -> bytes:
+        result = self.client.get_with_retry(key=key, bucket_id=self.bucket_id)
+        if result.is_err:
+            raise BlobNotFound(key)
+        return result.unwrap().value
+
+    async def put(self, key: str, data: bytes):
+        await asyncio.to_thread(self._put, key, data)
+
+    async def get(self, key: str) -> bytes:
+        return await asyncio.to_thread(self._get, key)
+
+
+_store: Optional[BlobStore] = None
+_resolved = False
+
+
+def get_blob_store() -> Optional[BlobStore]:
+    """
+    Almacén configurado en `SHIELDX_BLOBSTORE` ("local" o "mictlanx"), compartido por el
+    proceso, o None si no hay ninguno (o `check_blob_store` lo desactivó).
+    """
+    global _store, _resolved
+    if not _resolved:
+        _resolved = True
+        if config.SHIELDX_BLOBSTORE == "mictlanx":
+            _store = MictlanxBlobStore()
+        elif config.SHIELDX_BLOBSTORE == "local":
+            _store = LocalBlobStore()
+        elif config.SHIELDX_BLOBSTORE:
+            L.warning({"event": "BLOBSTORE.UNKNOWN", "store": config.SHIELDX_BLOBSTORE})
+        if _store is not None:
+            L.info({"event": "BLOBSTORE.READY", "store": _store.name})
+    return _store
+
+
+async def check_blob_store() -> Optional[BlobStore]:
+    """
+    Comprueba al arrancar que el almacén configurado admita escrituras. Si no, lo desactiva
+    para el proceso: los payloads grandes se quedan en el documento en lugar de fallar uno a uno.
+    """
+    global _store
+    store = get_blob_store()
+    if store is None:
+        return None
+    try:
+        await store.check()
+    except Exception as e:
+        L.error({"event": "BLOBSTORE.UNAVAILABLE", "store": store.name, "error": str(e), "detail": "payloads stay in the documents"})
+        _store = None
+    return _store
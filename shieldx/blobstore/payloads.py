@@ -0,0 +1,70 @@
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from shieldx.blobstore import BlobNotFound, BlobStore, is_blob_key
+from shieldx.log.logger_config import get_logger
+from shieldx.metrics import REGISTRY
+
+L = get_logger(__name__)
+
+PAYLOADS_OFFLOADED = REGISTRY.counter(
+    "shieldx_payloads_offloaded_total",
+    "Payloads guardados en el almacén de objetos en lugar del documento",
+)
+PAYLOAD_BYTES_OFFLOADED = REGISTRY.counter(
+    "shieldx_payload_offloaded_bytes_total",
+    "Bytes de payload guardados en el almacén de objetos",
+)
+
+
+class PayloadIntegrityError(Exception):
+    """
+    El objeto leído del almacén no coincide con el digest de la referencia.
+    """
+
+
+def encode_payload(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":"), default=str).encode()
+
+
+async def offload_payload(payload: Any, store: Optional[BlobStore], threshold: int) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    """
+    Guarda el payload en el almacén si su JSON ocupa `threshold` bytes o más.
+
+    :return: `(payload, None)` si queda en el documento, o `(None, referencia)` con
+        `{"store", "key", "digest", "size"}` si se guardó fuera. Si el almacén falla, el
+        payload se queda en el documento.
+    """
+    if payload is None or store is None or threshold <= 0:
+        return payload, None
+    data = encode_payload(payload)
+    if len(data) < threshold:
+        return payload, None
+    key = hashlib.sha256(data).hexdigest()
+    try:
+        await store.put(key, data)
+    except Exception as e:
+        L.warning({"event": "PAYLOAD.OFFLOAD.FAILED", "store": store.name, "size": len(data), "error": str(e)})
+        return payload, None
+    PAYLOADS_OFFLOADED.inc()
+    PAYLOAD_BYTES_OFFLOADED.inc(len(data))
+    return None, {"store": store.name, "key": key, "digest": f"sha256:{key}", "size": len(data)}
+
+
+async def fetch_payload(payload: Any, ref: Optional[Dict[str, Any]], store: BlobStore) -> Any:
+    """
+    Payload de un evento: el del documento o, si tiene referencia, el del almacén.
+
+    Raises:
+        BlobNotFound: Si el objeto ya no está en el almacén o la llave no es un digest.
+        PayloadIntegrityError: Si el contenido no coincide con el digest.
+    """
+    if not ref:
+        return payload
+    if not is_blob_key(ref.get("key")):
+        raise BlobNotFound(ref.get("key"))
+    data = await store.get(ref["key"])
+    if f"sha256:{hashlib.sha256(data).hexdigest()}" != ref["digest"]:
+        raise PayloadIntegrityError(ref["key"])
+    return json.loads(data)
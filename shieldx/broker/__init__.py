@@ -1,46 +1,89 @@
-import aio_pika
 import json
 import os
-from typing import Dict,Any
+from typing import Dict,Any,List,Optional
 import threading
 import time as T
 from shieldx.models import EventModel
 from shieldx.services import EventsService
-from shieldx.repositories import EventsRepository
-from shieldx.db import get_collection
+from shieldx.container import get_container
+from shieldx.log.logger_config import get_logger
+from shieldx.metrics import CONSUMER_MESSAGES, CONSUMER_PROCESSING_DURATION, CONSUMER_LAG
+from shieldx.tracing import start_trace, current_trace_id, TRACE_HEADER
+from shieldx.broker.transport import BrokerTransport, AioPikaTransport, RABBITMQ_HOST, RABBITMQ_PORT
+from shieldx.broker.memory import InMemoryTransport
+from shieldx.broker.sharding import (
+    SHARDED_EXCHANGE_NAME,
+    SHARD_COUNT,
+    shard_for,
+    shard_queue_name,
+)
 import asyncio
 
+L = get_logger(__name__)
 
 # RabbitMQ Config
-RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "localhost")
-RABBITMQ_PORT = int(os.environ.get("RABBITMQ_HOST", 5672))
+RABBITMQ_PREFETCH = int(os.environ.get("RABBITMQ_PREFETCH", 32))
+
+# Header with the publish wall-clock time, used to measure consumer lag
+PUBLISHED_AT_HEADER = "x-published-at"
 
 EXCHANGE_NAME = "default_exchange"
 DEFAULT_QUEUES = ["queue_service_a", "queue_service_b"]  # Default queues to listen
 
 class AsyncRabbitMQService:
-    def __init__(self, queues=None):
-        self.queues = queues if queues else DEFAULT_QUEUES
-        self.connection = None
-        self.channel = None
-        self.events_service = EventsService(
-            repository=EventsRepository(
-                collection=get_collection("events")
-            )
-        )
+    def __init__(self, queues=None, shards: Optional[List[int]] = None, shard_count: int = SHARD_COUNT, events_service: Optional[EventsService] = None, transport: Optional[BrokerTransport] = None, publisher: bool = False):
+        """
+        Args:
+            queues: Named queues bound to the direct exchange (legacy layout).
+            shards: Shard queues claimed by this consumer. When given, events are consumed
+                from the sharded layout, where every service_id always lands on the same shard.
+            shard_count: Total number of shard queues in the sharded layout.
+            events_service: Service used to store consumed events (built lazily if omitted).
+            transport: Broker transport; RabbitMQ through aio-pika by default, or
+                InMemoryTransport to run the pipeline without a broker.
+            publisher: Whether this service publishes through the sharded exchange
+                (`publish_event`). Publishers declare every shard queue on connect.
+        """
+        self.shards = shards or []
+        self.shard_count = shard_count
+        if self.shards:
+            self.queues = [shard_queue_name(shard) for shard in self.shards]
+        else:
+            self.queues = queues if queues else DEFAULT_QUEUES
+        self.transport = transport if transport is not None else AioPikaTransport()
+        self.events_service = events_service
+        self.publisher = publisher
+
+    def get_events_service(self) -> EventsService:
+        """Takes the shared events service on first use, once MongoDB is connected."""
+        if self.events_service is None:
+            self.events_service = get_container().events_service
+        return self.events_service
 
     async def connect(self):
-        """Establish an async connection with RabbitMQ and declare the exchange."""
+        """Establish an async connection with the broker and declare the exchanges."""
         while True:
             try:
-                self.connection = await aio_pika.connect_robust(host= RABBITMQ_HOST, port= RABBITMQ_PORT)
-                self.channel = await self.connection.channel()
-                exchange = await self.channel.declare_exchange(EXCHANGE_NAME, aio_pika.ExchangeType.DIRECT)
+                await self.transport.connect()
+                await self.transport.declare_exchange(EXCHANGE_NAME)
+                await self.transport.declare_exchange(SHARDED_EXCHANGE_NAME, durable=True)
+
+                # A publisher makes every shard queue exist before its first publish, so no
+                # event is routed to nowhere; a sharded consumer only needs the ones it claimed
+                if self.publisher:
+                    for shard in range(self.shard_count):
+                        await self.declare_shard_queue(shard)
+                else:
+                    for shard in self.shards:
+                        await self.declare_shard_queue(shard)
 
                 # Declare and bind queues dynamically
                 for queue in self.queues:
-                    queue_obj = await self.channel.declare_queue(queue, durable=True)
-                    await queue_obj.bind(exchange, routing_key=queue)
+                    if self.shards:
+                        L.info({"event": "BROKER.SHARD.CLAIMED", "queue": queue})
+                        continue
+                    await self.transport.declare_queue(queue, durable=True)
+                    await self.transport.bind(queue, EXCHANGE_NAME, routing_key=queue)
                     print(f"[✔] Subscribed to queue: {queue}")
 
                 print("[✔] Connection established with RabbitMQ.")
@@ -49,32 +92,85 @@ class AsyncRabbitMQService:
                 print(f"[❌] Connection error: {e}. Retrying in 5 seconds...")
                 await asyncio.sleep(5)
 
+    async def declare_shard_queue(self, shard: int):
+        """
+        Declares a shard queue bound to the sharded exchange. Shard queues use a single
+        active consumer, so a second worker claiming the same shard waits as a standby
+        instead of breaking per-service ordering.
+        """
+        await self.transport.declare_queue(
+            shard_queue_name(shard),
+            durable=True,
+            arguments={"x-single-active-consumer": True},
+        )
+        await self.transport.bind(shard_queue_name(shard), SHARDED_EXCHANGE_NAME, routing_key=shard_queue_name(shard))
+
+    @staticmethod
+    def _headers() -> Dict[str, Any]:
+        headers = {PUBLISHED_AT_HEADER: T.time()}
+        trace_id = current_trace_id()
+        if trace_id is not None:
+            headers[TRACE_HEADER] = trace_id
+        return headers
+
     async def publish(self, queue: str, message: Dict[str, Any]):
         """Publishes a message to a specific queue asynchronously."""
-        if not self.channel:
+        if not self.transport.is_connected:
             print("[❌] No active connection to RabbitMQ.")
             return
 
-        await self.channel.default_exchange.publish(
-            aio_pika.Message(
-                body=json.dumps(message).encode(),
-                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-            ),
-            routing_key=queue,
+        await self.transport.publish("", queue, json.dumps(message).encode(), headers=self._headers())
+        L.debug(lambda: {"event": "BROKER.MESSAGE.SENT", "queue": queue})
+
+    async def publish_event(self, event: EventModel):
+        """Publishes an event to the shard that owns its service_id."""
+        if not self.transport.is_connected:
+            L.warning({"event": "BROKER.PUBLISH.NOT_CONNECTED", "service_id": event.service_id})
+            return
+
+        shard = shard_for(event.service_id, self.shard_count)
+        await self.transport.publish(
+            SHARDED_EXCHANGE_NAME,
+            shard_queue_name(shard),
+            event.model_dump_json().encode(),
+            headers=self._headers(),
         )
-        print(f"[📤] Message sent to {queue}: {message}")
 
     async def subscribe(self, queue: str):
         """Consumes messages asynchronously, ensuring each queue gets its own consumer."""
-        async with self.connection:
-            channel = await self.connection.channel()
-            queue_obj = await channel.declare_queue(queue, durable=True)
+        events_service = self.get_events_service()
+
+        ok = CONSUMER_MESSAGES.labels(queue, "ok")
+        failed = CONSUMER_MESSAGES.labels(queue, "error")
+        processing = CONSUMER_PROCESSING_DURATION.labels(queue)
+        lag = CONSUMER_LAG.labels(queue)
 
-            async for message in queue_obj:
-                async with message.process():
-                    data = json.loads(message.body.decode())
-                    print(f"[📥] Message received in {queue}: {data}")
-                    await self.events_service.create_event(EventModel.model_validate(data))
+        # Messages of a queue are processed one at a time, which keeps per-service order on shards
+        async for message in self.transport.consume(queue, prefetch_count=RABBITMQ_PREFETCH):
+            headers = message.headers or {}
+            published_at = headers.get(PUBLISHED_AT_HEADER)
+            if published_at is not None:
+                lag.observe(max(0.0, T.time() - float(published_at)))
+            t0 = T.perf_counter()
+            try:
+                # One trace per consumed message; reuses the publisher's trace id when present
+                with start_trace(f"consume {queue}", "consumer", trace_id=headers.get(TRACE_HEADER)):
+                    async with message.process():
+                        data = json.loads(message.body.decode())
+                        L.debug(lambda: {
+                            "event": "BROKER.MESSAGE.RECEIVED",
+                            "queue": queue,
+                            "service_id": data.get("service_id"),
+                            "event_type": data.get("event_type"),
+                        })
+                        await events_service.create_event(EventModel.model_validate(data))
+            except Exception:
+                failed.inc()
+                raise
+            else:
+                ok.inc()
+            finally:
+                processing.observe(T.perf_counter() - t0)
 
     async def start_consuming(self):
         """Starts consuming messages from all subscribed queues asynchronously."""
@@ -83,7 +179,7 @@ class AsyncRabbitMQService:
         await asyncio.gather(*tasks)
 
     async def close(self):
-        """Closes the RabbitMQ connection."""
-        if self.connection:
-            await self.connection.close()
-            print("[❌] RabbitMQ connection closed.")
\ No newline at end of file
+        """Closes the broker connection."""
+        if self.transport.is_connected:
+            await self.transport.close()
+            print("[❌] RabbitMQ connection closed.")
@@ -0,0 +1,184 @@
+import asyncio
+import itertools
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set
+from shieldx.broker.transport import BrokerTransport
+
+
+class InMemoryMessage:
+    """
+    Delivered message of InMemoryTransport. Mirrors the aio-pika IncomingMessage calls the
+    consumer relies on: `ack()`, `reject(requeue)` and `process(requeue)`, which acks on
+    success and rejects (re-raising the error) on failure.
+    """
+
+    def __init__(self, queue: "InMemoryQueue", body: bytes, routing_key: str, headers: Optional[Dict[str, Any]], delivery_tag: int, redelivered: bool = False):
+        self.queue = queue
+        self.body = body
+        self.routing_key = routing_key
+        self.headers = headers or {}
+        self.delivery_tag = delivery_tag
+        self.redelivered = redelivered
+        self.processed = False
+
+    async def ack(self):
+        self._settle()
+
+    async def reject(self, requeue: bool = False):
+        self._settle()
+        if requeue:
+            self.queue.put(self.body, self.routing_key, self.headers, redelivered=True)
+
+    @asynccontextmanager
+    async def process(self, requeue: bool = False):
+        try:
+            yield self
+        except BaseException:
+            if not self.processed:
+                await self.reject(requeue=requeue)
+            raise
+        else:
+            if not self.processed:
+                await self.ack()
+
+    def _settle(self):
+        if self.processed:
+            raise RuntimeError(f"Message {self.delivery_tag} was already acknowledged")
+        self.processed = True
+        self.queue.settle(self.delivery_tag)
+
+
+class InMemoryQueue:
+    """FIFO queue with unacked-message tracking, prefetch windows and optional single active consumer."""
+
+    def __init__(self, name: str, durable: bool = True, arguments: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.durable = durable
+        self.arguments = arguments or {}
+        self.messages: Deque[tuple] = deque()
+        self.unacked: Dict[int, InMemoryMessage] = {}
+        self.delivered = 0
+        self.acked = 0
+        self._tags = itertools.count(1)
+        self._waiters: Set[asyncio.Future] = set()
+        self._single_active = asyncio.Lock() if self.arguments.get("x-single-active-consumer") else None
+        self._closed = False
+
+    def put(self, body: bytes, routing_key: str, headers: Optional[Dict[str, Any]] = None, redelivered: bool = False):
+        self.messages.append((body, routing_key, headers, redelivered))
+        self._notify()
+
+    def settle(self, delivery_tag: int):
+        if self.unacked.pop(delivery_tag, None) is not None:
+            self.acked += 1
+            self._notify()
+
+    def close(self):
+        self._closed = True
+        self._notify()
+
+    def _notify(self):
+        for waiter in self._waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._waiters.clear()
+
+    async def _wait(self):
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.add(waiter)
+        try:
+            await waiter
+        finally:
+            self._waiters.discard(waiter)
+
+    def _ready(self, prefetch_count: int) -> bool:
+        return bool(self.messages) and (not prefetch_count or len(self.unacked) < prefetch_count)
+
+    async def consume(self, prefetch_count: int = 0) -> AsyncIterator[InMemoryMessage]:
+        if self._single_active is not None:
+            await self._single_active.acquire()
+        try:
+            while True:
+                while not self._closed and not self._ready(prefetch_count):
+                    await self._wait()
+                if self._closed:
+                    return
+                body, routing_key, headers, redelivered = self.messages.popleft()
+                message = InMemoryMessage(self, body, routing_key, headers, next(self._tags), redelivered)
+                self.unacked[message.delivery_tag] = message
+                self.delivered += 1
+                yield message
+        finally:
+            if self._single_active is not None:
+                self._single_active.release()
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+
+class InMemoryTransport(BrokerTransport):
+    """
+    In-process stand-in for RabbitMQ with direct-exchange routing and ack semantics.
+    Lets the consumer pipeline run in tests and benchmarks without a broker or network.
+    Messages published to an exchange/routing key with no bound queue are dropped, like
+    an unroutable publish on RabbitMQ.
+    """
+
+    def __init__(self):
+        self.queues: Dict[str, InMemoryQueue] = {}
+        self.bindings: Dict[str, Dict[str, Set[str]]] = {"": {}}
+        self.published = 0
+        self.unroutable = 0
+        self._connected = False
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    async def connect(self):
+        self._connected = True
+
+    async def declare_exchange(self, name: str, durable: bool = False):
+        self.bindings.setdefault(name, {})
+
+    async def declare_queue(self, name: str, durable: bool = True, arguments: Optional[Dict[str, Any]] = None):
+        if name not in self.queues:
+            self.queues[name] = InMemoryQueue(name, durable=durable, arguments=arguments)
+
+    async def bind(self, queue: str, exchange: str, routing_key: str):
+        if exchange not in self.bindings:
+            raise KeyError(f"Exchange '{exchange}' is not declared")
+        if queue not in self.queues:
+            raise KeyError(f"Queue '{queue}' is not declared")
+        self.bindings[exchange].setdefault(routing_key, set()).add(queue)
+
+    async def publish(self, exchange: str, routing_key: str, body: bytes, headers: Optional[Dict[str, Any]] = None):
+        if exchange not in self.bindings:
+            raise KeyError(f"Exchange '{exchange}' is not declared")
+        if exchange == "":
+            targets = {routing_key} if routing_key in self.queues else set()
+        else:
+            targets = self.bindings[exchange].get(routing_key, set())
+        self.published += 1
+        if not targets:
+            self.unroutable += 1
+        for queue in targets:
+            self.queues[queue].put(body, routing_key, headers)
+
+    async def consume(self, queue: str, prefetch_count: int = 0) -> AsyncIterator[InMemoryMessage]:
+        if queue not in self.queues:
+            raise KeyError(f"Queue '{queue}' is not declared")
+        async for message in self.queues[queue].consume(prefetch_count):
+            yield message
+
+    async def close(self):
+        self._connected = False
+        for queue in self.queues.values():
+            queue.close()
+
+    async def join(self, *queues: str):
+        """Waits until the given queues (all by default) are empty and fully acknowledged."""
+        names = queues or tuple(self.queues)
+        while any(len(self.queues[name]) or self.queues[name].unacked for name in names):
+            await asyncio.sleep(0.001)
@@ -0,0 +1,62 @@
+import hashlib
+import os
+from typing import List
+
+# Sharded ingestion config
+SHARDED_EXCHANGE_NAME = os.environ.get("SHIELDX_SHARDED_EXCHANGE", "shieldx.events")
+SHARD_QUEUE_PREFIX = os.environ.get("SHIELDX_SHARD_QUEUE_PREFIX", "shieldx.events.shard")
+SHARD_COUNT = int(os.environ.get("SHIELDX_SHARD_COUNT", "16"))
+
+
+def jump_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash (Lamping & Veach): maps a 64-bit key to a bucket in [0, buckets).
+    Growing `buckets` from N to N+1 only moves ~1/(N+1) of the keys.
+    """
+    if buckets <= 0:
+        raise ValueError("buckets must be a positive integer")
+    b, j = -1, 0
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+
+def shard_for(service_id: str, shard_count: int = SHARD_COUNT) -> int:
+    """Returns the shard that owns every event of `service_id`."""
+    digest = hashlib.blake2b(service_id.encode(), digest_size=8).digest()
+    return jump_hash(int.from_bytes(digest, "big"), shard_count)
+
+
+def shard_queue_name(shard: int) -> str:
+    """Returns the durable queue name of a shard."""
+    return f"{SHARD_QUEUE_PREFIX}.{shard}"
+
+
+def claim_shards(worker_index: int, worker_count: int, shard_count: int = SHARD_COUNT) -> List[int]:
+    """Returns the shards owned by a worker when `shard_count` shards are spread over `worker_count` workers."""
+    if worker_count <= 0 or not 0 <= worker_index < worker_count:
+        raise ValueError(f"Invalid worker {worker_index} of {worker_count}")
+    return [shard for shard in range(shard_count) if shard % worker_count == worker_index]
+
+
+def resolve_consumer_shards(shard_count: int = SHARD_COUNT) -> List[int]:
+    """
+    Reads the shards this consumer should claim from the environment:
+
+    - SHIELDX_CONSUMER_SHARDS: explicit comma separated list (e.g. "0,4,8").
+    - SHIELDX_WORKER_INDEX / SHIELDX_WORKER_COUNT: round-robin claim over all shards.
+
+    Returns an empty list when the consumer is not running in sharded mode.
+    """
+    explicit = os.environ.get("SHIELDX_CONSUMER_SHARDS", "").strip()
+    if explicit:
+        return [int(shard) for shard in explicit.split(",") if shard.strip()]
+    if "SHIELDX_WORKER_INDEX" in os.environ:
+        return claim_shards(
+            worker_index=int(os.environ["SHIELDX_WORKER_INDEX"]),
+            worker_count=int(os.environ.get("SHIELDX_WORKER_COUNT", "1")),
+            shard_count=shard_count,
+        )
+    return []
@@ -0,0 +1,111 @@
+import os
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, Optional
+import aio_pika
+
+# RabbitMQ Config
+RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "localhost")
+RABBITMQ_PORT = int(os.environ.get("RABBITMQ_PORT", 5672))
+
+
+class BrokerTransport(ABC):
+    """
+    Minimal broker surface used by AsyncRabbitMQService: direct exchanges, durable
+    queues, bindings, persistent publishes and per-queue consumers whose messages are
+    acknowledged through `message.process()`.
+
+    Exchange "" is the default exchange, which routes a message to the queue whose
+    name equals the routing key.
+    """
+
+    @property
+    @abstractmethod
+    def is_connected(self) -> bool:
+        """True once `connect()` succeeded and until `close()`."""
+
+    @abstractmethod
+    async def connect(self):
+        """Opens the connection to the broker."""
+
+    @abstractmethod
+    async def declare_exchange(self, name: str, durable: bool = False):
+        """Declares a direct exchange (idempotent)."""
+
+    @abstractmethod
+    async def declare_queue(self, name: str, durable: bool = True, arguments: Optional[Dict[str, Any]] = None):
+        """Declares a queue (idempotent)."""
+
+    @abstractmethod
+    async def bind(self, queue: str, exchange: str, routing_key: str):
+        """Binds a queue to an exchange for a routing key."""
+
+    @abstractmethod
+    async def publish(self, exchange: str, routing_key: str, body: bytes, headers: Optional[Dict[str, Any]] = None):
+        """Publishes a persistent message."""
+
+    @abstractmethod
+    def consume(self, queue: str, prefetch_count: int = 0) -> AsyncIterator[Any]:
+        """Yields messages of `queue`; each one exposes `body` and an async `process()` context."""
+
+    @abstractmethod
+    async def close(self):
+        """Closes the connection and stops the consumers."""
+
+
+class AioPikaTransport(BrokerTransport):
+    """RabbitMQ transport backed by aio-pika."""
+
+    def __init__(self, host: str = RABBITMQ_HOST, port: int = RABBITMQ_PORT):
+        self.host = host
+        self.port = port
+        self.connection = None
+        self.channel = None
+        self._exchanges: Dict[str, Any] = {}
+        self._queues: Dict[str, Any] = {}
+        self._queue_options: Dict[str, dict] = {}
+
+    @property
+    def is_connected(self) -> bool:
+        return self.channel is not None
+
+    async def connect(self):
+        self.connection = await aio_pika.connect_robust(host=self.host, port=self.port)
+        self.channel = await self.connection.channel()
+
+    async def declare_exchange(self, name: str, durable: bool = False):
+        self._exchanges[name] = await self.channel.declare_exchange(name, aio_pika.ExchangeType.DIRECT, durable=durable)
+
+    async def declare_queue(self, name: str, durable: bool = True, arguments: Optional[Dict[str, Any]] = None):
+        self._queue_options[name] = {"durable": durable, "arguments": arguments}
+        self._queues[name] = await self.channel.declare_queue(name, durable=durable, arguments=arguments)
+
+    async def bind(self, queue: str, exchange: str, routing_key: str):
+        await self._queues[queue].bind(self._exchanges[exchange], routing_key=routing_key)
+
+    async def publish(self, exchange: str, routing_key: str, body: bytes, headers: Optional[Dict[str, Any]] = None):
+        target = self.channel.default_exchange if not exchange else self._exchanges[exchange]
+        await target.publish(
+            aio_pika.Message(
+                body=body,
+                headers=headers,
+                content_type="application/json",
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT
+            ),
+            routing_key=routing_key,
+        )
+
+    async def consume(self, queue: str, prefetch_count: int = 0) -> AsyncIterator[Any]:
+        # Each consumer gets its own channel so prefetch applies per queue
+        channel = await self.connection.channel()
+        if prefetch_count:
+            await channel.set_qos(prefetch_count=prefetch_count)
+        queue_obj = await channel.declare_queue(queue, **self._queue_options.get(queue, {"durable": True}))
+        async with queue_obj.iterator() as iterator:
+            async for message in iterator:
+                yield message
+
+    async def close(self):
+        if self.connection:
+            await self.connection.close()
+        self.connection = None
+        self.channel = None
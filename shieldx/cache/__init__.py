@@ -0,0 +1,102 @@
+import time as T
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Caché en memoria acotada por tamaño (LRU) y por tiempo de vida (TTL).
+
+    Cada entrada expira `ttl` segundos después de escribirse; cuando se alcanza
+    `maxsize` se desaloja la entrada usada hace más tiempo. Está pensada para
+    usarse desde un único event loop de asyncio, por lo que no utiliza locks.
+
+    Atributos:
+        maxsize (int): Número máximo de entradas retenidas.
+        ttl (float): Segundos que vive cada entrada.
+        hits (int): Lecturas que encontraron una entrada vigente.
+        misses (int): Lecturas que no encontraron entrada o la encontraron expirada.
+        evictions (int): Entradas desalojadas por tamaño o expiración.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Devuelve el valor asociado a `key` si existe y no ha expirado.
+
+        Args:
+            key (Hashable): Llave a consultar.
+            default (Any): Valor devuelto si la llave no está vigente.
+        """
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = item
+        if expires_at <= T.monotonic():
+            del self._data[key]
+            self.evictions += 1
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Inserta o reemplaza una entrada y desaloja la menos reciente si se excede `maxsize`.
+
+        Args:
+            key (Hashable): Llave de la entrada.
+            value (Any): Valor a almacenar.
+            ttl (Optional[float]): TTL específico para esta entrada.
+        """
+        self._data[key] = (T.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Elimina una entrada y devuelve su valor (o `default` si no existía).
+        """
+        item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[1]
+
+    def clear(self):
+        """
+        Elimina todas las entradas sin reiniciar los contadores.
+        """
+        self._data.clear()
+
+    def stats(self) -> dict:
+        """
+        Devuelve los contadores de uso de la caché.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        item = self._data.get(key, _MISSING)
+        return item is not _MISSING and item[0] > T.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._data)
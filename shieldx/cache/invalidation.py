@@ -0,0 +1,170 @@
+import asyncio
+from typing import Any, Dict, Iterable, Optional
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from shieldx import config
+from shieldx.cache.repository import invalidate, invalidate_all
+from shieldx.cache.versions import VERSIONS, VERSIONS_COLLECTION
+from shieldx.log.logger_config import get_logger
+from shieldx.metrics import REGISTRY
+
+L = get_logger(__name__)
+
+CACHE_INVALIDATIONS = REGISTRY.counter(
+    "shieldx_cache_invalidations_total",
+    "Invalidaciones de caché recibidas por change stream",
+    ["collection"],
+)
+
+# Colecciones cuyas lecturas cachean los repositorios
+WATCHED_COLLECTIONS = ("event_types", "triggers", "rules", "events_triggers", "triggers_triggers", "rules_trigger")
+# Change streams no disponibles: servidor standalone (40573) o sin soporte del motor de almacenamiento
+UNSUPPORTED_CODES = {40573, 40324, 115}
+# El oplog ya no contiene el punto de reanudación
+HISTORY_LOST_CODES = {260, 280, 286}
+# Cambios que no nombran una colección y afectan a todas
+DATABASE_EVENTS = {"dropDatabase", "invalidate"}
+
+_bus: Optional["InvalidationBus"] = None
+
+
+def get_invalidation_bus() -> Optional["InvalidationBus"]:
+    """
+    Bus activo en el proceso, o None si no se inició.
+    """
+    return _bus
+
+
+class InvalidationBus:
+    """
+    Invalida las cachés de repositorio de este proceso con los cambios que hacen los demás.
+
+    Abre un change stream sobre la base de datos filtrado a las colecciones cacheadas y, por
+    cada inserción, actualización, reemplazo o borrado, descarta la caché de esa colección.
+    También observa `collection_versions` para olvidar las versiones (ETags) que cambiaron
+    otros procesos. Así cada worker de uvicorn y cada consumidor se entera de las escrituras de los otros y
+    las cachés pueden usar TTL largos.
+
+    - Si la conexión se corta, reanuda con el último resume token y, como pudo perder
+      cambios mientras tanto, vacía todas las cachés al reconectar.
+    - Si MongoDB no admite change streams (servidor standalone), se detiene y las cachés
+      quedan acotadas solo por su TTL.
+    """
+
+    def __init__(
+        self,
+        db,
+        collections: Iterable[str] = WATCHED_COLLECTIONS,
+        retry_delay: float = config.SHIELDX_CACHE_INVALIDATION_RETRY,
+    ):
+        """
+        Args:
+            db (AsyncIOMotorDatabase): Base de datos a observar.
+            collections (Iterable[str]): Colecciones cuyos cambios invalidan la caché.
+            retry_delay (float): Segundos de espera antes de reabrir el stream tras un error.
+        """
+        self.db = db
+        self.collections = tuple(collections)
+        self.retry_delay = retry_delay
+        self.resume_token: Optional[dict] = None
+        self.active = False
+        self.supported = True
+        self.received = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """
+        Inicia la tarea que consume el change stream. Debe llamarse desde el event loop.
+        """
+        global _bus
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="shieldx-cache-invalidation")
+        _bus = self
+
+    async def stop(self):
+        global _bus
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.active = False
+        if _bus is self:
+            _bus = None
+
+    def _pipeline(self) -> list:
+        return [
+            {"$match": {"ns.coll": {"$in": [*self.collections, VERSIONS_COLLECTION]}}},
+            # Only the namespace, operation and key are needed; _id (the resume token) is kept
+            {"$project": {"ns": 1, "operationType": 1, "documentKey": 1}},
+        ]
+
+    def _flush(self):
+        invalidate_all()
+        VERSIONS.forget_all()
+
+    def apply(self, change: Dict[str, Any]):
+        """
+        Aplica un cambio del stream a las cachés.
+        """
+        self.received += 1
+        collection = change.get("ns", {}).get("coll")
+        if not collection or change.get("operationType") in DATABASE_EVENTS:
+            self._flush()
+            return
+        if collection == VERSIONS_COLLECTION:
+            VERSIONS.forget(change.get("documentKey", {}).get("_id"))
+            return
+        invalidate(collection)
+        CACHE_INVALIDATIONS.labels(collection).inc()
+
+    async def _run(self):
+        while True:
+            try:
+                async with self.db.watch(self._pipeline(), resume_after=self.resume_token) as stream:
+                    if self.reconnects:
+                        # Changes made while the stream was down were not seen
+                        self._flush()
+                    self.active = True
+                    L.info({"event": "CACHE.INVALIDATION.STARTED", "collections": self.collections, "resumed": self.resume_token is not None})
+                    async for change in stream:
+                        self.resume_token = stream.resume_token
+                        self.apply(change)
+                        if change.get("operationType") == "invalidate":
+                            self.resume_token = None
+                            break
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                self.last_error = str(e)
+                if e.code in UNSUPPORTED_CODES:
+                    self.active = False
+                    self.supported = False
+                    L.warning({
+                        "event": "CACHE.INVALIDATION.UNSUPPORTED",
+                        "error": str(e),
+                        "detail": "MongoDB is not a replica set; repository caches rely on their TTL only",
+                    })
+                    return
+                if e.code in HISTORY_LOST_CODES:
+                    self.resume_token = None
+                L.error({"event": "CACHE.INVALIDATION.ERROR", "error": str(e)})
+            except PyMongoError as e:
+                self.last_error = str(e)
+                L.error({"event": "CACHE.INVALIDATION.ERROR", "error": str(e)})
+            self.active = False
+            self.reconnects += 1
+            await asyncio.sleep(self.retry_delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "supported": self.supported,
+            "collections": list(self.collections),
+            "received": self.received,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,125 @@
+import functools
+from typing import Dict, Iterable, Tuple
+
+from shieldx import config
+from shieldx.cache import TTLCache
+from shieldx.metrics import register_cache
+
+# Una caché por colección, compartida por todas las instancias de repositorio del proceso
+_caches: Dict[str, TTLCache] = {}
+# Generación por colección: cada escritura la incrementa y descarta lecturas en vuelo
+_generations: Dict[str, int] = {}
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[float, int]]:
+    """
+    Interpreta límites por colección con el formato `colección=TTL/TAMAÑO`, separados por comas.
+
+    Ejemplo:
+        parse_limits("triggers=120/2048,rules=60/512")
+    """
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        collection, _, value = item.partition("=")
+        ttl, _, maxsize = value.partition("/")
+        if not collection or not ttl or not maxsize:
+            raise ValueError(f"Invalid repository cache limit '{item}': expected COLLECTION=TTL/SIZE")
+        limits[collection.strip()] = (float(ttl), int(maxsize))
+    return limits
+
+
+_limits = parse_limits(config.SHIELDX_REPOSITORY_CACHE_LIMITS)
+
+
+def get_repository_cache(collection: str) -> TTLCache:
+    """
+    Caché de lecturas de una colección. Se crea en el primer uso con los límites de
+    `SHIELDX_REPOSITORY_CACHE_LIMITS` (o los generales) y se expone en /metrics como
+    `repository.<colección>`.
+    """
+    cache = _caches.get(collection)
+    if cache is None:
+        ttl, maxsize = _limits.get(
+            collection,
+            (config.SHIELDX_REPOSITORY_CACHE_TTL, config.SHIELDX_REPOSITORY_CACHE_SIZE),
+        )
+        cache = _caches[collection] = TTLCache(maxsize=maxsize, ttl=ttl)
+        register_cache(f"repository.{collection}", cache)
+    return cache
+
+
+def invalidate(collection: str):
+    """
+    Descarta las lecturas cacheadas de una colección.
+    """
+    _generations[collection] = _generations.get(collection, 0) + 1
+    cache = _caches.get(collection)
+    if cache is not None:
+        cache.clear()
+
+
+def invalidate_all():
+    for collection in list(_caches):
+        invalidate(collection)
+
+
+def repository_cache_stats() -> Dict[str, dict]:
+    return {collection: cache.stats() for collection, cache in list(_caches.items())}
+
+
+def cached_repository(
+    collection: str,
+    reads: Iterable[str] = ("find_one", "find_all"),
+    writes: Iterable[str] = ("insert_one", "update_one", "delete_one"),
+):
+    """
+    Decorador de clase: caché de lectura (read-through) para un repositorio.
+
+    Los métodos de `reads` se responden desde la caché de `collection` cuando hay una
+    entrada vigente para los mismos argumentos; los de `writes` descartan toda la caché de
+    la colección al terminar. Los resultados vacíos (None o listas vacías) no se guardan:
+    así un error de Mongo que el repositorio convierte en `[]` no queda cacheado.
+
+    Los valores cacheados se comparten entre llamadas, por lo que no deben modificarse.
+    """
+    def decorate(cls):
+        for name in reads:
+            setattr(cls, name, _cached_read(getattr(cls, name), collection))
+        for name in writes:
+            setattr(cls, name, _invalidating_write(getattr(cls, name), collection))
+        return cls
+    return decorate
+
+
+def _cached_read(fn, collection: str):
+    method = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        if not config.SHIELDX_REPOSITORY_CACHE:
+            return await fn(self, *args, **kwargs)
+        cache = get_repository_cache(collection)
+        # repr: the filters are dicts (unhashable) that may hold ObjectIds
+        key = (method, repr(args), repr(sorted(kwargs.items())))
+        value = cache.get(key)
+        if value is not None:
+            return value
+        generation = _generations.get(collection, 0)
+        value = await fn(self, *args, **kwargs)
+        # A write finished while we were reading: the result may predate it
+        if value and generation == _generations.get(collection, 0):
+            cache.set(key, value)
+        return value
+
+    return wrapper
+
+
+def _invalidating_write(fn, collection: str):
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await fn(self, *args, **kwargs)
+        finally:
+            invalidate(collection)
+
+    return wrapper
@@ -0,0 +1,140 @@
+import time as T
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+import shieldx.db as DB
+from shieldx import config
+from shieldx.cache.repository import invalidate
+from shieldx.log.logger_config import get_logger
+
+L = get_logger(__name__)
+
+VERSIONS_COLLECTION = "collection_versions"
+# Documento con el contador global: cada escritura toma el siguiente valor
+GLOBAL_VERSION_ID = "__global__"
+
+
+class CollectionVersions:
+    """
+    Versión monótona por colección de configuración, guardada en `collection_versions`.
+
+    Cada escritura registrada en el changelog (ver `shieldx.db.changelog`) toma el siguiente
+    valor de un contador global y lo asigna a su colección, así las versiones de todas las
+    colecciones son comparables entre sí. Las versiones se recuerdan en memoria para responder peticiones condicionales sin consultar Mongo:
+
+    - Con el bus de invalidación activo, se recuerdan hasta que otro proceso cambia la versión.
+    - Sin él, como mucho `ttl` segundos. Si al releerla cambió (otro proceso escribió), se
+      descarta la caché de repositorio de la colección, que puede guardar datos más antiguos
+      que la versión nueva.
+    """
+
+    def __init__(self, ttl: float = config.SHIELDX_VERSION_CACHE_TTL):
+        """
+        Args:
+            ttl (float): Segundos que se recuerda una versión si no hay bus de invalidación.
+        """
+        self.ttl = ttl
+        self._known: Dict[str, Tuple[int, float]] = {}
+
+    def _collection(self):
+        db = DB.get_database("config")
+        return db[VERSIONS_COLLECTION] if db is not None else None
+
+    async def bump(self, collection: str) -> Optional[int]:
+        """
+        Asigna a `collection` una versión nueva y la devuelve (None si Mongo falló).
+        """
+        versions = self._collection()
+        if versions is None:
+            return None
+        try:
+            counter = await versions.find_one_and_update(
+                {"_id": GLOBAL_VERSION_ID},
+                {"$inc": {"version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            version = counter["version"]
+            await versions.update_one({"_id": collection}, {"$max": {"version": version}}, upsert=True)
+        except PyMongoError as e:
+            # ETags stay on the old version until the next write: clients may miss this change
+            L.error({"event": "COLLECTION.VERSION.BUMP.ERROR", "collection": collection, "error": str(e)})
+            self.forget(collection)
+            return None
+        self._known[collection] = (version, T.monotonic())
+        return version
+
+    async def current(self, collection: str) -> int:
+        """
+        Versión actual de `collection` (0 si nunca se escribió).
+        """
+        known = self._known.get(collection)
+        if known is not None and (_bus_active() or T.monotonic() - known[1] < self.ttl):
+            return known[0]
+        versions = self._collection()
+        if versions is None:
+            return 0
+        document = await versions.find_one({"_id": collection}, {"version": 1})
+        version = document["version"] if document else 0
+        if known is None or known[0] != version:
+            # The cached body may predate this version: never serve it under the new ETag
+            invalidate(collection)
+        self._known[collection] = (version, T.monotonic())
+        return version
+
+    def forget(self, collection: str):
+        """
+        Olvida la versión recordada (otro proceso la cambió).
+        """
+        self._known.pop(collection, None)
+
+    def forget_all(self):
+        self._known.clear()
+
+
+def _bus_active() -> bool:
+    # Imported here: the invalidation bus imports this module to forward version changes
+    from shieldx.cache.invalidation import get_invalidation_bus
+    bus = get_invalidation_bus()
+    return bus is not None and bus.active
+
+
+VERSIONS = CollectionVersions()
+
+
+def make_etag(versions: Dict[str, int]) -> str:
+    return 'W/"' + ".".join(f"{collection}-{version}" for collection, version in versions.items()) + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Comparación débil de `If-None-Match` (lista separada por comas o `*`) con un ETag.
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
+
+
+def conditional_get(*collections: str):
+    """
+    Dependencia de FastAPI para endpoints GET que solo leen `collections`.
+
+    Añade el header `ETag` con sus versiones y, si el `If-None-Match` del cliente coincide,
+    responde `304 Not Modified` antes de ejecutar el endpoint (sin consultar Mongo).
+
+    Ejemplo:
+        @router.get("/rules", dependencies=[conditional_get("rules")])
+    """
+    async def dependency(request: Request, response: Response):
+        etag = make_etag({collection: await VERSIONS.current(collection) for collection in collections})
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        # Clients may keep the copy but must revalidate before using it
+        response.headers["Cache-Control"] = "no-cache"
+
+    return Depends(dependency)
@@ -0,0 +1,353 @@
+"""
+Compresión de payloads de eventos.
+
+Los payloads son JSON repetitivo: a partir de `SHIELDX_PAYLOAD_COMPRESSION_BYTES` el
+repositorio de eventos guarda `payload_compressed` (`{"codec", "dict", "size", "data"}`) en
+lugar de `payload`, y lo descomprime solo al leer documentos que incluyen el payload (las
+consultas con `fields` sin `payload` no lo tocan).
+
+El códec por defecto es zlib; zstd requiere el extra `compression` (paquete `zstandard`).
+Ambos admiten un diccionario por tipo de evento, que mejora mucho la compresión de payloads
+pequeños y parecidos entre sí.
+
+Los diccionarios se guardan en la colección `payload_dictionaries` (llave: su id), así un
+documento comprimido por un proceso (p. ej. el consumidor) se puede leer en cualquier otro:
+el repositorio carga bajo demanda los diccionarios que le falten antes de descomprimir.
+
+Entrenar un diccionario con payloads ya almacenados:
+
+    python -m shieldx.compression --event-type EncryptStart --samples 2000
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time as T
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+from shieldx import config
+from shieldx.log.logger_config import get_logger
+from shieldx.metrics import REGISTRY
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+L = get_logger(__name__)
+
+ZSTD = "zstd"
+ZLIB = "zlib"
+COMPRESSED_FIELD = "payload_compressed"
+DICTIONARIES_COLLECTION = "payload_dictionaries"
+# zlib only looks back 32 KiB, so a longer dictionary is wasted
+ZLIB_MAX_DICTIONARY = 32 * 1024
+
+PAYLOAD_BYTES = REGISTRY.counter(
+    "shieldx_payload_compression_bytes_total",
+    "Bytes de payloads comprimidos, antes (raw) y después (stored) de comprimir",
+    ["kind"],
+)
+PAYLOAD_DECODE_ERRORS = REGISTRY.counter(
+    "shieldx_payload_decode_errors_total",
+    "Payloads comprimidos que no se pudieron descomprimir al leer",
+)
+
+
+class PayloadCompressionError(Exception):
+    """
+    Un payload comprimido no se puede descomprimir (códec o diccionario no disponibles).
+    """
+
+
+def dictionary_id(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def train_dictionary(samples: List[bytes], codec: str, size: int = 16 * 1024) -> bytes:
+    """
+    Construye un diccionario a partir de payloads de ejemplo (JSON serializado).
+
+    Con zstd se entrena (`zstandard.train_dictionary`); con zlib el diccionario son los
+    ejemplos más recientes concatenados, que es lo que zlib puede aprovechar.
+    """
+    if codec == ZSTD:
+        if zstandard is None:
+            raise PayloadCompressionError("zstandard is not installed")
+        return zstandard.train_dictionary(size, samples).as_bytes()
+    data = b"".join(samples)
+    return data[-min(size, ZLIB_MAX_DICTIONARY):]
+
+
+class PayloadCodec:
+    """
+    Comprime y descomprime payloads con el códec configurado y los diccionarios disponibles.
+
+    Los diccionarios vienen de la colección `payload_dictionaries` (`sync_dictionaries`,
+    `load_dictionaries`) y, opcionalmente, de `dictionary_path`: archivos
+    `<event_type>.<id>.<códec>.dict`. Para comprimir se usa el más reciente de cada tipo de
+    evento; para descomprimir, el que indique el documento (por eso los anteriores deben conservarse).
+    """
+
+    def __init__(
+        self,
+        codec: str = config.SHIELDX_PAYLOAD_CODEC,
+        level: int = config.SHIELDX_PAYLOAD_COMPRESSION_LEVEL,
+        threshold: int = config.SHIELDX_PAYLOAD_COMPRESSION_BYTES,
+        dictionary_path: str = config.SHIELDX_PAYLOAD_DICTIONARY_PATH,
+        refresh_seconds: float = config.SHIELDX_PAYLOAD_DICTIONARY_REFRESH,
+    ):
+        """
+        Args:
+            codec (str): "zstd" o "zlib". Sin `zstandard` instalado se usa zlib.
+            level (int): Nivel de compresión del códec.
+            threshold (int): Bytes de JSON a partir de los que se comprime (0: nunca).
+            dictionary_path (str): Carpeta de diccionarios ("" para no usar diccionarios).
+            refresh_seconds (float): Cada cuánto se buscan en Mongo diccionarios nuevos para comprimir.
+        """
+        if codec == ZSTD and zstandard is None:
+            L.warning({"event": "PAYLOAD.CODEC.FALLBACK", "codec": ZLIB, "detail": "zstandard is not installed"})
+            codec = ZLIB
+        self.codec = codec
+        self.level = level
+        self.threshold = threshold
+        # dictionary id -> (codec, bytes); event type -> dictionary id used to compress
+        self.dictionaries: Dict[str, Tuple[str, bytes]] = {}
+        self.by_event_type: Dict[str, str] = {}
+        self._zstd: Dict[Optional[str], Tuple[Any, Any]] = {}
+        self.refresh_seconds = refresh_seconds
+        self._synced_at: Optional[float] = None
+        if dictionary_path and os.path.isdir(dictionary_path):
+            self._load_dictionaries(dictionary_path)
+
+    def _load_dictionaries(self, path: str):
+        files = sorted(
+            (entry for entry in os.scandir(path) if entry.name.endswith(".dict")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in files:
+            parts = entry.name.rsplit(".", 3)
+            if len(parts) != 4:
+                continue
+            event_type, _, codec, _ = parts
+            with open(entry.path, "rb") as f:
+                data = f.read()
+            self.add_dictionary(event_type, codec, data)
+        L.info({"event": "PAYLOAD.DICTIONARIES.LOADED", "count": len(self.dictionaries), "event_types": sorted(self.by_event_type)})
+
+    def add_dictionary(self, event_type: str, codec: str, data: bytes, compress: bool = True) -> str:
+        """
+        Registra un diccionario; si es del códec en uso (y `compress`), pasa a ser el de su
+        tipo de evento.
+        """
+        dict_id = dictionary_id(data)
+        self.dictionaries[dict_id] = (codec, data)
+        if compress and codec == self.codec:
+            self.by_event_type[event_type] = dict_id
+        return dict_id
+
+    async def sync_dictionaries(self, collection):
+        """
+        Carga los diccionarios de Mongo (el más reciente de cada tipo de evento pasa a usarse
+        para comprimir). Solo consulta si pasaron `refresh_seconds` desde la última vez.
+        """
+        if self._synced_at is not None and T.monotonic() - self._synced_at < self.refresh_seconds:
+            return
+        self._synced_at = T.monotonic()
+        try:
+            async for document in collection.find({}).sort("created_at", ASCENDING):
+                self.add_dictionary(document["event_type"], document["codec"], bytes(document["data"]))
+        except PyMongoError as e:
+            L.error({"event": "PAYLOAD.DICTIONARIES.SYNC.ERROR", "error": str(e)})
+
+    def missing_dictionaries(self, documents: Iterable[Dict[str, Any]]) -> Set[str]:
+        """
+        Ids de los diccionarios que necesitan `documents` y aún no están cargados.
+        """
+        missing = set()
+        for document in documents:
+            dict_id = (document.get(COMPRESSED_FIELD) or {}).get("dict")
+            if dict_id and dict_id not in self.dictionaries:
+                missing.add(dict_id)
+        return missing
+
+    async def load_dictionaries(self, collection, documents: Iterable[Dict[str, Any]]):
+        """
+        Carga de Mongo los diccionarios que faltan para descomprimir `documents`. No cambian
+        el diccionario con el que se comprime.
+        """
+        missing = self.missing_dictionaries(documents)
+        if not missing:
+            return
+        try:
+            async for document in collection.find({"_id": {"$in": sorted(missing)}}):
+                self.add_dictionary(document["event_type"], document["codec"], bytes(document["data"]), compress=False)
+        except PyMongoError as e:
+            L.error({"event": "PAYLOAD.DICTIONARIES.LOAD.ERROR", "dictionaries": sorted(missing), "error": str(e)})
+
+    def _zstd_pair(self, dict_id: Optional[str]):
+        pair = self._zstd.get(dict_id)
+        if pair is None:
+            dictionary = zstandard.ZstdCompressionDict(self.dictionaries[dict_id][1]) if dict_id else None
+            pair = (
+                zstandard.ZstdCompressor(level=self.level, dict_data=dictionary),
+                zstandard.ZstdDecompressor(dict_data=dictionary),
+            )
+            self._zstd[dict_id] = pair
+        return pair
+
+    def _compress(self, data: bytes, codec: str, dict_id: Optional[str]) -> bytes:
+        if codec == ZSTD:
+            return self._zstd_pair(dict_id)[0].compress(data)
+        if dict_id:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, zlib.MAX_WBITS, zdict=self.dictionaries[dict_id][1])
+            return compressor.compress(data) + compressor.flush()
+        return zlib.compress(data, self.level)
+
+    def _decompress(self, data: bytes, codec: str, dict_id: Optional[str]) -> bytes:
+        if codec == ZSTD:
+            if zstandard is None:
+                raise PayloadCompressionError("Payload is zstd-compressed but zstandard is not installed")
+            return self._zstd_pair(dict_id)[1].decompress(data)
+        if dict_id:
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS, zdict=self.dictionaries[dict_id][1])
+            return decompressor.decompress(data) + decompressor.flush()
+        return zlib.decompress(data)
+
+    def compress(self, payload: Any, event_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Payload comprimido (`{"codec", "dict", "size", "data"}`), o None si no alcanza el
+        umbral o comprimirlo no ahorra espacio.
+        """
+        if payload is None or self.threshold <= 0:
+            return None
+        raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+        if len(raw) < self.threshold:
+            return None
+        dict_id = self.by_event_type.get(event_type)
+        data = self._compress(raw, self.codec, dict_id)
+        if len(data) >= len(raw):
+            return None
+        PAYLOAD_BYTES.labels("raw").inc(len(raw))
+        PAYLOAD_BYTES.labels("stored").inc(len(data))
+        return {"codec": self.codec, "dict": dict_id, "size": len(raw), "data": data}
+
+    def decompress(self, compressed: Dict[str, Any]) -> Any:
+        """
+        Raises:
+            PayloadCompressionError: Si falta el códec o el diccionario del documento.
+        """
+        dict_id = compressed.get("dict")
+        if dict_id and dict_id not in self.dictionaries:
+            raise PayloadCompressionError(f"Unknown payload dictionary {dict_id}")
+        try:
+            raw = self._decompress(bytes(compressed["data"]), compressed["codec"], dict_id)
+        except PayloadCompressionError:
+            raise
+        except Exception as e:
+            raise PayloadCompressionError(f"Payload could not be decompressed: {e}") from e
+        return json.loads(raw)
+
+    def deflate(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Documento listo para guardar: `payload` pasa a `payload_compressed` si conviene.
+        """
+        compressed = self.compress(document.get("payload"), document.get("event_type"))
+        if compressed is not None:
+            document.pop("payload")
+            document[COMPRESSED_FIELD] = compressed
+        return document
+
+    def inflate(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Documento leído con su `payload` original.
+        """
+        compressed = document.pop(COMPRESSED_FIELD, None)
+        if compressed is not None:
+            document["payload"] = self.decompress(compressed)
+        return document
+
+
+_codec: Optional[PayloadCodec] = None
+
+
+def get_payload_codec() -> PayloadCodec:
+    """
+    Códec configurado, compartido por el proceso.
+    """
+    global _codec
+    if _codec is None:
+        _codec = PayloadCodec()
+    return _codec
+
+
+async def _train(event_type: str, limit: int, size: int) -> Tuple[int, str, bytes]:
+    """
+    Entrena un diccionario con los payloads más recientes de `event_type` y lo guarda en
+    `payload_dictionaries`. Devuelve el número de ejemplos, el id y el diccionario.
+    """
+    import shieldx.db as DB
+
+    await DB.connect_to_mongo()
+    try:
+        codec = get_payload_codec()
+        db = DB.get_database()
+        cursor = DB.get_database("analytics")["events"].find(
+            {"event_type": event_type},
+            {"payload": 1, COMPRESSED_FIELD: 1},
+        ).sort("timestamp", -1).limit(limit)
+        documents = [document async for document in cursor]
+        await codec.load_dictionaries(db[DICTIONARIES_COLLECTION], documents)
+        samples = []
+        for document in documents:
+            payload = codec.inflate(document).get("payload")
+            if payload is not None:
+                samples.append(json.dumps(payload, separators=(",", ":"), default=str).encode())
+        if not samples:
+            raise SystemExit(f"No payloads found for event type {event_type!r}")
+        data = train_dictionary(samples, codec.codec, size)
+        dict_id = dictionary_id(data)
+        await db[DICTIONARIES_COLLECTION].replace_one(
+            {"_id": dict_id},
+            {
+                "_id": dict_id,
+                "event_type": event_type,
+                "codec": codec.codec,
+                "data": data,
+                "samples": len(samples),
+                "created_at": datetime.now(timezone.utc),
+            },
+            upsert=True,
+        )
+        return len(samples), dict_id, data
+    finally:
+        await DB.close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train a payload compression dictionary for an event type")
+    parser.add_argument("--event-type", required=True)
+    parser.add_argument("--samples", type=int, default=2000, help="Most recent payloads to sample")
+    parser.add_argument("--size", type=int, default=16 * 1024, help="Dictionary size in bytes")
+    parser.add_argument("--output", default=None, help="Also write the dictionary to this folder")
+    args = parser.parse_args()
+
+    codec = get_payload_codec().codec
+    samples, dict_id, data = asyncio.run(_train(args.event_type, args.samples, args.size))
+    print(f"{samples} samples -> {len(data)} byte {codec} dictionary {dict_id} stored in {DICTIONARIES_COLLECTION}")
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+        path = os.path.join(args.output, f"{args.event_type}.{dict_id}.{codec}.dict")
+        with open(path, "wb") as f:
+            f.write(data)
+        print(f"Also written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,146 @@ SHIELDX_VERSION = os.environ.get("SHIELDX_VERSION", "0.1.0")
 # ========================
 MONGODB_URI = os.environ.get("MONGODB_URI", "mongodb://localhost:27017/shieldx")
 MONGO_DATABASE_NAME = os.environ.get("MONGO_DATABASE_NAME", "shieldx")
+# Monitorización de comandos: duración por comando y buffer de operaciones lentas (ver /admin/mongo)
+SHIELDX_MONGO_MONITORING = bool(int(os.environ.get("SHIELDX_MONGO_MONITORING", "1")))
+SHIELDX_MONGO_SLOW_MS = float(os.environ.get("SHIELDX_MONGO_SLOW_MS", "100"))
+SHIELDX_MONGO_SLOW_BUFFER = int(os.environ.get("SHIELDX_MONGO_SLOW_BUFFER", "200"))
+
+
+def _mongo_profile(name: str, pool_size: int, w: str, read_preference: str, compressors: str = "") -> dict:
+    """
+    Opciones del cliente de MongoDB de un perfil. Cada opción se puede sobrescribir con
+    SHIELDX_MONGO_<PERFIL>_<OPCIÓN> (POOL_SIZE, MIN_POOL_SIZE, MAX_IDLE_MS, WAIT_QUEUE_TIMEOUT_MS,
+    W, READ_PREFERENCE, COMPRESSORS).
+    """
+    prefix = f"SHIELDX_MONGO_{name.upper()}_"
+    w = os.environ.get(prefix + "W", w)
+    return {
+        "maxPoolSize": int(os.environ.get(prefix + "POOL_SIZE", str(pool_size))),
+        "minPoolSize": int(os.environ.get(prefix + "MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.environ.get(prefix + "MAX_IDLE_MS", "60000")),
+        "waitQueueTimeoutMS": int(os.environ.get(prefix + "WAIT_QUEUE_TIMEOUT_MS", "10000")),
+        "w": int(w) if w.isdigit() else w,
+        "readPreference": os.environ.get(prefix + "READ_PREFERENCE", read_preference),
+        "compressors": os.environ.get(prefix + "COMPRESSORS", compressors),
+    }
+
+
+# Perfiles de conexión: cada uno tiene su propio cliente y pool, así la ingesta y las consultas
+# no compiten por las mismas conexiones. Cada repositorio elige su perfil (atributo PROFILE).
+SHIELDX_MONGO_PROFILES = {
+    # Índices, administración y lo que no declare perfil
+    "default": _mongo_profile("default", 100, "majority", "primary"),
+    # Triggers, reglas, tipos de evento y relaciones: escrituras confirmadas por la mayoría
+    "config": _mongo_profile("config", 20, "majority", "primary"),
+    # Escritura de eventos: confirmación del primario
+    "ingest": _mongo_profile("ingest", 100, "1", "primary"),
+    # Listados y búsquedas de eventos: se pueden servir desde secundarios
+    "analytics": _mongo_profile("analytics", 20, "1", "secondaryPreferred", "zlib"),
+}
+# Inserta eventos sin esperar confirmación (w=0). Más throughput, pero los errores, incluidos
+# los duplicados de `idempotency_key`, no llegan a la aplicación (solo queda la caché de deduplicación)
+SHIELDX_EVENTS_UNACKNOWLEDGED_INSERTS = bool(int(os.environ.get("SHIELDX_EVENTS_UNACKNOWLEDGED_INSERTS", "0")))
+
+# ========================
+# Ingesta de Eventos
+# ========================
+# Caché de deduplicación por `idempotency_key` (el índice único en Mongo es la garantía final)
+SHIELDX_DEDUP_CACHE_SIZE = int(os.environ.get("SHIELDX_DEDUP_CACHE_SIZE", "100000"))
+SHIELDX_DEDUP_CACHE_TTL = float(os.environ.get("SHIELDX_DEDUP_CACHE_TTL", "600"))
+
+# ========================
+# Caché de Repositorios
+# ========================
+# Lecturas de triggers, reglas, tipos de evento y relaciones servidas desde memoria; las
+# escrituras del proceso invalidan la caché de su colección
+SHIELDX_REPOSITORY_CACHE = bool(int(os.environ.get("SHIELDX_REPOSITORY_CACHE", "1")))
+SHIELDX_REPOSITORY_CACHE_TTL = float(os.environ.get("SHIELDX_REPOSITORY_CACHE_TTL", "30"))
+SHIELDX_REPOSITORY_CACHE_SIZE = int(os.environ.get("SHIELDX_REPOSITORY_CACHE_SIZE", "1024"))
+# Límites por colección: "COLECCIÓN=TTL/TAMAÑO" separados por comas, p. ej. "triggers=120/2048"
+SHIELDX_REPOSITORY_CACHE_LIMITS = os.environ.get("SHIELDX_REPOSITORY_CACHE_LIMITS", "")
+# Invalidación entre procesos (workers y consumidores) con change streams; requiere replica set
+SHIELDX_CACHE_INVALIDATION = bool(int(os.environ.get("SHIELDX_CACHE_INVALIDATION", "1")))
+SHIELDX_CACHE_INVALIDATION_RETRY = float(os.environ.get("SHIELDX_CACHE_INVALIDATION_RETRY", "5"))
+# Segundos que se recuerda la versión de una colección (ETag) cuando no hay invalidación por change streams
+SHIELDX_VERSION_CACHE_TTL = float(os.environ.get("SHIELDX_VERSION_CACHE_TTL", "1"))
+# Retención (s) del changelog de configuración para /sync; clientes más atrasados reciben una copia completa
+SHIELDX_CHANGELOG_RETENTION = int(os.environ.get("SHIELDX_CHANGELOG_RETENTION", str(7 * 24 * 3600)))
+# Antigüedad mínima (s) de un cambio para entrar en la versión que devuelve /sync
+SHIELDX_SYNC_SETTLE_SECONDS = float(os.environ.get("SHIELDX_SYNC_SETTLE_SECONDS", "2"))
+
+# ========================
+# Replay de Eventos
+# ========================
+# Eventos por segundo por defecto de un replay (entre todas sus particiones)
+SHIELDX_REPLAY_DEFAULT_RATE = float(os.environ.get("SHIELDX_REPLAY_DEFAULT_RATE", "500"))
+# Segundos sin checkpoint tras los que otro proceso puede reclamar un replay en curso
+SHIELDX_REPLAY_LEASE_SECONDS = float(os.environ.get("SHIELDX_REPLAY_LEASE_SECONDS", "60"))
+# Al arrancar la API, reanudar los replays interrumpidos
+SHIELDX_REPLAY_AUTO_RESUME = bool(int(os.environ.get("SHIELDX_REPLAY_AUTO_RESUME", "1")))
+
+# ========================
+# Eventos en Vivo
+# ========================
+# GET /events/live: un change stream por proceso repartido entre los suscriptores (requiere replica set)
+SHIELDX_LIVE_EVENTS = bool(int(os.environ.get("SHIELDX_LIVE_EVENTS", "1")))
+# Eventos pendientes por suscriptor; si se llena se descartan los más antiguos
+SHIELDX_LIVE_BUFFER_SIZE = int(os.environ.get("SHIELDX_LIVE_BUFFER_SIZE", "256"))
+SHIELDX_LIVE_MAX_SUBSCRIBERS = int(os.environ.get("SHIELDX_LIVE_MAX_SUBSCRIBERS", "1000"))
+# Segundos entre comentarios keep-alive cuando no llegan eventos
+SHIELDX_LIVE_HEARTBEAT = float(os.environ.get("SHIELDX_LIVE_HEARTBEAT", "15"))
+SHIELDX_LIVE_RETRY = float(os.environ.get("SHIELDX_LIVE_RETRY", "5"))
+
+# ========================
+# Payloads Grandes
+# ========================
+# Payloads cuyo JSON ocupa al menos estos bytes se guardan en el almacén de objetos y el
+# evento conserva solo una referencia con su digest (0: siempre en el documento)
+SHIELDX_PAYLOAD_OFFLOAD_BYTES = int(os.environ.get("SHIELDX_PAYLOAD_OFFLOAD_BYTES", str(1024 * 1024)))
+# Almacén de objetos: "local" (sistema de archivos compartido por la API y los consumidores)
+# o "mictlanx". Vacío: sin almacén, los payloads se quedan siempre en el documento
+SHIELDX_BLOBSTORE = os.environ.get("SHIELDX_BLOBSTORE", "")
+SHIELDX_BLOBSTORE_PATH = os.environ.get("SHIELDX_BLOBSTORE_PATH", "/blobs")
+SHIELDX_MICTLANX_ROUTERS = os.environ.get("SHIELDX_MICTLANX_ROUTERS", "mictlanx-router-0:localhost:60666")
+SHIELDX_MICTLANX_PROTOCOL = os.environ.get("SHIELDX_MICTLANX_PROTOCOL", "http")
+SHIELDX_MICTLANX_BUCKET_ID = os.environ.get("SHIELDX_MICTLANX_BUCKET_ID", "shieldx-payloads")
+# Payloads cuyo JSON ocupa al menos estos bytes se guardan comprimidos (0: sin compresión)
+SHIELDX_PAYLOAD_COMPRESSION_BYTES = int(os.environ.get("SHIELDX_PAYLOAD_COMPRESSION_BYTES", "4096"))
+# Códec: "zlib" o "zstd" (requiere el extra `compression`, paquete zstandard; si no está se usa zlib)
+SHIELDX_PAYLOAD_CODEC = os.environ.get("SHIELDX_PAYLOAD_CODEC", "zlib")
+SHIELDX_PAYLOAD_COMPRESSION_LEVEL = int(os.environ.get("SHIELDX_PAYLOAD_COMPRESSION_LEVEL", "3"))
+# Carpeta adicional con diccionarios por tipo de evento; los de `python -m shieldx.compression`
+# se guardan en Mongo (`payload_dictionaries`) y los procesos los cargan de ahí
+SHIELDX_PAYLOAD_DICTIONARY_PATH = os.environ.get("SHIELDX_PAYLOAD_DICTIONARY_PATH", "")
+# Segundos entre búsquedas de diccionarios nuevos para comprimir
+SHIELDX_PAYLOAD_DICTIONARY_REFRESH = float(os.environ.get("SHIELDX_PAYLOAD_DICTIONARY_REFRESH", "300"))
+
+# ========================
+# Administración
+# ========================
+# Token exigido en el header X-Admin-Token por los endpoints /admin (vacío: endpoints deshabilitados)
+SHIELDX_ADMIN_TOKEN = os.environ.get("SHIELDX_ADMIN_TOKEN", "")
+
+# Duración máxima (s) de una sesión de perfilado bajo demanda (POST /admin/profile)
+SHIELDX_PROFILE_MAX_SECONDS = float(os.environ.get("SHIELDX_PROFILE_MAX_SECONDS", "60"))
+
+# ========================
+# Métricas
+# ========================
+# Monitor del event loop: lag de planificación, tareas pendientes y callbacks que lo bloquean
+SHIELDX_LOOP_MONITOR = bool(int(os.environ.get("SHIELDX_LOOP_MONITOR", "1")))
+SHIELDX_LOOP_MONITOR_INTERVAL = float(os.environ.get("SHIELDX_LOOP_MONITOR_INTERVAL", "0.5"))
+SHIELDX_LOOP_BLOCKED_MS = float(os.environ.get("SHIELDX_LOOP_BLOCKED_MS", "100"))
+# Puerto del endpoint /metrics del consumidor (0 lo desactiva; la API lo sirve en su propio puerto)
+SHIELDX_CONSUMER_METRICS_PORT = int(os.environ.get("SHIELDX_CONSUMER_METRICS_PORT", "0"))
+
+# ========================
+# Trazas
+# ========================
+# Tramos por capa (controlador, servicio, repositorio) con un trace id por petición o mensaje
+SHIELDX_TRACING = bool(int(os.environ.get("SHIELDX_TRACING", "1")))
+# Trazas terminadas que se retienen en memoria para /admin/traces
+SHIELDX_TRACE_BUFFER = int(os.environ.get("SHIELDX_TRACE_BUFFER", "1000"))
 
 # ========================
 # Configuración de Logs
@@ -26,6 +166,20 @@ LOG_ROTATION_INTERVAL = int(os.environ.get("LOG_ROTATION_INTERVAL", "10"))
 LOG_TO_FILE = bool(int(os.environ.get("LOG_TO_FILE", "1")))
 LOG_ERROR_FILE = bool(int(os.environ.get("LOG_ERROR_FILE", "1")))
 SHIELDX_DEBUG = bool(int(os.environ.get("SHIELDX_DEBUG", "1")))
+# Formato JSON: "compact" (una línea por registro) o "pretty" (indentado, para desarrollo)
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "compact")
+# Muestreo por clave de evento: "CLAVE=1/N" (uno de cada N) o "CLAVE=X/s" (máximo X por segundo), separados por comas
+LOG_SAMPLING = os.environ.get(
+    "LOG_SAMPLING",
+    "EVENT.CREATED=100/s,API.EVENT.CREATED=100/s,BROKER.MESSAGE.RECEIVED=100/s",
+)
+# Cada cuántos segundos se emite el resumen LOG.SAMPLING.SUMMARY con los registros suprimidos
+LOG_SAMPLING_SUMMARY_INTERVAL = float(os.environ.get("LOG_SAMPLING_SUMMARY_INTERVAL", "60"))
+# Escritura asíncrona: el hilo de la petición solo encola y un hilo de fondo formatea y escribe
+LOG_ASYNC = bool(int(os.environ.get("LOG_ASYNC", "1")))
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+LOG_QUEUE_POLICY = os.environ.get("LOG_QUEUE_POLICY", "drop")  # drop | block
+LOG_QUEUE_BLOCK_TIMEOUT = float(os.environ.get("LOG_QUEUE_BLOCK_TIMEOUT", "1.0"))
 
 # ========================
 # Contacto de la API
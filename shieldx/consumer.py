@@ -1,13 +1,32 @@
 import os
 from shieldx.broker import AsyncRabbitMQService
-from shieldx.db import connect_to_mongo,close_mongo_connection
+from shieldx.broker.sharding import resolve_consumer_shards
+from shieldx.db import connect_to_mongo,close_mongo_connection, get_database
+from shieldx.cache.invalidation import InvalidationBus
+from shieldx.blobstore import check_blob_store
+from shieldx.metrics import start_metrics_server
+from shieldx.metrics.loop import LoopMonitor
+from shieldx import config
 import asyncio
 import time as T
 
 async def main():
     await connect_to_mongo()
-    queues_to_subscribe = os.environ.get("QUEUES", "s_security").split(",")
-    service = AsyncRabbitMQService(queues=queues_to_subscribe)
+    await check_blob_store()
+    if config.SHIELDX_CONSUMER_METRICS_PORT:
+        # Expose /metrics (throughput, lag, Mongo latency) for Prometheus
+        await start_metrics_server(port=config.SHIELDX_CONSUMER_METRICS_PORT)
+    if config.SHIELDX_LOOP_MONITOR:
+        LoopMonitor().start()
+    if config.SHIELDX_CACHE_INVALIDATION:
+        InvalidationBus(get_database()).start()
+    # Sharded mode: SHIELDX_CONSUMER_SHARDS or SHIELDX_WORKER_INDEX/SHIELDX_WORKER_COUNT
+    shards = resolve_consumer_shards()
+    if shards:
+        service = AsyncRabbitMQService(shards=shards)
+    else:
+        queues_to_subscribe = os.environ.get("QUEUES", "s_security").split(",")
+        service = AsyncRabbitMQService(queues=queues_to_subscribe)
     await service.connect()
     # Start consuming messages
     try:
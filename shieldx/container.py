@@ -0,0 +1,129 @@
+from typing import Dict, Optional
+import shieldx.db as DB
+from shieldx.blobstore import get_blob_store
+from shieldx.repositories import (
+    EventTypeRepository,
+    EventsRepository,
+    EventsTriggersRepository,
+    RuleRepository,
+    RulesTriggerRepository,
+    TriggersRepository,
+    TriggersTriggersRepository,
+    SyncRepository,
+    ReplayRepository,
+)
+from shieldx.services import (
+    EventsService,
+    EventTypeService,
+    EventsTriggersService,
+    RuleService,
+    RulesTriggerService,
+    TriggerService,
+    TriggersTriggersService,
+    SyncService,
+    TriggerResolutionService,
+    ReplayService,
+)
+
+
+class Container:
+    """
+    Repositorios y servicios con alcance de aplicación.
+
+    Se construye una vez (en el `lifespan` de la API o al arrancar el consumidor) y todas
+    las peticiones comparten las mismas instancias, de modo que las cachés y recursos que
+    guarden sobreviven entre peticiones.
+
+    Atributos:
+        client: Cliente de MongoDB con el que se construyó el contenedor.
+    """
+
+    def __init__(self, db, databases: Optional[Dict[str, object]] = None):
+        """
+        Args:
+            db (AsyncIOMotorDatabase): Base de datos de ShieldX (perfil por defecto).
+            databases (dict | None): Base de datos por perfil de conexión. Cada repositorio
+                usa la de su `PROFILE`; los perfiles ausentes caen en `db`.
+        """
+        self.client = db.client
+        self.db = db
+        self.databases = databases or {}
+
+        # Repositorios
+        self.event_type_repository = self._repository(EventTypeRepository)
+        self.events_repository = EventsRepository(
+            self._database(EventsRepository.PROFILE),
+            self._database(EventsRepository.READ_PROFILE),
+        )
+        self.events_triggers_repository = self._repository(EventsTriggersRepository)
+        self.rule_repository = self._repository(RuleRepository)
+        self.rules_trigger_repository = self._repository(RulesTriggerRepository)
+        self.triggers_repository = self._repository(TriggersRepository)
+        self.triggers_triggers_repository = self._repository(TriggersTriggersRepository)
+        self.sync_repository = self._repository(SyncRepository)
+        self.replay_repository = ReplayRepository(
+            self._database(ReplayRepository.PROFILE),
+            self._database(ReplayRepository.READ_PROFILE),
+        )
+
+        # Servicios
+        self.events_service = EventsService(
+            self.events_repository,
+            self.event_type_repository,
+            blob_store=get_blob_store(),
+        )
+        self.event_type_service = EventTypeService(self.event_type_repository)
+        self.events_triggers_service = EventsTriggersService(self.events_triggers_repository)
+        self.rule_service = RuleService(self.rule_repository)
+        self.rules_trigger_service = RulesTriggerService(self.rules_trigger_repository)
+        self.trigger_service = TriggerService(self.triggers_repository)
+        self.triggers_triggers_service = TriggersTriggersService(self.triggers_triggers_repository)
+        self.sync_service = SyncService(self.sync_repository)
+        self.trigger_resolution_service = TriggerResolutionService(
+            self.event_type_repository,
+            self.events_triggers_repository,
+            self.triggers_triggers_repository,
+            self.rules_trigger_repository,
+        )
+        self.replay_service = ReplayService(self.replay_repository, self.trigger_resolution_service)
+
+    def _database(self, profile: str):
+        return self.databases.get(profile, self.db)
+
+    def _repository(self, repository_cls):
+        return repository_cls(self._database(repository_cls.PROFILE))
+
+
+_container: Optional[Container] = None
+
+
+def build_container() -> Container:
+    """
+    Construye el contenedor con la conexión actual a MongoDB. Se llama tras `connect_to_mongo`.
+    """
+    global _container
+    db = DB.get_database()
+    if db is None:
+        raise RuntimeError("MongoDB is not connected: call connect_to_mongo() before building the container")
+    _container = Container(db, DB.get_databases())
+    return _container
+
+
+def get_container() -> Container:
+    """
+    Dependencia de FastAPI que entrega el contenedor compartido.
+
+    Si aún no existe, o si el cliente de MongoDB cambió desde que se construyó (reconexión,
+    o clientes de prueba que no ejecutan el `lifespan`), se reconstruye.
+    """
+    if _container is None or _container.client is not DB.client:
+        return build_container()
+    return _container
+
+
+def reset_container():
+    """
+    Descarta el contenedor (al cerrar la conexión a MongoDB).
+    """
+    global _container
+    _container = None
@@ -5,4 +5,7 @@ from shieldx.controllers.events_triggers_controller import router as events_trig
 from shieldx.controllers.triggers_triggers_controller import router as triggers_triggers_router
 from shieldx.controllers.rules_trigger_controller import router as rules_trigger_router
 from shieldx.controllers.rules_controller import router as rules_router
+from shieldx.controllers.sync_controller import router as sync_router
 
+from shieldx.controllers.metrics_controller import router as metrics_router
+from shieldx.controllers.admin_controller import router as admin_router
@@ -0,0 +1,326 @@
+import asyncio
+import hmac
+import threading
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from shieldx.db import get_database
+from shieldx.db.monitoring import COMMAND_MONITOR, explain_command, to_json
+from shieldx.log.logger_config import get_logger
+from shieldx.tracing import STORE as TRACES
+from shieldx.metrics.loop import get_loop_monitor
+from shieldx.cache.repository import invalidate, invalidate_all, repository_cache_stats
+from shieldx.cache.invalidation import get_invalidation_bus
+from shieldx.live import get_live_hub
+from shieldx.metrics.profiler import SamplingProfiler, ProfilerBusy
+from shieldx.container import Container, get_container
+from shieldx.models import ReplayRequestModel
+from shieldx import config
+import time as T
+
+L = get_logger(__name__)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None, alias="X-Admin-Token")):
+    """
+    Exige el token de administración en el header `X-Admin-Token`.
+    Si `SHIELDX_ADMIN_TOKEN` no está configurado, los endpoints de administración quedan deshabilitados.
+    """
+    if not config.SHIELDX_ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin endpoints are disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, config.SHIELDX_ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+@router.get(
+    "/mongo/commands",
+    status_code=status.HTTP_200_OK,
+    summary="Duración acumulada por comando de MongoDB",
+    description="Devuelve, por comando y colección, el número de ejecuciones, fallos, tiempo total, medio y máximo."
+)
+async def get_mongo_commands():
+    return COMMAND_MONITOR.command_stats()
+
+
+@router.get(
+    "/mongo/slow",
+    status_code=status.HTTP_200_OK,
+    summary="Operaciones lentas de MongoDB",
+    description="Devuelve las operaciones más lentas retenidas en el buffer circular, con su filtro."
+)
+async def get_mongo_slow_operations(
+    command: Optional[str] = Query(None, description="Filtrar por comando (find, aggregate, update...)"),
+    collection: Optional[str] = Query(None, description="Filtrar por colección"),
+    min_ms: float = Query(0.0, ge=0, description="Duración mínima en milisegundos"),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    return {
+        "slow_ms": COMMAND_MONITOR.slow_ms,
+        "capacity": COMMAND_MONITOR.capacity,
+        "operations": COMMAND_MONITOR.slow_operations(command, collection, min_ms, limit),
+    }
+
+
+@router.post(
+    "/mongo/slow/{op_id}/explain",
+    status_code=status.HTTP_200_OK,
+    summary="Explicar una operación lenta",
+    description="Ejecuta `explain` sobre una operación lenta retenida y devuelve el plan de ejecución."
+)
+async def explain_mongo_slow_operation(
+    op_id: int,
+    verbosity: str = Query("queryPlanner", pattern="^(queryPlanner|executionStats|allPlansExecution)$"),
+):
+    t1 = T.time()
+    db = get_database()
+    op = COMMAND_MONITOR.get_slow_operation(op_id)
+    if op is None:
+        raise HTTPException(status_code=404, detail="Slow operation not found")
+    command = explain_command(op)
+    if command is None:
+        raise HTTPException(status_code=400, detail=f"Command '{op['command']}' cannot be explained")
+    plan = await db.client[op["database"]].command({"explain": command, "verbosity": verbosity})
+    L.info({
+        "event": "API.ADMIN.MONGO.EXPLAIN",
+        "op_id": op_id,
+        "command": op["command"],
+        "collection": op["collection"],
+        "time": T.time() - t1
+    })
+    return {
+        "operation": {**op, "query": to_json(op["query"])},
+        "plan": to_json(plan, max_chars=None),
+    }
+
+
+@router.delete(
+    "/mongo/slow",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Vaciar la monitorización de MongoDB",
+    description="Vacía el buffer de operaciones lentas y los acumulados por comando."
+)
+async def clear_mongo_monitoring():
+    COMMAND_MONITOR.clear()
+
+
+@router.get(
+    "/traces",
+    status_code=status.HTTP_200_OK,
+    summary="Trazas recientes",
+    description="Devuelve las trazas retenidas (de la más lenta a la más rápida) con sus tramos por capa."
+)
+async def get_traces(
+    name: Optional[str] = Query(None, description="Nombre de la traza, p. ej. 'POST /api/v1/events'"),
+    min_ms: float = Query(0.0, ge=0, description="Duración mínima en milisegundos"),
+    limit: int = Query(50, ge=1, le=1000),
+    spans: bool = Query(True, description="Incluir los tramos de cada traza"),
+):
+    return [trace.to_dict(spans=spans) for trace in TRACES.find(name, min_ms, limit)]
+
+
+@router.get(
+    "/traces/summary",
+    status_code=status.HTTP_200_OK,
+    summary="Resumen de trazas por endpoint",
+    description="Por endpoint o cola: número de trazas, duración media y máxima y tiempo propio medio por capa."
+)
+async def get_traces_summary():
+    return TRACES.summary()
+
+
+@router.get(
+    "/traces/{trace_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Obtener una traza",
+    description="Devuelve una traza retenida con todos sus tramos."
+)
+async def get_trace(trace_id: str):
+    trace = TRACES.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace.to_dict()
+
+
+@router.delete(
+    "/traces",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Vaciar las trazas",
+    description="Descarta todas las trazas retenidas."
+)
+async def clear_traces():
+    TRACES.clear()
+
+
+@router.get(
+    "/caches",
+    status_code=status.HTTP_200_OK,
+    summary="Estado de las cachés de repositorio",
+    description=(
+        "Devuelve, por colección, las entradas retenidas, aciertos, fallos, desalojos y tasa de aciertos, "
+        "y el estado de la invalidación por change streams."
+    )
+)
+async def get_repository_caches():
+    bus = get_invalidation_bus()
+    return {
+        "caches": repository_cache_stats(),
+        "invalidation": bus.stats() if bus is not None else None,
+    }
+
+
+@router.delete(
+    "/caches",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Vaciar las cachés de repositorio",
+    description="Descarta las lecturas cacheadas de una colección o, sin `collection`, de todas."
+)
+async def clear_repository_caches(
+    collection: Optional[str] = Query(None, description="Colección a invalidar"),
+):
+    if collection is None:
+        invalidate_all()
+    else:
+        invalidate(collection)
+
+
+@router.get(
+    "/live",
+    status_code=status.HTTP_200_OK,
+    summary="Estado de los eventos en vivo",
+    description="Devuelve los suscriptores conectados y los eventos recibidos, entregados y descartados."
+)
+async def get_live_status():
+    hub = get_live_hub()
+    if hub is None:
+        raise HTTPException(status_code=404, detail="Live events are disabled")
+    return hub.stats()
+
+
+@router.get(
+    "/loop",
+    status_code=status.HTTP_200_OK,
+    summary="Estado del event loop",
+    description="Devuelve el lag de planificación, las tareas pendientes y los bloqueos recientes con su pila."
+)
+async def get_loop_status():
+    monitor = get_loop_monitor()
+    if monitor is None:
+        raise HTTPException(status_code=404, detail="Loop monitor is not running")
+    return monitor.stats()
+
+
+@router.post(
+    "/profile",
+    status_code=status.HTTP_200_OK,
+    response_class=PlainTextResponse,
+    summary="Perfilar el proceso por muestreo",
+    description=(
+        "Muestrea las pilas del proceso durante `seconds` segundos y devuelve un archivo "
+        "collapsed-stacks compatible con flamegraph.pl / speedscope. Solo una sesión a la vez."
+    )
+)
+async def profile_process(
+    seconds: float = Query(10.0, gt=0, description="Duración de la sesión en segundos"),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="Milisegundos entre muestras"),
+    loop_only: bool = Query(False, description="Muestrear solo el hilo del event loop"),
+):
+    if seconds > config.SHIELDX_PROFILE_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be <= {config.SHIELDX_PROFILE_MAX_SECONDS}")
+    profiler = SamplingProfiler(
+        interval=interval_ms / 1e3,
+        thread_ids={threading.get_ident()} if loop_only else None,
+    )
+    try:
+        profiler.start()
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    try:
+        # The loop keeps serving requests while the sampler thread runs
+        await asyncio.sleep(seconds)
+    finally:
+        # stop() joins the sampler thread: waiting for it on the loop would show up in the profile
+        await asyncio.to_thread(profiler.stop)
+    L.info({
+        "event": "API.ADMIN.PROFILE",
+        "seconds": profiler.duration,
+        "samples": profiler.samples,
+        "stacks": len(profiler.stacks),
+    })
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"X-Profile-Samples": str(profiler.samples), "X-Profile-Seconds": f"{profiler.duration:.3f}"},
+    )
+
+
+@router.post(
+    "/replays",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Iniciar un replay de eventos",
+    description=(
+        "Vuelve a pasar los eventos de un rango de tiempo por la resolución de triggers y reglas, "
+        "en particiones paralelas y a un ritmo limitado. Corre en segundo plano con checkpoints."
+    )
+)
+async def start_replay(request: ReplayRequestModel, container: Container = Depends(get_container)):
+    return await container.replay_service.start_replay(request)
+
+
+@router.get(
+    "/replays",
+    status_code=status.HTTP_200_OK,
+    summary="Listar replays",
+    description="Devuelve los replays más recientes con su estado y progreso."
+)
+async def list_replays(
+    limit: int = Query(50, ge=1, le=500, description="Máximo de replays"),
+    container: Container = Depends(get_container),
+):
+    return await container.replay_service.list_replays(limit)
+
+
+@router.get(
+    "/replays/{replay_id}",
+    status_code=status.HTTP_200_OK,
+    summary="Estado de un replay",
+    description="Devuelve el estado, el progreso y el checkpoint de cada partición de un replay."
+)
+async def get_replay(replay_id: str, container: Container = Depends(get_container)):
+    return await container.replay_service.get_replay(replay_id)
+
+
+@router.get(
+    "/replays/{replay_id}/results",
+    status_code=status.HTTP_200_OK,
+    summary="Coincidencias de un replay",
+    description="Devuelve los eventos del replay con los triggers y reglas que les aplican."
+)
+async def get_replay_results(
+    replay_id: str,
+    limit: int = Query(100, ge=1, le=1000, description="Máximo de resultados"),
+    skip: int = Query(0, ge=0, description="Resultados a omitir"),
+    container: Container = Depends(get_container),
+):
+    return await container.replay_service.list_matches(replay_id, limit, skip)
+
+
+@router.post(
+    "/replays/{replay_id}/resume",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Reanudar un replay",
+    description="Reanuda un replay cancelado, fallido o interrumpido desde su último checkpoint."
+)
+async def resume_replay(replay_id: str, container: Container = Depends(get_container)):
+    return await container.replay_service.resume_replay(replay_id)
+
+
+@router.post(
+    "/replays/{replay_id}/cancel",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Cancelar un replay",
+    description="Detiene un replay; conserva su checkpoint para poder reanudarlo."
+)
+async def cancel_replay(replay_id: str, container: Container = Depends(get_container)):
+    await container.replay_service.cancel_replay(replay_id)
@@ -1,8 +1,8 @@
 from fastapi import APIRouter, Depends, status
 from shieldx.models import EventTypeModel
-from shieldx.repositories import EventTypeRepository
 from shieldx.services import EventTypeService
-from shieldx.db import get_database
+from shieldx.container import Container, get_container
+from shieldx.cache.versions import conditional_get
 from shieldx.log.logger_config import get_logger
 import shieldx_core.dtos as DTOS
 from typing import List
@@ -11,9 +11,8 @@ import time as T
 router = APIRouter()
 L = get_logger(__name__)
 
-def get_service(db=Depends(get_database)):
-    repository = EventTypeRepository(db)
-    return EventTypeService(repository)
+def get_service(container: Container = Depends(get_container)):
+    return container.event_type_service
 
 
 @router.post(
@@ -36,6 +35,7 @@ async def create_event_type(data: DTOS.EventTypeCreateDTO, service: EventTypeSer
 
 @router.get(
     "/event-types",
+    dependencies=[conditional_get("event_types")],
     response_model=List[DTOS.EventTypeResponseDTO],
     status_code=status.HTTP_200_OK,
     summary="Listar tipos de evento",
@@ -45,7 +45,7 @@ async def list_event_types(service: EventTypeService = Depends(get_service)):
     t1 = T.time()
     event_types = await service.list_event_types()
     # Log de consulta de lista
-    L.debug({
+    L.debug(lambda: {
         "event": "API.EVENT_TYPE.LISTED",
         "count": len(event_types),
         "time": T.time() - t1
@@ -54,6 +54,7 @@ async def list_event_types(service: EventTypeService = Depends(get_service)):
 
 @router.get(
     "/event-types/{type_id}",
+    dependencies=[conditional_get("event_types")],
     response_model=DTOS.EventTypeResponseDTO,
     status_code=status.HTTP_200_OK,
     summary="Obtener tipo de evento por ID",
@@ -63,7 +64,7 @@ async def get_event_type(type_id: str, service: EventTypeService = Depends(get_s
     t1 = T.time()
     event_type = await service.get_event_type(type_id)
     # Log de consulta individual
-    L.debug({
+    L.debug(lambda: {
         "event": "API.EVENT_TYPE.FETCHED",
         "event_type_id": type_id,
         "time": T.time() - t1
@@ -1,25 +1,44 @@
-from fastapi import APIRouter, HTTPException, Depends, Query, status
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Request, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Optional
 from shieldx.models import EventModel
 from shieldx.services import EventsService
-from shieldx.repositories import EventsRepository
-from shieldx.repositories import EventTypeRepository
-from shieldx.db import get_database
+from shieldx.services.events_service import parse_fields
+from shieldx.container import Container, get_container
+from shieldx.live import LiveUnavailable, Subscription, get_live_hub
 from shieldx.log.logger_config import get_logger
+from shieldx import config
 import time as T
 import shieldx_core.dtos as DTOS
 
 router = APIRouter()
 L = get_logger(__name__)
 
-def get_events_service(db=Depends(get_database)) -> EventsService:
+def get_events_service(container: Container = Depends(get_container)) -> EventsService:
     """
-    Inicializa EventsService con acceso a EventsRepository y EventTypeRepository
+    Entrega el EventsService compartido, con acceso a EventsRepository y EventTypeRepository
     para validar existencia antes de crear eventos.
     """
-    event_repo = EventsRepository(db["events"])
-    event_type_repo = EventTypeRepository(db)
-    return EventsService(event_repo, event_type_repo)
+    return container.events_service
+
+def get_event_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Campos a devolver separados por comas (p. ej. `event_id,timestamp`); sin él, el evento completo",
+    ),
+) -> Optional[List[str]]:
+    """
+    Campos pedidos con `fields`. Con proyección la respuesta contiene solo esos campos
+    (más `event_id`) y no se lee el `payload` salvo que se pida.
+    """
+    return parse_fields(fields)
+
+def _projected_response(events) -> JSONResponse:
+    # Partial documents do not satisfy EventResponseDTO: serialize them as they are
+    return JSONResponse(jsonable_encoder(events))
 
 @router.get("/events", response_model=List[DTOS.EventResponseDTO], summary="Listar eventos",
     description="Recupera una lista de eventos registrados en el sistema...")
@@ -29,14 +48,20 @@ async def get_events(
     microservice_id: Optional[str] = Query(None, description="Filtrar por microservice_id"),
     function_id: Optional[str] = Query(None, description="Filtrar por function_id"),
     limit: int = Query(100, description="Cantidad máxima de eventos a devolver"),
-    skip: int = Query(0, description="Número de eventos a omitir para paginación")
+    skip: int = Query(0, description="Número de eventos a omitir para paginación"),
+    fields: Optional[List[str]] = Depends(get_event_fields),
 ):
     t1 = T.time()
+    if fields is not None:
+        return _projected_response(await events_service.get_event_fields_filtered(
+            fields, service_id=service_id, microservice_id=microservice_id,
+            function_id=function_id, limit=limit, skip=skip
+        ))
     events = await events_service.get_events_filtered(
         service_id=service_id, microservice_id=microservice_id,
         function_id=function_id, limit=limit, skip=skip
     )
-    L.debug({
+    L.debug(lambda: {
         "event": "API.EVENT.LIST.FILTERED",
         "filters": {"service_id": service_id, 
                     "microservice_id": microservice_id, 
@@ -51,10 +76,16 @@ async def get_events(
             response_model=List[DTOS.EventResponseDTO], 
             summary="Buscar eventos por service_id",
             description="Recupera todos los eventos asociados al `service_id` especificado.")
-async def get_events_by_service(service_id: str, events_service: EventsService = Depends(get_events_service)):
+async def get_events_by_service(
+    service_id: str,
+    events_service: EventsService = Depends(get_events_service),
+    fields: Optional[List[str]] = Depends(get_event_fields),
+):
     t1 = T.time()
+    if fields is not None:
+        return _projected_response(await events_service.get_event_fields_filtered(fields, service_id=service_id))
     events = await events_service.get_events_filtered(service_id=service_id)
-    L.debug({
+    L.debug(lambda: {
         "event": "API.EVENT.LIST.BY_SERVICE",
         "service_id": service_id,
         "count": len(events),
@@ -66,10 +97,16 @@ async def get_events_by_service(service_id: str, events_service: EventsService =
             response_model=List[DTOS.EventResponseDTO], 
             summary="Buscar eventos por microservice_id",
             description="Recupera todos los eventos asociados al `microservice_id` especificado.")
-async def get_events_by_microservice(microservice_id: str, events_service: EventsService = Depends(get_events_service)):
+async def get_events_by_microservice(
+    microservice_id: str,
+    events_service: EventsService = Depends(get_events_service),
+    fields: Optional[List[str]] = Depends(get_event_fields),
+):
     t1 = T.time()
+    if fields is not None:
+        return _projected_response(await events_service.get_event_fields_filtered(fields, microservice_id=microservice_id))
     events = await events_service.get_events_filtered(microservice_id=microservice_id)
-    L.debug({
+    L.debug(lambda: {
         "event": "API.EVENT.LIST.BY_MICROSERVICE",
         "microservice_id": microservice_id,
         "count": len(events),
@@ -82,10 +119,16 @@ async def get_events_by_microservice(microservice_id: str, events_service: Event
             response_model=List[DTOS.EventResponseDTO], 
             summary="Buscar eventos por function_id",
             description="Recupera todos los eventos asociados al `function_id` especificado.")
-async def get_events_by_function(function_id: str, events_service: EventsService = Depends(get_events_service)):
+async def get_events_by_function(
+    function_id: str,
+    events_service: EventsService = Depends(get_events_service),
+    fields: Optional[List[str]] = Depends(get_event_fields),
+):
     t1 = T.time()
+    if fields is not None:
+        return _projected_response(await events_service.get_event_fields_filtered(fields, function_id=function_id))
     events = await events_service.get_events_filtered(function_id=function_id)
-    L.debug({
+    L.debug(lambda: {
         "event": "API.EVENT.LIST.BY_FUNCTION",
         "function_id": function_id,
         "count": len(events),
@@ -94,12 +137,90 @@ async def get_events_by_function(function_id: str, events_service: EventsService
     return [DTOS.EventResponseDTO.model_validate(e) for e in events]
 
 
+async def _live_frames(request: Request, subscription: Subscription, heartbeat: float):
+    """
+    Frames SSE de una suscripción: un `event: event` por evento, `event: dropped` cuando se
+    descartaron eventos por no consumir a tiempo y comentarios keep-alive mientras no hay tráfico.
+    """
+    hub = get_live_hub()
+    reported = 0
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                item = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if subscription.dropped > reported:
+                yield f"event: dropped\ndata: {json.dumps({'dropped': subscription.dropped - reported})}\n\n"
+                reported = subscription.dropped
+            if item is None:
+                yield "event: closed\ndata: {}\n\n"
+                break
+            yield f"event: event\ndata: {item}\n\n"
+    finally:
+        if hub is not None:
+            hub.unsubscribe(subscription)
+
+
+@router.get("/events/live",
+            response_class=StreamingResponse,
+            summary="Eventos en vivo (SSE)",
+            description=(
+                "Entrega como Server-Sent Events los eventos que se insertan a partir de la conexión, "
+                "filtrados en el servidor. Todas las suscripciones del proceso comparten un único change stream; "
+                "si un cliente no consume a tiempo se descartan sus eventos más antiguos (`event: dropped`)."
+            ))
+async def live_events(
+    request: Request,
+    service_id: Optional[str] = Query(None, description="Filtrar por service_id"),
+    microservice_id: Optional[str] = Query(None, description="Filtrar por microservice_id"),
+    function_id: Optional[str] = Query(None, description="Filtrar por function_id"),
+    event_type: Optional[str] = Query(None, description="Filtrar por event_type"),
+):
+    hub = get_live_hub()
+    if hub is None:
+        raise HTTPException(status_code=503, detail="Live events are disabled")
+    filters = {
+        "service_id": service_id,
+        "microservice_id": microservice_id,
+        "function_id": function_id,
+        "event_type": event_type,
+    }
+    try:
+        subscription = hub.subscribe(filters)
+    except LiveUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    L.debug(lambda: {
+        "event": "API.EVENT.LIVE.SUBSCRIBED",
+        "filters": subscription.filters,
+        "subscribers": len(hub.subscribers),
+    })
+    return StreamingResponse(
+        _live_frames(request, subscription, config.SHIELDX_LIVE_HEARTBEAT),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/events/{event_id}", 
             response_model=DTOS.EventResponseDTO, 
             summary="Obtener evento por ID",
             description="Recupera los detalles de un evento específico utilizando su `event_id`.")
-async def get_event_by_id(event_id: str, events_service: EventsService = Depends(get_events_service)):
+async def get_event_by_id(
+    event_id: str,
+    events_service: EventsService = Depends(get_events_service),
+    fields: Optional[List[str]] = Depends(get_event_fields),
+):
     t1 = T.time()
+    if fields is not None:
+        event = await events_service.get_event_fields_by_id(event_id, fields)
+        if event is None:
+            raise HTTPException(status_code=404, detail="Evento no encontrado")
+        return _projected_response(event)
     event = await events_service.get_event_by_id(event_id)
     if not event:
         L.warning({
@@ -108,7 +229,7 @@ async def get_event_by_id(event_id: str, events_service: EventsService = Depends
             "time": T.time() - t1
         })
         raise HTTPException(status_code=404, detail="Evento no encontrado")
-    L.debug({
+    L.debug(lambda: {
         "event": "API.EVENT.FETCHED",
         "event_id": str(event.event_id),
         "time": T.time() - t1
@@ -116,13 +237,32 @@ async def get_event_by_id(event_id: str, events_service: EventsService = Depends
     return DTOS.EventResponseDTO.model_validate(event.model_dump(by_alias=True))
 
 
+@router.get("/events/{event_id}/payload",
+            summary="Obtener el payload de un evento",
+            description=(
+                "Devuelve el payload del evento. Los payloads grandes se guardan en el almacén de objetos "
+                "(el evento solo conserva `payload_ref`) y se descargan aquí, verificando su digest."
+            ))
+async def get_event_payload(event_id: str, events_service: EventsService = Depends(get_events_service)):
+    return JSONResponse(jsonable_encoder(await events_service.get_event_payload(event_id)))
+
+
 @router.post("/events", 
             response_model=DTOS.MessageWithIDDTO, 
             summary="Crear un nuevo evento",
-            description="Registra un nuevo evento en la base de datos utilizando el esquema definido en el modelo `EventModel`.",
+            description=(
+                "Registra un nuevo evento en la base de datos utilizando el esquema definido en el modelo `EventModel`. "
+                "Si se envía el encabezado `Idempotency-Key`, los reintentos con la misma llave devuelven el evento original."
+            ),
             status_code=status.HTTP_201_CREATED)
-async def create_event(event: DTOS.EventCreateDTO, events_service: EventsService = Depends(get_events_service)):
+async def create_event(
+    event: DTOS.EventCreateDTO,
+    events_service: EventsService = Depends(get_events_service),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", description="Llave de idempotencia del cliente"),
+):
     t1 = T.time()
+    if idempotency_key:
+        event = EventModel.model_validate({**event.model_dump(), "idempotency_key": idempotency_key})
     created_event = await events_service.create_event(event)
     if not created_event:
         L.error({
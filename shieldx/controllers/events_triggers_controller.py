@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, status
 from shieldx.services import EventsTriggersService
-from shieldx.repositories import EventsTriggersRepository
-from shieldx.db import get_database
+from shieldx.container import Container, get_container
+from shieldx.cache.versions import conditional_get
 from shieldx.log.logger_config import get_logger
 import time as T
 import shieldx_core.dtos as DTOS
@@ -9,12 +9,12 @@ import shieldx_core.dtos as DTOS
 router = APIRouter()
 L = get_logger(__name__)
 
-def get_service(db=Depends(get_database)):
-    repo = EventsTriggersRepository(db)
-    return EventsTriggersService(repo)
+def get_service(container: Container = Depends(get_container)):
+    return container.events_triggers_service
 
 @router.get(
     "/event-types/{event_type_id}/triggers",
+    dependencies=[conditional_get("events_triggers")],
     response_model=list[DTOS.EventsTriggersDTO],
     status_code=200,
     summary="Listar triggers de un tipo de evento",
@@ -24,7 +24,7 @@ async def list_triggers(event_type_id: str, service: EventsTriggersService = Dep
     t1 = T.time()
     triggers = await service.list_triggers_for_event_type(event_type_id)
     # Log de consulta de triggers vinculados
-    L.debug({
+    L.debug(lambda: {
         "event": "API.EVENT_TRIGGER.LIST",
         "event_type_id": event_type_id,
         "count": len(triggers),
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Response
+from shieldx.metrics import REGISTRY, CONTENT_TYPE
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    summary="Métricas en formato Prometheus",
+    response_class=Response,
+    include_in_schema=False,
+)
+async def get_metrics():
+    """
+    Expone contadores e histogramas del proceso en el formato de texto de Prometheus.
+    """
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
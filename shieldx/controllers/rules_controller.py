@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from shieldx.db import get_database
+from shieldx.container import Container, get_container
+from shieldx.cache.versions import conditional_get
 from shieldx.models import RuleModel
-from shieldx.repositories import RuleRepository
 from shieldx.services import RuleService
 from shieldx.log.logger_config import get_logger
 import time as T
@@ -10,9 +10,8 @@ import shieldx_core.dtos as DTOS
 router = APIRouter()
 L = get_logger(__name__)
 
-def get_service(db=Depends(get_database)):
-    repository = RuleRepository(db)
-    return RuleService(repository)
+def get_service(container: Container = Depends(get_container)):
+    return container.rule_service
 
 @router.post(
     "/rules",
@@ -34,6 +33,7 @@ async def create_rule(data: DTOS.RuleCreateDTO, service: RuleService = Depends(g
 
 @router.get(
     "/rules",
+    dependencies=[conditional_get("rules")],
     response_model=list[DTOS.RuleResponseDTO],
     status_code=status.HTTP_200_OK,
     summary="Listar todas las reglas",
@@ -43,7 +43,7 @@ async def list_rules(service: RuleService = Depends(get_service)):
     t1 = T.time()
     rules = await service.list_rules()
     # Log de consulta
-    L.debug({
+    L.debug(lambda: {
         "event": "API.RULE.LISTED",
         "count": len(rules),
         "time": T.time() - t1
@@ -53,6 +53,7 @@ async def list_rules(service: RuleService = Depends(get_service)):
 
 @router.get(
     "/rules/{rule_id}",
+    dependencies=[conditional_get("rules")],
     response_model=DTOS.RuleResponseDTO,
     status_code=status.HTTP_200_OK,
     summary="Obtener una regla por ID",
@@ -68,7 +69,7 @@ async def get_rule(rule_id: str, service: RuleService = Depends(get_service)):
             "time": T.time() - t1
         })
         raise HTTPException(status_code=404, detail="Rule not found")
-    L.debug({
+    L.debug(lambda: {
         "event": "API.RULE.FETCHED",
         "rule_id": rule_id,
         "time": T.time() - t1
@@ -1,10 +1,8 @@
 from fastapi import APIRouter, Depends, status
-from shieldx.db import get_database
+from shieldx.container import Container, get_container
+from shieldx.cache.versions import conditional_get
 from shieldx.models import RuleModel
 from shieldx.services import RulesTriggerService
-from shieldx.services import RuleService
-from shieldx.repositories import RulesTriggerRepository
-from shieldx.repositories import RuleRepository
 import shieldx_core.dtos as DTOS
 from shieldx.log.logger_config import get_logger
 import time as T
@@ -12,12 +10,12 @@ import time as T
 router = APIRouter()
 L = get_logger(__name__)
 
-def get_service(db=Depends(get_database)):
-    repo = RulesTriggerRepository(db)
-    return RulesTriggerService(repo)
+def get_service(container: Container = Depends(get_container)):
+    return container.rules_trigger_service
 
 @router.get(
     "/triggers/{trigger_id}/rules",
+    dependencies=[conditional_get("rules_trigger")],
     response_model=list[DTOS.RulesTriggerDTO],
     status_code=status.HTTP_200_OK,
     summary="Listar reglas asociadas a un trigger",
@@ -26,7 +24,7 @@ def get_service(db=Depends(get_database)):
 async def list_rules(trigger_id: str, service: RulesTriggerService = Depends(get_service)):
     t1 = T.time()
     rules = await service.list_rules(trigger_id)
-    L.debug({
+    L.debug(lambda: {
         "event": "API.RULE_TRIGGER.LISTED",
         "trigger_id": trigger_id,
         "count": len(rules),
@@ -65,17 +63,13 @@ async def link_rule(trigger_id: str, rule_id: str, service: RulesTriggerService
     summary="Crear y vincular una nueva regla",
     description="Crea una nueva regla y la vincula automáticamente al trigger indicado."
 )
-async def create_and_link_rule(trigger_id: str, rule_data: DTOS.RuleCreateDTO, db=Depends(get_database)):
+async def create_and_link_rule(trigger_id: str, rule_data: DTOS.RuleCreateDTO, container: Container = Depends(get_container)):
     t1 = T.time()
     # Crear la nueva regla
-    rule_repo = RuleRepository(db)
-    rule_service = RuleService(rule_repo)
-    rule_id = await rule_service.create_rule(rule_data)
+    rule_id = await container.rule_service.create_rule(rule_data)
 
     # Vincular la nueva regla
-    repo = RulesTriggerRepository(db)
-    service = RulesTriggerService(repo)
-    await service.link_rule(trigger_id, rule_id)
+    await container.rules_trigger_service.link_rule(trigger_id, rule_id)
 
     L.info({
         "event": "API.RULE_TRIGGER.CREATED_AND_LINKED",
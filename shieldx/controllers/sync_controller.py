@@ -0,0 +1,38 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, status
+from shieldx.container import Container, get_container
+from shieldx.services import SyncService
+from shieldx.log.logger_config import get_logger
+import time as T
+
+router = APIRouter()
+L = get_logger(__name__)
+
+def get_service(container: Container = Depends(get_container)):
+    return container.sync_service
+
+@router.get(
+    "/sync",
+    status_code=status.HTTP_200_OK,
+    summary="Sincronizar la configuración",
+    description=(
+        "Devuelve los triggers, reglas, tipos de evento y relaciones insertados o modificados, y los `_id` "
+        "borrados, desde la versión `since`. Si `since` es 0 o ya salió de la retención del changelog, "
+        "devuelve una copia completa con `reset: true`. El cliente guarda `version` para la siguiente llamada."
+    )
+)
+async def sync_configuration(
+    since: int = Query(0, ge=0, description="Versión de la última sincronización (0 para una copia completa)"),
+    collections: Optional[List[str]] = Query(None, description="Colecciones a sincronizar (todas por defecto)"),
+    service: SyncService = Depends(get_service),
+):
+    t1 = T.time()
+    result = await service.sync(since, collections)
+    L.info({
+        "event": "API.SYNC",
+        "since": since,
+        "version": result["version"],
+        "reset": result["reset"],
+        "time": T.time() - t1
+    })
+    return result
@@ -2,8 +2,8 @@ from fastapi import APIRouter, Depends, status
 from typing import List
 from shieldx.models import TriggerModel
 from shieldx.services import TriggerService
-from shieldx.db import get_database
-from shieldx.repositories import TriggersRepository
+from shieldx.container import Container, get_container
+from shieldx.cache.versions import conditional_get
 from shieldx.log.logger_config import get_logger
 import time as T
 import shieldx_core.dtos as DTOS
@@ -14,9 +14,8 @@ L = get_logger(__name__)
 
 # Crea la instancia del servicio pasando la colección MongoDB
 
-def get_triggers_service(db=Depends(get_database)):
-    repository = TriggersRepository(db)
-    return TriggerService(repository)
+def get_triggers_service(container: Container = Depends(get_container)):
+    return container.trigger_service
 
 @router.post(
     "/triggers/",
@@ -41,6 +40,7 @@ async def create_trigger(trigger: DTOS.TriggerCreateDTO, service: TriggerService
 
 @router.get(
     "/triggers/",
+    dependencies=[conditional_get("triggers")],
     response_model=List[DTOS.TriggerResponseDTO],
     status_code=status.HTTP_200_OK,
     summary="Obtener todos los triggers",
@@ -52,7 +52,7 @@ async def create_trigger(trigger: DTOS.TriggerCreateDTO, service: TriggerService
 async def get_all_triggers(service: TriggerService = Depends(get_triggers_service)):
     t1 = T.time()
     triggers = await service.get_all_triggers()
-    L.debug({
+    L.debug(lambda: {
         "event": "API.TRIGGER.LISTED",
         "count": len(triggers),
         "time": T.time() - t1
@@ -61,6 +61,7 @@ async def get_all_triggers(service: TriggerService = Depends(get_triggers_servic
 
 @router.get(
     "/triggers/{name}",
+    dependencies=[conditional_get("triggers")],
     response_model=DTOS.TriggerResponseDTO,
     status_code=status.HTTP_200_OK,
     summary="Obtener un trigger por nombre",
@@ -72,7 +73,7 @@ async def get_all_triggers(service: TriggerService = Depends(get_triggers_servic
 async def get_trigger(name: str, service: TriggerService = Depends(get_triggers_service)):
     t1 = T.time()
     trigger = await service.get_trigger(name)
-    L.debug({
+    L.debug(lambda: {
         "event": "API.TRIGGER.FETCHED",
         "name": name,
         "time": T.time() - t1
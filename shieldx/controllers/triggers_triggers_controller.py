@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, status
-from shieldx.db import get_database
+from shieldx.container import Container, get_container
+from shieldx.cache.versions import conditional_get
 from shieldx.services import TriggersTriggersService
-from shieldx.repositories import TriggersTriggersRepository
 from shieldx.log.logger_config import get_logger
 import time as T
 import shieldx_core.dtos as DTOS
@@ -9,12 +9,12 @@ import shieldx_core.dtos as DTOS
 router = APIRouter()
 L = get_logger(__name__)
 
-def get_service(db=Depends(get_database)):
-    repo = TriggersTriggersRepository(db)
-    return TriggersTriggersService(repo)
+def get_service(container: Container = Depends(get_container)):
+    return container.triggers_triggers_service
 
 @router.get(
     "/triggers/{trigger_id}/children",
+    dependencies=[conditional_get("triggers_triggers")],
     response_model=list[DTOS.TriggersTriggersDTO],
     status_code=status.HTTP_200_OK,
     summary="Listar triggers hijos",
@@ -23,7 +23,7 @@ def get_service(db=Depends(get_database)):
 async def list_children(trigger_id: str, service: TriggersTriggersService = Depends(get_service)):
     t1 = T.time()
     children = await service.list_children(trigger_id)
-    L.debug({
+    L.debug(lambda: {
         "event": "API.TRIGGER.CHILDREN.LISTED",
         "parent_id": trigger_id,
         "count": len(children),
@@ -33,6 +33,7 @@ async def list_children(trigger_id: str, service: TriggersTriggersService = Depe
 
 @router.get(
     "/triggers/{trigger_id}/parents",
+    dependencies=[conditional_get("triggers_triggers")],
     response_model=list[DTOS.TriggersTriggersDTO],
     status_code=status.HTTP_200_OK,
     summary="Listar triggers padres",
@@ -41,7 +42,7 @@ async def list_children(trigger_id: str, service: TriggersTriggersService = Depe
 async def list_parents(trigger_id: str, service: TriggersTriggersService = Depends(get_service)):
     t1 = T.time()
     parents = await service.list_parents(trigger_id)
-    L.debug({
+    L.debug(lambda: {
         "event": "API.TRIGGER.PARENTS.LISTED",
         "child_id": trigger_id,
         "count": len(parents),
@@ -66,7 +67,7 @@ async def link_triggers(parent_id: str, child_id: str, service: TriggersTriggers
             "time": T.time() - t1
         })
     else:
-        L.debug({
+        L.debug(lambda: {
             "event": "API.TRIGGER.LINK.EXISTS",
             "parent_id": parent_id,
             "child_id": child_id,
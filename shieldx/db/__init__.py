@@ -1,27 +1,60 @@
 import os
+from typing import Dict
 from motor.motor_asyncio import AsyncIOMotorClient,AsyncIOMotorCollection
 from shieldx import config
+from shieldx.db.monitoring import COMMAND_MONITOR
 
 MONGODB_URI = config.MONGODB_URI
 MONGO_DATABASE_NAME = config.MONGO_DATABASE_NAME
+DEFAULT_PROFILE = "default"
 
 # Initialize MongoClient
 client = None
+# Un cliente (y su pool) por perfil de SHIELDX_MONGO_PROFILES; `client` es el del perfil "default"
+clients: Dict[str, AsyncIOMotorClient] = {}
 
 # Get the MongoDB client and database instance
-def get_database():
+def get_database(profile: str = DEFAULT_PROFILE):
+    """
+    Base de datos de ShieldX a través del cliente del perfil indicado. Si el perfil no
+    existe se usa el cliente por defecto.
+    """
     global client
-    return  client[MONGO_DATABASE_NAME] if client else None 
+    if not client:
+        return None
+    return clients.get(profile, client)[MONGO_DATABASE_NAME]
+
+def get_databases() -> Dict[str, object]:
+    """
+    Base de datos de cada perfil configurado.
+    """
+    return {profile: get_database(profile) for profile in clients}
 
 def get_collection(name:str)->AsyncIOMotorCollection:
     db =  get_database()
-    return db[name] if not db is None else None 
+    return db[name] if not db is None else None
+
+def _client_options(options: dict) -> dict:
+    # An empty compressors string means "no compression": leave the option out
+    return {key: value for key, value in options.items() if value != ""}
+
 # Startup event to initialize the MongoClient when the application starts
 async def connect_to_mongo():
-    global client
-    client = AsyncIOMotorClient(MONGODB_URI)
+    global client, clients
+    # El listener mide cada comando y retiene las operaciones lentas
+    event_listeners = [COMMAND_MONITOR] if config.SHIELDX_MONGO_MONITORING else []
+    clients = {
+        profile: AsyncIOMotorClient(MONGODB_URI, event_listeners=event_listeners, **_client_options(options))
+        for profile, options in config.SHIELDX_MONGO_PROFILES.items()
+    }
+    if DEFAULT_PROFILE not in clients:
+        clients[DEFAULT_PROFILE] = AsyncIOMotorClient(MONGODB_URI, event_listeners=event_listeners)
+    client = clients[DEFAULT_PROFILE]
 
 # Shutdown event to close the MongoClient when the application shuts down
 async def close_mongo_connection():
-    global client
-    client.close()  
\ No newline at end of file
+    global client, clients
+    for profile_client in clients.values():
+        profile_client.close()
+    clients = {}
+    client = None
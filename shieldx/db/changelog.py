@@ -0,0 +1,116 @@
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Tuple
+
+from pymongo.errors import BulkWriteError, PyMongoError
+from pymongo.results import DeleteResult
+
+import shieldx.db as DB
+from shieldx.cache.versions import VERSIONS
+from shieldx.log.logger_config import get_logger
+
+L = get_logger(__name__)
+
+CHANGELOG_COLLECTION = "config_changelog"
+UPSERT = "upsert"
+DELETE = "delete"
+
+
+async def record_changes(collection: str, changes: Iterable[Tuple[str, Any]]):
+    """
+    Asigna una versión nueva a `collection` y registra en el changelog cada documento
+    afectado como `(operación, _id)`, con operación `upsert` o `delete`.
+    """
+    changes = list(changes)
+    if not changes:
+        return
+    version = await VERSIONS.bump(collection)
+    db = DB.get_database("config")
+    if version is None or db is None:
+        return
+    at = datetime.now(timezone.utc)
+    try:
+        await db[CHANGELOG_COLLECTION].insert_many([
+            {"version": version, "collection": collection, "op": op, "document_id": document_id, "at": at}
+            for op, document_id in changes
+        ])
+    except PyMongoError as e:
+        # /sync clients miss this change until their next full download
+        L.error({"event": "CHANGELOG.RECORD.ERROR", "collection": collection, "version": version, "error": str(e)})
+
+
+def _inserted_ids(documents: List[dict], error: BulkWriteError, kwargs: dict) -> List[Any]:
+    """
+    `_id` de los documentos que `insert_many` llegó a insertar antes de fallar.
+
+    Un insert ordenado se detiene en el primer error; uno desordenado inserta todos menos los
+    que fallaron. El driver asigna `_id` a cada documento antes de enviarlo.
+    """
+    failed = {write_error["index"] for write_error in error.details.get("writeErrors", [])}
+    if kwargs.get("ordered", True):
+        documents = documents[:min(failed, default=len(documents))]
+    return [document["_id"] for i, document in enumerate(documents) if i not in failed and "_id" in document]
+
+
+class TrackedCollection:
+    """
+    Envoltorio de una colección de Motor que registra en el changelog los documentos que
+    inserta, modifica o borra (ver `record_changes`). El resto de operaciones se delegan tal cual.
+
+    Para saber qué documento cambia, `update_one`, `delete_one` y `delete_many` buscan antes
+    los `_id` que cumplen el filtro y restringen la escritura a ellos.
+    """
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+
+    def __getattr__(self, attr):
+        return getattr(self._collection, attr)
+
+    def __getitem__(self, name):
+        return self._collection[name]
+
+    async def insert_one(self, document, *args, **kwargs):
+        result = await self._collection.insert_one(document, *args, **kwargs)
+        await record_changes(self.name, [(UPSERT, result.inserted_id)])
+        return result
+
+    async def insert_many(self, documents, *args, **kwargs):
+        documents = list(documents)
+        try:
+            result = await self._collection.insert_many(documents, *args, **kwargs)
+        except BulkWriteError as e:
+            await record_changes(self.name, [(UPSERT, document_id) for document_id in _inserted_ids(documents, e, kwargs)])
+            raise
+        await record_changes(self.name, [(UPSERT, document_id) for document_id in result.inserted_ids])
+        return result
+
+    async def update_one(self, filter, update, *args, **kwargs):
+        target = await self._collection.find_one(filter, {"_id": 1})
+        if target is not None:
+            filter = {"$and": [filter, {"_id": target["_id"]}]}
+        result = await self._collection.update_one(filter, update, *args, **kwargs)
+        changes: List[Tuple[str, Any]] = []
+        if target is not None and result.modified_count:
+            changes.append((UPSERT, target["_id"]))
+        if result.upserted_id is not None:
+            changes.append((UPSERT, result.upserted_id))
+        await record_changes(self.name, changes)
+        return result
+
+    async def delete_one(self, filter, *args, **kwargs):
+        target = await self._collection.find_one(filter, {"_id": 1})
+        if target is None:
+            # Nothing matched: deleting by the bare filter could remove an unlogged document
+            return DeleteResult({"n": 0}, acknowledged=True)
+        result = await self._collection.delete_one({"$and": [filter, {"_id": target["_id"]}]}, *args, **kwargs)
+        if result.deleted_count:
+            await record_changes(self.name, [(DELETE, target["_id"])])
+        return result
+
+    async def delete_many(self, filter, *args, **kwargs):
+        ids = [document["_id"] async for document in self._collection.find(filter, {"_id": 1})]
+        result = await self._collection.delete_many({"$and": [filter, {"_id": {"$in": ids}}]}, *args, **kwargs)
+        if result.deleted_count:
+            await record_changes(self.name, [(DELETE, document_id) for document_id in ids])
+        return result
@@ -1,4 +1,7 @@
 from shieldx.db import get_database
+from shieldx.db.changelog import CHANGELOG_COLLECTION
+from shieldx.repositories.replay_repository import RESULTS_COLLECTION
+from shieldx import config
 from shieldx.log import Log
 from shieldx.log.logger_config import get_logger
 import time as T
@@ -19,7 +22,15 @@ async def create_indexes():
     await db["events"].create_index("service_id")
     await db["events"].create_index("microservice_id")
     await db["events"].create_index("function_id")
-    L.debug({
+    # Garantía final de idempotencia: solo indexa eventos que traen llave
+    await db["events"].create_index("idempotency_key", unique=True, sparse=True)
+    # Replay: recorrido keyset por (timestamp, _id) y un resultado por replay y evento
+    await db["events"].create_index([("timestamp", 1), ("_id", 1)])
+    await db[RESULTS_COLLECTION].create_index([("replay_id", 1), ("event_id", 1)], unique=True)
+    # Changelog de configuración para /sync: consulta por versión y retención acotada (TTL)
+    await db[CHANGELOG_COLLECTION].create_index("version")
+    await db[CHANGELOG_COLLECTION].create_index("at", expireAfterSeconds=config.SHIELDX_CHANGELOG_RETENTION)
+    L.debug(lambda: {
         "event":"CREATED.INDEXES",
         "time":T.time() - t1
     })
@@ -0,0 +1,178 @@
+import itertools
+import json
+import threading
+import time as T
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from bson import json_util
+from pymongo import monitoring
+
+from shieldx import config
+from shieldx.metrics import REGISTRY
+
+MONGO_COMMAND_DURATION = REGISTRY.histogram(
+    "shieldx_mongo_command_duration_seconds",
+    "Duración de cada comando enviado a MongoDB",
+    ["command", "collection"],
+)
+MONGO_COMMAND_FAILURES = REGISTRY.counter(
+    "shieldx_mongo_command_failures_total",
+    "Comandos de MongoDB que terminaron con error",
+    ["command", "collection"],
+)
+
+# Campos del comando que describen la consulta (se guardan junto a las operaciones lentas)
+QUERY_FIELDS = ("filter", "sort", "projection", "limit", "skip", "pipeline", "updates", "deletes", "q", "hint")
+# Comandos que se pueden reproducir con `explain`
+EXPLAINABLE = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+# Comandos internos de sesión y autenticación que no aportan a la monitorización
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions", "killCursors"}
+
+
+def _command_collection(command_name: str, command: dict) -> str:
+    value = command.get(command_name)
+    return value if isinstance(value, str) else ""
+
+
+def to_json(value: Any, max_chars: Optional[int] = 2000) -> Any:
+    """
+    Convierte BSON (ObjectId, fechas) a JSON y recorta documentos de más de `max_chars`.
+    """
+    text = json_util.dumps(value)
+    if max_chars is not None and len(text) > max_chars:
+        return {"truncated": text[:max_chars]}
+    return json.loads(text)
+
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    Listener de comandos de pymongo registrado en el `AsyncIOMotorClient`.
+
+    Registra la duración de cada comando (histograma `shieldx_mongo_command_duration_seconds`
+    y acumulados por comando/colección) y guarda en un buffer circular las operaciones que
+    superan `slow_ms`, con su filtro, para consultarlas y explicarlas desde `/admin/mongo`.
+
+    pymongo invoca los listeners desde los hilos de Motor, por eso el estado se protege con un lock.
+    """
+
+    def __init__(self, slow_ms: float = config.SHIELDX_MONGO_SLOW_MS, capacity: int = config.SHIELDX_MONGO_SLOW_BUFFER):
+        """
+        Args:
+            slow_ms (float): Duración mínima (ms) para guardar una operación como lenta.
+            capacity (int): Número máximo de operaciones lentas retenidas (las más antiguas se descartan).
+        """
+        self.slow_ms = slow_ms
+        self.capacity = capacity
+        self.slow: deque = deque(maxlen=capacity)
+        self._pending: Dict[tuple, tuple] = {}
+        self._stats: Dict[tuple, Dict[str, float]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        command = event.command
+        query = {field: command[field] for field in QUERY_FIELDS if field in command}
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                _command_collection(event.command_name, command),
+                event.database_name,
+                query,
+                T.time(),
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._finish(event, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self._finish(event, failed=True)
+
+    def _finish(self, event, failed: bool):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+            if pending is None:
+                return
+            collection, database, query, started_at = pending
+            seconds = event.duration_micros / 1e6
+            MONGO_COMMAND_DURATION.labels(event.command_name, collection).observe(seconds)
+            if failed:
+                MONGO_COMMAND_FAILURES.labels(event.command_name, collection).inc()
+
+            stats = self._stats.get((event.command_name, collection))
+            if stats is None:
+                stats = self._stats[(event.command_name, collection)] = {"count": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0}
+            ms = seconds * 1e3
+            stats["count"] += 1
+            stats["failures"] += failed
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+
+            if ms >= self.slow_ms:
+                self.slow.append({
+                    "id": next(self._ids),
+                    "command": event.command_name,
+                    "database": database,
+                    "collection": collection,
+                    "duration_ms": ms,
+                    "failed": failed,
+                    "started_at": started_at,
+                    "query": query,
+                })
+
+    def command_stats(self) -> List[Dict[str, Any]]:
+        """
+        Acumulados por comando y colección, ordenados por tiempo total.
+        """
+        with self._lock:
+            rows = [
+                {"command": command, "collection": collection, **stats, "mean_ms": stats["total_ms"] / stats["count"]}
+                for (command, collection), stats in self._stats.items()
+            ]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def slow_operations(
+        self,
+        command: Optional[str] = None,
+        collection: Optional[str] = None,
+        min_ms: float = 0.0,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """
+        Operaciones lentas retenidas, de la más lenta a la más rápida, con filtros opcionales.
+        """
+        with self._lock:
+            ops = list(self.slow)
+        ops = [
+            op for op in ops
+            if (command is None or op["command"] == command)
+            and (collection is None or op["collection"] == collection)
+            and op["duration_ms"] >= min_ms
+        ]
+        ops.sort(key=lambda op: op["duration_ms"], reverse=True)
+        return [{**op, "query": to_json(op["query"])} for op in ops[:limit]]
+
+    def get_slow_operation(self, op_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return next((op for op in self.slow if op["id"] == op_id), None)
+
+    def clear(self):
+        with self._lock:
+            self.slow.clear()
+            self._stats.clear()
+
+
+def explain_command(op: Dict[str, Any]) -> Optional[dict]:
+    """
+    Reconstruye el comando de una operación lenta para ejecutarlo con `explain`.
+
+    Returns:
+        dict | None: Comando listo para `{"explain": ...}`, o None si el comando no es explicable.
+    """
+    if op["command"] not in EXPLAINABLE or not op["collection"]:
+        return None
+    return {op["command"]: op["collection"], **op["query"]}
+
+
+COMMAND_MONITOR = CommandMonitor()
@@ -0,0 +1,264 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from shieldx import config
+from shieldx.cache.invalidation import HISTORY_LOST_CODES, UNSUPPORTED_CODES
+from shieldx.compression import DICTIONARIES_COLLECTION, get_payload_codec
+from shieldx.log.logger_config import get_logger
+from shieldx.metrics import REGISTRY
+from shieldx.models import EventModel
+
+L = get_logger(__name__)
+
+LIVE_SUBSCRIBERS = REGISTRY.gauge(
+    "shieldx_live_subscribers",
+    "Suscriptores conectados a los eventos en vivo",
+)
+LIVE_DROPPED = REGISTRY.counter(
+    "shieldx_live_events_dropped_total",
+    "Eventos descartados por suscriptores que no consumían a tiempo",
+)
+
+# Campos por los que un suscriptor puede filtrar (igualdad exacta)
+FILTER_FIELDS = ("service_id", "microservice_id", "function_id", "event_type")
+
+_hub: Optional["LiveEventHub"] = None
+
+
+def get_live_hub() -> Optional["LiveEventHub"]:
+    """
+    Hub activo en el proceso, o None si no se inició.
+    """
+    return _hub
+
+
+class LiveUnavailable(Exception):
+    """
+    No se aceptan más suscriptores: límite alcanzado o MongoDB sin change streams.
+    """
+
+
+class Subscription:
+    """
+    Suscriptor de eventos en vivo con su filtro y un buffer acotado.
+
+    Si el cliente no consume a tiempo y el buffer se llena, se descartan los eventos más
+    antiguos (contados en `dropped`) en lugar de frenar al resto de suscriptores.
+    """
+
+    def __init__(self, filters: Dict[str, str], buffer_size: int):
+        self.filters = {key: value for key, value in filters.items() if value is not None}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = 0
+        self.closed = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        return all(event.get(key) == value for key, value in self.filters.items())
+
+    def offer(self, item: Optional[str]):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            LIVE_DROPPED.inc()
+        self.queue.put_nowait(item)
+
+    def close(self):
+        """
+        Avisa al cliente que el stream terminó (se entrega `None`).
+        """
+        if not self.closed:
+            self.closed = True
+            self.offer(None)
+
+    async def get(self) -> Optional[str]:
+        """
+        Siguiente evento serializado como JSON, o None si la suscripción se cerró.
+        """
+        return await self.queue.get()
+
+
+class LiveEventHub:
+    """
+    Reparte las inserciones de `events` entre los suscriptores en vivo del proceso.
+
+    Mantiene un único change stream por proceso, abierto solo mientras haya suscriptores,
+    y aplica el filtro de cada suscriptor en el servidor. Cada evento se serializa una vez y
+    se encola en los suscriptores que coinciden; así cada panel nuevo cuesta solo el reparto,
+    no una consulta a Mongo por segundo.
+
+    - Si la conexión se corta, reanuda con el último resume token.
+    - Si MongoDB no admite change streams (servidor standalone), cierra los suscriptores y
+      rechaza los nuevos.
+    """
+
+    def __init__(
+        self,
+        db,
+        buffer_size: int = config.SHIELDX_LIVE_BUFFER_SIZE,
+        max_subscribers: int = config.SHIELDX_LIVE_MAX_SUBSCRIBERS,
+        retry_delay: float = config.SHIELDX_LIVE_RETRY,
+    ):
+        """
+        Args:
+            db (AsyncIOMotorDatabase): Base de datos con la colección `events`.
+            buffer_size (int): Eventos pendientes por suscriptor antes de descartar los más antiguos.
+            max_subscribers (int): Suscriptores simultáneos admitidos.
+            retry_delay (float): Segundos de espera antes de reabrir el stream tras un error.
+        """
+        self.db = db
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self.retry_delay = retry_delay
+        self.subscribers: Set[Subscription] = set()
+        self.resume_token: Optional[dict] = None
+        self.active = False
+        self.supported = True
+        self.received = 0
+        self.delivered = 0
+        self.reconnects = 0
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """
+        Registra el hub del proceso. El change stream se abre con el primer suscriptor.
+        """
+        global _hub
+        _hub = self
+
+    async def stop(self):
+        global _hub
+        for subscription in list(self.subscribers):
+            subscription.close()
+        self.subscribers.clear()
+        LIVE_SUBSCRIBERS.set(0)
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.active = False
+        if _hub is self:
+            _hub = None
+
+    def subscribe(self, filters: Dict[str, Optional[str]]) -> Subscription:
+        """
+        Registra un suscriptor; abre el change stream si es el primero.
+
+        Raises:
+            LiveUnavailable: Si se alcanzó `max_subscribers` o MongoDB no admite change streams.
+        """
+        if not self.supported:
+            raise LiveUnavailable("Live events require MongoDB change streams (replica set)")
+        if len(self.subscribers) >= self.max_subscribers:
+            raise LiveUnavailable("Too many live subscribers")
+        subscription = Subscription(filters, self.buffer_size)
+        self.subscribers.add(subscription)
+        LIVE_SUBSCRIBERS.set(len(self.subscribers))
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="shieldx-live-events")
+            self._task.add_done_callback(self._stream_done)
+        return subscription
+
+    def _stream_done(self, task: asyncio.Task):
+        # The next subscriber must start a new stream instead of waiting on a dead task
+        if self._task is task:
+            self._task = None
+            self.active = False
+        if not task.cancelled() and task.exception() is not None:
+            self.last_error = str(task.exception())
+            L.error({"event": "LIVE.STREAM.STOPPED", "error": str(task.exception())})
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        Quita un suscriptor; cierra el change stream si no queda ninguno.
+        """
+        self.subscribers.discard(subscription)
+        LIVE_SUBSCRIBERS.set(len(self.subscribers))
+        if not self.subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self.active = False
+            # A later subscriber only wants events from then on
+            self.resume_token = None
+
+    def _pipeline(self) -> list:
+        return [{"$match": {"operationType": "insert", "ns.coll": "events"}}]
+
+    def publish(self, document: Dict[str, Any]):
+        """
+        Entrega un evento insertado a los suscriptores cuyo filtro coincide.
+        """
+        self.received += 1
+        targets = [subscription for subscription in self.subscribers if subscription.matches(document)]
+        if not targets:
+            return
+        # Serialized once, shared by every subscriber
+        item = json.dumps(EventModel.model_validate(get_payload_codec().inflate(document)).model_dump(mode="json"))
+        for subscription in targets:
+            subscription.offer(item)
+        self.delivered += len(targets)
+
+    async def _run(self):
+        while True:
+            try:
+                async with self.db.watch(self._pipeline(), resume_after=self.resume_token) as stream:
+                    self.active = True
+                    L.info({"event": "LIVE.STREAM.STARTED", "subscribers": len(self.subscribers), "resumed": self.resume_token is not None})
+                    async for change in stream:
+                        self.resume_token = stream.resume_token
+                        if change.get("operationType") == "invalidate":
+                            self.resume_token = None
+                            break
+                        try:
+                            document = change["fullDocument"]
+                            codec = get_payload_codec()
+                            if codec.missing_dictionaries([document]):
+                                await codec.load_dictionaries(self.db[DICTIONARIES_COLLECTION], [document])
+                            self.publish(document)
+                        except Exception as e:
+                            # One undecodable event must not stop the stream for every subscriber
+                            self.last_error = str(e)
+                            L.error({"event": "LIVE.EVENT.SKIPPED", "event_id": str(change["fullDocument"].get("_id")), "error": str(e)})
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                self.last_error = str(e)
+                if e.code in UNSUPPORTED_CODES:
+                    self.active = False
+                    self.supported = False
+                    self._task = None
+                    L.warning({
+                        "event": "LIVE.STREAM.UNSUPPORTED",
+                        "error": str(e),
+                        "detail": "MongoDB is not a replica set; live events are disabled",
+                    })
+                    for subscription in list(self.subscribers):
+                        subscription.close()
+                    return
+                if e.code in HISTORY_LOST_CODES:
+                    self.resume_token = None
+                L.error({"event": "LIVE.STREAM.ERROR", "error": str(e)})
+            except PyMongoError as e:
+                self.last_error = str(e)
+                L.error({"event": "LIVE.STREAM.ERROR", "error": str(e)})
+            self.active = False
+            self.reconnects += 1
+            await asyncio.sleep(self.retry_delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "supported": self.supported,
+            "subscribers": len(self.subscribers),
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": sum(subscription.dropped for subscription in self.subscribers),
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
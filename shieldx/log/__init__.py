@@ -1,5 +1,7 @@
-import os, sys, logging, json, threading
+import os, sys, logging, json, threading, queue, atexit
+import time as T
 from shieldx import config
+from shieldx.tracing import current_trace_id
 from logging.handlers import TimedRotatingFileHandler
 from option import NONE, Option
 
@@ -9,6 +11,13 @@ LOG_ROTATION_WHEN   = config.LOG_ROTATION_WHEN
 LOG_ROTATION_INTERVAL = config.LOG_ROTATION_INTERVAL
 LOG_TO_FILE         = config.LOG_TO_FILE
 LOG_ERROR_FILE      = config.LOG_ERROR_FILE
+LOG_FORMAT          = config.LOG_FORMAT
+LOG_SAMPLING        = config.LOG_SAMPLING
+LOG_SAMPLING_SUMMARY_INTERVAL = config.LOG_SAMPLING_SUMMARY_INTERVAL
+LOG_ASYNC           = config.LOG_ASYNC
+LOG_QUEUE_SIZE      = config.LOG_QUEUE_SIZE
+LOG_QUEUE_POLICY    = config.LOG_QUEUE_POLICY
+LOG_QUEUE_BLOCK_TIMEOUT = config.LOG_QUEUE_BLOCK_TIMEOUT
 
 
 class DumbLogger(object):
@@ -43,8 +52,17 @@ class JsonFormatter(logging.Formatter):
 
     Formats each log record into a JSON object, including metadata like timestamp, log level,
     logger name, and thread name. If the message is a dictionary, it merges it into the log record.
+    In compact mode each record is a single line without indentation.
     """
 
+    def __init__(self, *args, compact: bool = LOG_FORMAT != "pretty", **kwargs):
+        """
+        Args:
+            compact (bool): Emit single-line JSON instead of the indented format.
+        """
+        super().__init__(*args, **kwargs)
+        self.compact = compact
+
     def format(self, record):
         """
         Format the log record as a JSON string.
@@ -55,19 +73,477 @@ class JsonFormatter(logging.Formatter):
         Returns:
             str: A JSON-formatted log string.
         """
-        thread_id = threading.current_thread().getName()
+        # The record keeps the emitting thread; formatting may run on the log writer thread
+        thread_id = record.threadName
         log_data = {
             'timestamp': self.formatTime(record),
             'level': record.levelname,
             'logger_name': record.name,
             "thread_name": thread_id
         }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id is not None:
+            log_data["trace_id"] = trace_id
         if isinstance(record.msg, dict):
             log_data.update(record.msg)
         else:
             log_data['message'] = record.getMessage()
 
-        return json.dumps(log_data, indent=4) + "\n"
+        if self.compact:
+            return json.dumps(log_data, separators=(",", ":"), default=str)
+        return json.dumps(log_data, indent=4, default=str) + "\n"
+
+
+class AsyncLogPipeline(object):
+    """
+    Bounded queue drained by a single background writer thread.
+
+    Producers only enqueue `(record, handlers)` pairs; formatting and I/O happen on the
+    writer thread. When the queue is full the record is either dropped immediately
+    (`policy="drop"`) or the producer waits up to `block_timeout` seconds before
+    dropping it (`policy="block"`). Dropped records are counted.
+
+    Callbacks registered with `add_periodic` run on the writer thread every `tick_interval`
+    seconds and once more with `final=True` when the pipeline stops.
+    """
+
+    _STOP = object()
+
+    def __init__(self,
+                maxsize: int = LOG_QUEUE_SIZE,
+                policy: str = LOG_QUEUE_POLICY,
+                block_timeout: float = LOG_QUEUE_BLOCK_TIMEOUT,
+                batch_size: int = 512,
+                tick_interval: float = 1.0
+                ):
+        """
+        Start the writer thread.
+
+        Args:
+            maxsize (int): Maximum number of pending records.
+            policy (str): "drop" or "block", applied when the queue is full.
+            block_timeout (float): Maximum seconds a producer waits under the "block" policy.
+            batch_size (int): Maximum records written between two flushes of the handlers.
+            tick_interval (float): Seconds between two runs of the periodic callbacks.
+        """
+        if policy not in ("drop", "block"):
+            raise ValueError(f"Unknown log queue policy: {policy}")
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.batch_size = batch_size
+        self.tick_interval = tick_interval
+        self._periodic = []
+        self._next_tick = T.monotonic() + tick_interval
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self._counter_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="shieldx-log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def submit(self, record: logging.LogRecord, handlers) -> bool:
+        """
+        Enqueue a record for the given handlers.
+
+        Returns:
+            bool: False if the record was dropped because the queue was full.
+        """
+        try:
+            # The writer thread itself never waits: nobody else would drain the queue
+            if self.policy == "block" and threading.current_thread() is not self._thread:
+                self.queue.put((record, handlers), timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait((record, handlers))
+        except queue.Full:
+            with self._counter_lock:
+                self.dropped += 1
+            return False
+        with self._counter_lock:
+            self.enqueued += 1
+        return True
+
+    def add_periodic(self, callback):
+        """
+        Run `callback(final: bool)` on the writer thread every `tick_interval` seconds and
+        once with `final=True` at shutdown. Records it logs are written before the thread exits.
+        """
+        self._periodic.append(callback)
+
+    def _tick(self, final: bool = False):
+        self._next_tick = T.monotonic() + self.tick_interval
+        for callback in list(self._periodic):
+            try:
+                callback(final)
+            except Exception:
+                pass
+
+    def _run(self):
+        item = None
+        while True:
+            if item is None:
+                try:
+                    item = self.queue.get(timeout=max(0.0, self._next_tick - T.monotonic()))
+                except queue.Empty:
+                    self._tick()
+                    continue
+            touched = set()
+            # Drain whatever is already queued and flush each handler once per batch
+            for _ in range(self.batch_size):
+                if item is self._STOP:
+                    self._tick(final=True)
+                    self._drain(touched)
+                    self._flush(touched)
+                    return
+                self._write(item, touched)
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    item = None
+                    break
+            self._flush(touched)
+            if T.monotonic() >= self._next_tick:
+                self._tick()
+
+    def _write(self, item, touched: set):
+        record, handlers = item
+        for handler in handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+                touched.add(handler)
+        self.written += 1
+
+    def _drain(self, touched: set):
+        # Records logged by the final callbacks, queued after the stop marker
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not self._STOP:
+                self._write(item, touched)
+
+    @staticmethod
+    def _flush(handlers):
+        for handler in handlers:
+            flush = getattr(handler, "flush_now", handler.flush)
+            try:
+                flush()
+            except Exception:
+                pass
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Drain the pending records, stop the writer thread and flush the handlers.
+        """
+        if not self._thread.is_alive():
+            return
+        self.queue.put(self._STOP)
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        """
+        Return the pipeline counters.
+        """
+        return {
+            "policy": self.policy,
+            "queue_size": self.queue.qsize(),
+            "queue_maxsize": self.queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+        }
+
+
+class DeferredFlushMixin(object):
+    """
+    Turns the per-record flush of stream handlers into a no-op. The log writer thread calls
+    `flush_now` once per batch, so several records share a single write syscall.
+    """
+
+    def flush(self):
+        return
+
+    def flush_now(self):
+        super().flush()
+
+
+class BufferedStreamHandler(DeferredFlushMixin, logging.StreamHandler):
+    pass
+
+
+class BufferedTimedRotatingFileHandler(DeferredFlushMixin, TimedRotatingFileHandler):
+    pass
+
+
+class BufferedFileHandler(DeferredFlushMixin, logging.FileHandler):
+    pass
+
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def get_pipeline() -> AsyncLogPipeline:
+    """
+    Return the process-wide log pipeline, starting it on first use.
+    """
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = AsyncLogPipeline()
+        return _pipeline
+
+
+class AsyncQueueHandler(logging.Handler):
+    """
+    Handler placed on the request path: it hands the record to the pipeline together with
+    the logger's real handlers, so no formatting or I/O happens on the caller's thread.
+    """
+
+    def __init__(self, handlers, pipeline: AsyncLogPipeline = None):
+        """
+        Args:
+            handlers (list[logging.Handler]): Handlers that format and write on the writer thread.
+            pipeline (AsyncLogPipeline): Pipeline to use (the process-wide one by default).
+        """
+        super().__init__()
+        self.handlers = tuple(handlers)
+        self.pipeline = pipeline if pipeline is not None else get_pipeline()
+
+    def handle(self, record):
+        # Skip Handler.handle's lock: the pipeline queue is already thread-safe
+        if self.filter(record):
+            self.pipeline.submit(record, self.handlers)
+        return record
+
+    def emit(self, record):
+        self.pipeline.submit(record, self.handlers)
+
+
+class LogSampler(object):
+    """
+    Per event-key sampling of structured log records.
+
+    A rule is either `every_n` (keep 1 record of every N) or `per_second` (keep at most X
+    records per one-second window). Records whose `event` key has no rule always pass.
+    Suppressed counts are reported periodically as a `LOG.SAMPLING.SUMMARY` record.
+    """
+
+    def __init__(self, rules: dict = None, summary_interval: float = LOG_SAMPLING_SUMMARY_INTERVAL):
+        """
+        Args:
+            rules (dict): Event key -> `("every_n", N)` or `("per_second", X)`.
+            summary_interval (float): Seconds between two summary records.
+        """
+        self.rules = dict(rules or {})
+        self.summary_interval = summary_interval
+        self._seen = {}
+        self._windows = {}
+        self._suppressed = {}
+        self._lock = threading.Lock()
+        self._last_summary = T.monotonic()
+
+    @staticmethod
+    def parse(spec: str) -> dict:
+        """
+        Parse `"KEY=1/N,KEY=X/s"` into sampler rules.
+        """
+        rules = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            key, _, rule = item.partition("=")
+            value, _, unit = rule.strip().partition("/")
+            if unit == "s":
+                rules[key.strip()] = ("per_second", int(value))
+            elif value == "1" and unit.isdigit():
+                rules[key.strip()] = ("every_n", int(unit))
+            else:
+                raise ValueError(f"Invalid log sampling rule: {item}")
+        return rules
+
+    def check(self, key: str):
+        """
+        Decide whether a record for `key` is kept.
+
+        Returns:
+            tuple[bool, Optional[dict]]: Whether to keep the record, and a summary record
+            when one is due.
+        """
+        rule = self.rules.get(key)
+        if rule is None:
+            return True, None
+        kind, limit = rule
+        now = T.monotonic()
+        with self._lock:
+            if kind == "every_n":
+                seen = self._seen.get(key, 0)
+                self._seen[key] = seen + 1
+                allowed = seen % limit == 0
+            else:
+                window, count = self._windows.get(key, (0, 0))
+                second = int(now)
+                if second != window:
+                    window, count = second, 0
+                allowed = count < limit
+                self._windows[key] = (window, count + 1)
+            if not allowed:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+            summary = self._take_summary(now)
+        return allowed, summary
+
+    def flush(self, force: bool = False):
+        """
+        Summary of the suppressed records when one is due (or, with `force`, whenever there
+        are any). Called periodically so counts are reported even when a key's traffic stops.
+
+        Returns:
+            Optional[dict]: The `LOG.SAMPLING.SUMMARY` record to log, if any.
+        """
+        with self._lock:
+            return self._take_summary(T.monotonic(), force)
+
+    def _take_summary(self, now: float, force: bool = False):
+        # Caller holds the lock
+        if not force and now - self._last_summary < self.summary_interval:
+            return None
+        summary = None
+        if self._suppressed:
+            summary = {
+                "event": "LOG.SAMPLING.SUMMARY",
+                "suppressed": self._suppressed,
+                "interval": now - self._last_summary,
+            }
+            self._suppressed = {}
+        self._last_summary = now
+        return summary
+
+
+class LogRuntime(object):
+    """
+    One set of output handlers (console, rotating file and error file) that many loggers share.
+
+    Every logger attached to the runtime writes through the same handler objects, so the
+    process keeps one file descriptor per output and rotation happens in a single place.
+    In async mode the handlers are buffered and only flushed by the log writer thread.
+    """
+
+    def __init__(self,
+                formatter: logging.Formatter = JsonFormatter(),
+                name: str = "shieldx",
+                path: str = LOG_PATH,
+                console_handler_filter=lambda record: record.levelno == logging.DEBUG,
+                file_handler_filter=lambda record: record.levelno == logging.INFO,
+                console_handler_level: int = logging.DEBUG,
+                file_handler_level: int = logging.INFO,
+                error_log: bool = LOG_ERROR_FILE,
+                filename: Option[str] = NONE,
+                output_path: Option[str] = NONE,
+                error_output_path: Option[str] = NONE,
+                create_folder: bool = True,
+                to_file: bool = LOG_TO_FILE,
+                when: str = LOG_ROTATION_WHEN,
+                interval: int = LOG_ROTATION_INTERVAL,
+                async_mode: bool = LOG_ASYNC
+                ):
+        """
+        Build the output handlers.
+
+        Args:
+            formatter (logging.Formatter): Formatter to use for all handlers.
+            name (str): Base name of the log files.
+            path (str): Directory path where logs will be stored.
+            console_handler_filter (callable): Filter for console logs.
+            file_handler_filter (callable): Filter for file logs.
+            console_handler_level (int): Minimum level for console logs.
+            file_handler_level (int): Minimum level for file logs.
+            error_log (bool): Whether to enable separate error log file.
+            filename (Option[str]): Optional filename base for logs.
+            output_path (Option[str]): Path for general log output.
+            error_output_path (Option[str]): Path for error log output.
+            create_folder (bool): If True, creates path if it does not exist.
+            to_file (bool): If True, enables file logging.
+            when (str): TimedRotatingFileHandler `when` parameter (e.g., "m" for minutes).
+            interval (int): TimedRotatingFileHandler `interval` parameter.
+            async_mode (bool): If True, records are only enqueued on the caller's thread and
+                formatted and written by the background log pipeline.
+        """
+        self.async_mode = async_mode
+        self.handlers = []
+
+        if (to_file or error_log) and not os.path.exists(path) and create_folder:
+            os.makedirs(path, exist_ok=True)
+
+        # Console handler
+        console_handler = (BufferedStreamHandler if async_mode else logging.StreamHandler)(sys.stdout)
+        console_handler.setFormatter(formatter)
+        console_handler.setLevel(console_handler_level)
+        console_handler.addFilter(console_handler_filter)
+        self.handlers.append(console_handler)
+
+        if to_file:
+            # Rotating file handler
+            file_handler = (BufferedTimedRotatingFileHandler if async_mode else TimedRotatingFileHandler)(
+                filename=output_path.unwrap_or(f"{path}/{filename.unwrap_or(name)}"),
+                when=when,
+                interval=interval
+            )
+            file_handler.setFormatter(formatter)
+            file_handler.setLevel(file_handler_level)
+            file_handler.addFilter(file_handler_filter)
+            self.handlers.append(file_handler)
+
+        if error_log:
+            # Error file handler
+            error_file_handler = (BufferedFileHandler if async_mode else logging.FileHandler)(
+                filename=error_output_path.unwrap_or(f"{path}/{filename.unwrap_or(name)}.error")
+            )
+            error_file_handler.setFormatter(formatter)
+            error_file_handler.setLevel(logging.ERROR)
+            error_file_handler.addFilter(lambda record: record.levelno == logging.ERROR)
+            self.handlers.append(error_file_handler)
+
+        self.queue_handler = AsyncQueueHandler(self.handlers) if async_mode else None
+
+    def attach(self, logger: logging.Logger):
+        """
+        Route `logger` to the shared handlers.
+        """
+        if self.queue_handler is not None:
+            logger.addHandler(self.queue_handler)
+        else:
+            for handler in self.handlers:
+                logger.addHandler(handler)
+
+    def add_periodic(self, callback, interval: float = 1.0):
+        """
+        Run `callback(final: bool)` every `interval` seconds and once with `final=True` at exit.
+        In async mode it runs on the log writer thread (before the last records are drained),
+        otherwise on a daemon thread.
+        """
+        if self.async_mode:
+            get_pipeline().add_periodic(callback)
+            return
+
+        def run():
+            while True:
+                T.sleep(interval)
+                try:
+                    callback(False)
+                except Exception:
+                    pass
+
+        threading.Thread(target=run, name="shieldx-log-periodic", daemon=True).start()
+        atexit.register(callback, True)
+
+    def close(self):
+        """
+        Drain pending records and close the shared handlers.
+        """
+        if self.async_mode and _pipeline is not None:
+            _pipeline.stop()
+        for handler in self.handlers:
+            handler.close()
 
 
 class Log(logging.Logger):
@@ -95,7 +571,10 @@ class Log(logging.Logger):
                 create_folder: bool = True,
                 to_file: bool = LOG_TO_FILE,
                 when: str = LOG_ROTATION_WHEN,
-                interval: int = LOG_ROTATION_INTERVAL
+                interval: int = LOG_ROTATION_INTERVAL,
+                async_mode: bool = LOG_ASYNC,
+                runtime: "LogRuntime" = None,
+                sampler: LogSampler = None
                 ):
         """
         Initialize the logger with optional console and file handlers.
@@ -118,38 +597,72 @@ class Log(logging.Logger):
             to_file (bool): If True, enables file logging.
             when (str): TimedRotatingFileHandler `when` parameter (e.g., "m" for minutes).
             interval (int): TimedRotatingFileHandler `interval` parameter.
+            async_mode (bool): If True, records are only enqueued on the caller's thread and
+                formatted and written by the background log pipeline.
+            runtime (LogRuntime): Shared handlers to write through. When given, the handler
+                arguments above are ignored and no new handlers or files are opened.
+            sampler (LogSampler): Optional per event-key sampling of dict messages.
         """
         super().__init__(name, level)
+        self.sampler = sampler
+
+        if disabled:
+            return
+        if runtime is None:
+            runtime = LogRuntime(
+                formatter=formatter,
+                name=name,
+                path=path,
+                console_handler_filter=console_handler_filter,
+                file_handler_filter=file_handler_filter,
+                console_handler_level=console_handler_level,
+                file_handler_level=file_handler_level,
+                error_log=error_log,
+                filename=filename,
+                output_path=output_path,
+                error_output_path=error_output_path,
+                create_folder=create_folder,
+                to_file=to_file,
+                when=when,
+                interval=interval,
+                async_mode=async_mode,
+            )
+        runtime.attach(self)
 
-        if not os.path.exists(path) and create_folder:
-            os.makedirs(path)
-
-        if not disabled:
-            # Console handler
-            console_handler = logging.StreamHandler(sys.stdout)
-            console_handler.setFormatter(formatter)
-            console_handler.setLevel(console_handler_level)
-            console_handler.addFilter(console_handler_filter)
-            self.addHandler(console_handler)
-
-            if to_file:
-                # Rotating file handler
-                file_handler = TimedRotatingFileHandler(
-                    filename=output_path.unwrap_or(f"{path}/{filename.unwrap_or(name)}"),
-                    when=when,
-                    interval=interval
-                )
-                file_handler.setFormatter(formatter)
-                file_handler.setLevel(file_handler_level)
-                file_handler.addFilter(file_handler_filter)
-                self.addHandler(file_handler)
-
-            if error_log:
-                # Error file handler
-                error_file_handler = logging.FileHandler(
-                    filename=error_output_path.unwrap_or(f"{path}/{filename.unwrap_or(name)}.error")
-                )
-                error_file_handler.setFormatter(formatter)
-                error_file_handler.setLevel(logging.ERROR)
-                error_file_handler.addFilter(lambda record: record.levelno == logging.ERROR)
-                self.addHandler(error_file_handler)
+    def isEnabledFor(self, level):
+        """
+        Cheap rejection of levels below the logger's own level before the standard checks
+        (per-thread recursion guard and level cache), which dominate suppressed calls.
+        """
+        if level < self.level:
+            return False
+        return super().isEnabledFor(level)
+
+    def _log(self, level, msg, args, **kwargs):
+        """
+        Resolve lazy messages. `msg` may be a callable returning the message (usually a dict);
+        it is only called once the level check in `debug`/`info`/... has passed, so disabled
+        levels never build the payload.
+        """
+        if callable(msg):
+            msg = msg()
+        if self.sampler is not None and isinstance(msg, dict):
+            # Sampled before the record is built: suppressed calls skip findCaller, queue and formatting
+            allowed, summary = self.sampler.check(msg.get("event"))
+            if summary is not None:
+                # The call already passed the level check: never log the summary below its level
+                super()._log(max(level, logging.INFO), summary, ())
+            if not allowed:
+                return
+        trace_id = current_trace_id()
+        if trace_id is not None and "extra" not in kwargs:
+            # Correlates the record with the request or message being processed
+            kwargs["extra"] = {"trace_id": trace_id}
+        super()._log(level, msg, args, **kwargs)
+
+
+def get_log_stats() -> dict:
+    """
+    Return the counters of the background log pipeline (empty if it was never started).
+    """
+    return _pipeline.stats() if _pipeline is not None else {}
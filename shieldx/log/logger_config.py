@@ -2,7 +2,7 @@ import logging
 from shieldx import config
 
 
-from shieldx.log import Log
+from shieldx.log import Log, LogRuntime, LogSampler
 
 
 SHIELDX_DEBUG = config.SHIELDX_DEBUG
@@ -15,12 +15,35 @@ def console_handler_filter(lr: logging.LogRecord):
     return lr.levelno in (logging.INFO, logging.ERROR, logging.WARNING)
 
 
+# Un solo juego de handlers (consola, archivo rotativo y archivo de errores) para todos los módulos
+RUNTIME = LogRuntime(
+    name="shieldx",
+    console_handler_filter=console_handler_filter,
+    #path=SHIELDX_LOG_PATH
+)
+
+# Muestreo compartido: los límites por clave de evento valen para todo el proceso
+SAMPLER = LogSampler(LogSampler.parse(config.LOG_SAMPLING))
+
+_loggers = {}
+
+
+def _flush_sampling(final: bool = False):
+    # Los resúmenes también salen cuando deja de llegar tráfico de las claves muestreadas
+    summary = SAMPLER.flush(force=final)
+    if summary is not None:
+        get_logger("shieldx").info(summary)
+
+
+if SAMPLER.rules:
+    RUNTIME.add_periodic(_flush_sampling)
+
+
 def get_logger(name: str):
-    return Log(
-        name=name,
-        console_handler_filter=console_handler_filter,
-        #path=SHIELDX_LOG_PATH
-    )
+    logger = _loggers.get(name)
+    if logger is None:
+        logger = _loggers.setdefault(name, Log(name=name, runtime=RUNTIME, sampler=SAMPLER))
+    return logger
 
 # Logger genérico
 L = get_logger("shieldx")
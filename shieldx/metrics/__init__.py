@@ -0,0 +1,411 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import time as T
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Límites (segundos) de los histogramas de latencia: de 0.5 ms a 10 s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """
+    Base de las métricas: nombre, ayuda, etiquetas y un hijo por combinación de valores.
+
+    Las métricas se actualizan sin locks: cada proceso registra desde un único event loop,
+    igual que `TTLCache`. Para el camino caliente conviene resolver `labels(...)` una vez y
+    guardar el hijo.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """
+        Devuelve el hijo asociado a los valores de etiqueta (lo crea la primera vez).
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children.setdefault(tuple(str(v) for v in values), self._new_child())
+            self._children[values] = child
+        return child
+
+    def _unique_children(self) -> Iterable[Tuple[Tuple[str, ...], object]]:
+        seen = set()
+        for values, child in list(self._children.items()):
+            if id(child) in seen:
+                continue
+            seen.add(id(child))
+            yield tuple(str(v) for v in values), child
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for values, child in self._unique_children():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Counter(_Metric):
+    """
+    Contador monotónico.
+
+    Ejemplo:
+        MESSAGES = Counter("shieldx_consumer_messages_total", "Mensajes consumidos", ["queue", "outcome"])
+        MESSAGES.labels("s_security", "ok").inc()
+    """
+
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1):
+        self._children[()].inc(amount)
+
+
+class _GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+
+class Gauge(_Metric):
+    """
+    Valor que puede subir y bajar.
+    """
+
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._children[()].set(value)
+
+    def inc(self, amount: float = 1):
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1):
+        self._children[()].dec(amount)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # Un contador por límite más el de +Inf; se acumulan al exportar
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    """
+    Histograma con límites fijos, exportado con cubetas acumuladas (`le`), `_sum` y `_count`.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def _render_child(self, values, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class CallbackMetric(_Metric):
+    """
+    Métrica calculada al exportar: `fn` devuelve pares `(valores_de_etiqueta, valor)`.
+    Sirve para exponer estados que ya viven en otro objeto (p. ej. estadísticas de cachés).
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], fn: Callable[[], Iterable[Tuple[Sequence[str], float]]], type: str = "gauge"):
+        self.fn = fn
+        self.type = type
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return None
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for values, value in self.fn():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    """
+    Conjunto de métricas del proceso. `counter`, `gauge` e `histogram` devuelven la métrica
+    existente si ya se registró con ese nombre, de modo que los módulos pueden declararlas
+    al importarse sin coordinarse.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._metrics.get(name) or self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._metrics.get(name) or self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.get(name) or self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """
+        Devuelve todas las métricas en el formato de texto de Prometheus (0.0.4).
+        """
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# ---------- Métricas de ShieldX ----------
+
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "shieldx_http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por ruta",
+    ["method", "route", "status"],
+)
+MONGO_OPERATION_DURATION = REGISTRY.histogram(
+    "shieldx_mongo_operation_duration_seconds",
+    "Latencia de los métodos de repositorio contra MongoDB",
+    ["repository", "method"],
+)
+MONGO_OPERATION_ERRORS = REGISTRY.counter(
+    "shieldx_mongo_operation_errors_total",
+    "Métodos de repositorio que terminaron con excepción",
+    ["repository", "method"],
+)
+CONSUMER_MESSAGES = REGISTRY.counter(
+    "shieldx_consumer_messages_total",
+    "Mensajes procesados por el consumidor",
+    ["queue", "outcome"],
+)
+CONSUMER_PROCESSING_DURATION = REGISTRY.histogram(
+    "shieldx_consumer_processing_duration_seconds",
+    "Tiempo de procesamiento de cada mensaje consumido",
+    ["queue"],
+)
+CONSUMER_LAG = REGISTRY.histogram(
+    "shieldx_consumer_lag_seconds",
+    "Tiempo entre la publicación de un mensaje y el inicio de su procesamiento",
+    ["queue"],
+)
+
+_caches: Dict[str, object] = {}
+
+
+def register_cache(name: str, cache) -> None:
+    """
+    Expone las estadísticas de una caché (cualquier objeto con `stats()` como `TTLCache`).
+    """
+    _caches[name] = cache
+
+
+def _cache_stat(field: str):
+    return lambda: [((name,), cache.stats()[field]) for name, cache in list(_caches.items())]
+
+
+for _field, _type, _doc in [
+    ("hits", "counter", "Lecturas de caché con acierto"),
+    ("misses", "counter", "Lecturas de caché sin acierto"),
+    ("evictions", "counter", "Entradas desalojadas de la caché"),
+    ("size", "gauge", "Entradas retenidas en la caché"),
+    ("hit_rate", "gauge", "Proporción de aciertos de la caché"),
+]:
+    REGISTRY.register(CallbackMetric(
+        f"shieldx_cache_{_field}" + ("_total" if _type == "counter" else ""),
+        _doc,
+        ["cache"],
+        _cache_stat(_field),
+        type=_type,
+    ))
+
+
+def timed_repository(cls):
+    """
+    Decorador de clase: mide cada método público asíncrono definido en `cls` y lo registra
+    en `shieldx_mongo_operation_duration_seconds` con el nombre de la clase concreta.
+    Si una subclase sobrescribe un método y llama a `super()`, la operación se mide una vez.
+    """
+    for attr, fn in list(vars(cls).items()):
+        if attr.startswith("_") or not inspect.iscoroutinefunction(fn):
+            continue
+        setattr(cls, attr, _timed_method(fn))
+    return cls
+
+
+# Operación (repositorio, método) que ya se está midiendo en este contexto
+_timing: contextvars.ContextVar[Optional[Tuple[int, str]]] = contextvars.ContextVar("shieldx_repository_timing", default=None)
+
+
+def _timed_method(fn):
+    method = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        key = (id(self), method)
+        if _timing.get() == key:
+            # super() call from the outer timed override
+            return await fn(self, *args, **kwargs)
+        token = _timing.set(key)
+        t0 = T.perf_counter()
+        try:
+            return await fn(self, *args, **kwargs)
+        except BaseException:
+            MONGO_OPERATION_ERRORS.labels(type(self).__name__, method).inc()
+            raise
+        finally:
+            MONGO_OPERATION_DURATION.labels(type(self).__name__, method).observe(T.perf_counter() - t0)
+            _timing.reset(token)
+
+    return wrapper
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mide la latencia de cada petición HTTP.
+
+    La etiqueta `route` es la plantilla de la ruta (`/api/v1/events/{event_id}`), no la URL,
+    para que el número de series no crezca con los IDs.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        t0 = T.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status["code"],
+            ).observe(T.perf_counter() - t0)
+
+
+async def start_metrics_server(host: str = "0.0.0.0", port: int = 9100) -> asyncio.AbstractServer:
+    """
+    Servidor HTTP mínimo que responde `/metrics`, para procesos sin FastAPI (consumidor).
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode(errors="replace").split()
+            if len(parts) >= 2 and parts[1].split("?")[0] == "/metrics":
+                body, status = REGISTRY.render().encode(), "200 OK"
+            else:
+                body, status = b"Not Found\n", "404 Not Found"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
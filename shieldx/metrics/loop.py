@@ -0,0 +1,148 @@
+import asyncio
+import sys
+import threading
+import time as T
+import traceback
+from collections import deque
+from typing import Any, Dict, Optional
+
+from shieldx import config
+from shieldx.log.logger_config import get_logger
+from shieldx.metrics import REGISTRY
+
+L = get_logger(__name__)
+
+LOOP_LAG = REGISTRY.histogram(
+    "shieldx_event_loop_lag_seconds",
+    "Retraso del event loop al despertar una tarea programada",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_PENDING_TASKS = REGISTRY.gauge(
+    "shieldx_event_loop_pending_tasks",
+    "Tareas de asyncio pendientes en el event loop",
+)
+LOOP_BLOCKED = REGISTRY.counter(
+    "shieldx_event_loop_blocked_total",
+    "Veces que un callback bloqueó el event loop más allá del umbral",
+)
+
+_monitor: Optional["LoopMonitor"] = None
+
+
+def get_loop_monitor() -> Optional["LoopMonitor"]:
+    """
+    Monitor activo en el proceso, o None si no se inició.
+    """
+    return _monitor
+
+
+class LoopMonitor:
+    """
+    Monitor del event loop de asyncio.
+
+    - Una tarea de sondeo duerme `interval` segundos y mide cuánto tarda de más en despertar
+      (lag de planificación); también cuenta las tareas pendientes.
+    - Un hilo vigilante comprueba que el sondeo siga latiendo. Si el loop lleva más de
+      `blocked_ms` sin atenderlo, captura la pila del hilo del loop mientras sigue bloqueado
+      y la registra en los logs (`EVENT_LOOP.BLOCKED`) y en un buffer para `/admin/loop`.
+    """
+
+    def __init__(
+        self,
+        interval: float = config.SHIELDX_LOOP_MONITOR_INTERVAL,
+        blocked_ms: float = config.SHIELDX_LOOP_BLOCKED_MS,
+        capacity: int = 50,
+    ):
+        """
+        Args:
+            interval (float): Segundos entre sondeos del loop.
+            blocked_ms (float): Milisegundos sin latido a partir de los cuales se reporta un bloqueo.
+            capacity (int): Bloqueos retenidos para consulta.
+        """
+        self.interval = interval
+        self.blocked_ms = blocked_ms
+        self.blocked: deque = deque(maxlen=capacity)
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.pending_tasks = 0
+        self._beat = T.perf_counter()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self):
+        """
+        Inicia el sondeo en el loop actual y el hilo vigilante. Debe llamarse desde el loop.
+        """
+        global _monitor
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = T.perf_counter()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._probe(), name="shieldx-loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="shieldx-loop-watchdog", daemon=True)
+        self._watchdog.start()
+        _monitor = self
+
+    async def stop(self):
+        global _monitor
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if _monitor is self:
+            _monitor = None
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            t0 = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - t0 - self.interval)
+            self._beat = T.perf_counter()
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+            self.pending_tasks = len(asyncio.all_tasks(loop))
+            LOOP_PENDING_TASKS.set(self.pending_tasks)
+
+    def _watch(self):
+        reported_beat = None
+        threshold = self.interval + self.blocked_ms / 1e3
+        check_every = max(0.005, self.blocked_ms / 2e3)
+        while not self._stop.wait(check_every):
+            beat = self._beat
+            blocked_for = T.perf_counter() - beat - self.interval
+            if T.perf_counter() - beat < threshold or beat == reported_beat:
+                continue
+            # One report per stall: the same beat is not reported twice
+            reported_beat = beat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = traceback.format_stack(frame) if frame is not None else []
+            report = {
+                "detected_at": T.time(),
+                "blocked_ms": blocked_for * 1e3,
+                "stack": [line.rstrip() for line in stack],
+            }
+            self.blocked.append(report)
+            LOOP_BLOCKED.inc()
+            L.warning({
+                "event": "EVENT_LOOP.BLOCKED",
+                "blocked_ms": report["blocked_ms"],
+                "stack": report["stack"][-8:],
+            })
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "blocked_ms_threshold": self.blocked_ms,
+            "last_lag_ms": self.last_lag * 1e3,
+            "max_lag_ms": self.max_lag * 1e3,
+            "pending_tasks": self.pending_tasks,
+            "blocked": list(self.blocked),
+        }
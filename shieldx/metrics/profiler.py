@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+import time as T
+from collections import Counter
+from typing import Dict, Optional
+
+_session_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """
+    Ya hay una sesión de perfilado en curso en el proceso.
+    """
+
+
+class SamplingProfiler:
+    """
+    Perfilador estadístico por muestreo de pilas.
+
+    Un hilo toma `sys._current_frames()` cada `interval` segundos y cuenta cada pila
+    (de la raíz a la hoja). No instrumenta llamadas, así que el costo depende solo de la
+    frecuencia de muestreo y del número de hilos, no de la carga. El resultado se exporta
+    en formato "collapsed stacks" (`marco;marco;marco cuenta`), el que consumen
+    flamegraph.pl, speedscope o inferno.
+    """
+
+    def __init__(self, interval: float = 0.01, thread_ids: Optional[set] = None):
+        """
+        Args:
+            interval (float): Segundos entre muestras.
+            thread_ids (set | None): Hilos a muestrear (todos si es None).
+        """
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[object, str] = {}
+
+    def start(self):
+        """
+        Inicia el muestreo. Solo puede haber una sesión activa por proceso.
+
+        Raises:
+            ProfilerBusy: Si otra sesión sigue en curso.
+        """
+        if not _session_lock.acquire(blocking=False):
+            raise ProfilerBusy("A profiling session is already running")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="shieldx-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Detiene el muestreo y libera la sesión.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            _session_lock.release()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+            self._labels[code] = label
+        return label
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        t0 = T.perf_counter()
+        while not self._stop.wait(self.interval):
+            if len(names) != threading.active_count():
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+        self.duration = T.perf_counter() - t0
+
+    def collapsed(self) -> str:
+        """
+        Pilas en formato collapsed, de la más frecuente a la menos frecuente.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def is_profiling() -> bool:
+    return _session_lock.locked()
@@ -1,7 +1,8 @@
-from shieldx.models.event_model import EventModel
+from shieldx.models.event_model import EventModel, PayloadRefModel
 from shieldx.models.event_types import EventTypeModel
 from shieldx.models.trigger_models import TriggerModel
 from shieldx.models.rule_models import RuleModel
 from shieldx.models.events_triggers import EventsTriggersModel
 from shieldx.models.rules_trigger import RulesTriggerModel
-from shieldx.models.triggers_triggers import TriggersTriggersModel
\ No newline at end of file
+from shieldx.models.triggers_triggers import TriggersTriggersModel
+from shieldx.models.replay_models import ReplayRequestModel
\ No newline at end of file
@@ -5,6 +5,21 @@ from bson import ObjectId
 
 """Modelos de Eventos"""
 
+class PayloadRefModel(BaseModel):
+    """
+    Referencia a un payload guardado en el almacén de objetos.
+
+    Atributos:
+    - store: Almacén donde está el objeto ("local", "mictlanx").
+    - key: Llave del objeto (SHA-256 del contenido).
+    - digest: Digest del contenido, `sha256:<hex>`, verificado al leerlo.
+    - size: Tamaño del payload serializado en bytes.
+    """
+    store: str
+    key: str
+    digest: str
+    size: int
+
 class EventModel(BaseModel):
     """
     Modelo base que representa un evento generado dentro del sistema ShieldX.
@@ -19,6 +34,8 @@ class EventModel(BaseModel):
     - event_type: Tipo de evento generado (por ejemplo, EncryptStart, SkmeansDone, etc.).
     - timestamp: Fecha y hora en la que ocurrió el evento (UTC por defecto).
     - payload: Carga útil opcional con datos adicionales del evento.
+    - idempotency_key: Llave opcional provista por el cliente para descartar reintentos duplicados.
+    - payload_ref: Referencia al payload si se guardó en el almacén de objetos (`payload` queda vacío).
     """
     event_id: Optional[str] = Field(default=None, alias="_id")
     service_id: str
@@ -27,6 +44,8 @@ class EventModel(BaseModel):
     event_type: str
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     payload: Optional[Any] = None
+    idempotency_key: Optional[str] = None
+    payload_ref: Optional[PayloadRefModel] = None
 
     @field_validator("event_id", mode="before")
     def convert_object_id(cls, v):
@@ -0,0 +1,54 @@
+from pydantic import BaseModel, Field, model_validator
+from datetime import datetime
+from typing import List, Optional
+from shieldx import config
+
+class ReplayRequestModel(BaseModel):
+    """
+    Modelo que describe un replay: qué eventos históricos se vuelven a pasar por la
+    resolución de triggers y reglas, y a qué ritmo.
+
+    Atributos:
+    - start / end: Rango de `timestamp` de los eventos, `[start, end)`.
+    - service_id, microservice_id, function_id, event_type: Filtros opcionales sobre los eventos.
+    - trigger_ids / rule_ids: Si se indican, solo se guardan las coincidencias que incluyan
+      alguno de estos triggers o reglas (p. ej. los recién creados).
+    - partitions: Número de particiones del rango que se recorren en paralelo.
+    - rate: Máximo de eventos por segundo entre todas las particiones.
+    - batch_size: Eventos leídos por consulta (y entre checkpoints).
+    """
+
+    start: datetime
+    end: datetime
+    service_id: Optional[str] = None
+    microservice_id: Optional[str] = None
+    function_id: Optional[str] = None
+    event_type: Optional[str] = None
+    trigger_ids: List[str] = Field(default_factory=list)
+    rule_ids: List[str] = Field(default_factory=list)
+    partitions: int = Field(default=4, ge=1, le=64)
+    rate: float = Field(default=config.SHIELDX_REPLAY_DEFAULT_RATE, gt=0)
+    batch_size: int = Field(default=500, ge=1, le=10000)
+
+    @model_validator(mode="after")
+    def validate_range(self) -> "ReplayRequestModel":
+        """
+        Valida que el rango de tiempo no esté vacío.
+        """
+        if self.end <= self.start:
+            raise ValueError("`end` must be after `start`")
+        return self
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "start": "2025-01-01T00:00:00Z",
+                "end": "2025-02-01T00:00:00Z",
+                "event_type": "EncryptStart",
+                "trigger_ids": ["662018c50c9fba58a4fc1689"],
+                "partitions": 4,
+                "rate": 500,
+                "batch_size": 500
+            }
+        }
+    }
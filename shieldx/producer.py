@@ -1,27 +1,34 @@
 import asyncio
+import os
 from shieldx.broker import AsyncRabbitMQService
 from shieldx.models import EventModel
 import time as T
+
+# Named queue for consumers started in the legacy layout (QUEUES); empty: sharded layout
+PRODUCER_QUEUE = os.environ.get("SHIELDX_PRODUCER_QUEUE", "")
+
 async def main():
 
-    service = AsyncRabbitMQService(queues=["s_security"])
+    service = AsyncRabbitMQService(queues=[PRODUCER_QUEUE] if PRODUCER_QUEUE else None, publisher=not PRODUCER_QUEUE)
     await service.connect()
     N_events= 100
-    # Example: Publish a message
-    queue_id = "s_security"
     for i in range(N_events):
-        await service.publish(queue_id,  
-            EventModel(
-                service_id=f"service-{i}",
-                microservice_id=f"micro-{i}",
-                function_id=f"func-{i}", 
-                event_type="EncryptStart",
-                timestamp=T.time(),
-                payload={}
-            ).model_dump()
+        event = EventModel(
+            service_id=f"service-{i}",
+            microservice_id=f"micro-{i}",
+            function_id=f"func-{i}", 
+            event_type="EncryptStart",
+            timestamp=T.time(),
+            payload={}
         )
-        T.sleep(1)
+        if PRODUCER_QUEUE:
+            await service.publish(PRODUCER_QUEUE, event.model_dump(mode="json"))
+        else:
+            # Routed to the shard queue that owns its service_id (SHIELDX_CONSUMER_SHARDS / SHIELDX_WORKER_*)
+            await service.publish_event(event)
+        # Non-blocking wait: T.sleep would stall the event loop (and the broker connection)
+        await asyncio.sleep(1)
     
-    service.close()
+    await service.close()
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -5,4 +5,6 @@ from shieldx.repositories.events_triggers_repository import EventsTriggersReposi
 from shieldx.repositories.rules_repository import RuleRepository
 from shieldx.repositories.rules_trigger_repository import RulesTriggerRepository
 from shieldx.repositories.trigger_repository import TriggersRepository
-from shieldx.repositories.triggers_triggers_repository import TriggersTriggersRepository
\ No newline at end of file
+from shieldx.repositories.triggers_triggers_repository import TriggersTriggersRepository
+from shieldx.repositories.sync_repository import SyncRepository
+from shieldx.repositories.replay_repository import ReplayRepository
\ No newline at end of file
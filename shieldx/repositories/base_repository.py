@@ -3,6 +3,8 @@ from pydantic import BaseModel
 from motor.motor_asyncio import AsyncIOMotorCollection
 from pymongo.errors import PyMongoError
 from shieldx.log.logger_config import get_logger
+from shieldx.metrics import timed_repository
+from shieldx.tracing import traced
 from fastapi import HTTPException
 
 L = get_logger(__name__)
@@ -13,6 +15,8 @@ L = get_logger(__name__)
 """
 T = TypeVar("T", bound=BaseModel)
 
+@traced("repository")
+@timed_repository
 class BaseRepository(Generic[T]):
     """
     Clase base genérica para operaciones CRUD sobre colecciones MongoDB 
@@ -31,10 +35,14 @@ class BaseRepository(Generic[T]):
     Atributos:
         collection (AsyncIOMotorCollection): Colección MongoDB asíncrona.
         model (Type[T]): Clase del modelo Pydantic que representa los documentos.
+        PROFILE (str): Perfil de conexión (SHIELDX_MONGO_PROFILES) con el que el contenedor
+            construye el repositorio.
 
     Ejemplo de uso:
         repo = BaseRepository(collection=db["events"], model=EventModel)
     """
+    PROFILE = "config"
+
     def __init__(self, collection: AsyncIOMotorCollection, model: Type[T]):
         """
         Inicializa el repositorio con la colección y el modelo correspondiente.
@@ -46,6 +54,19 @@ class BaseRepository(Generic[T]):
         self.collection = collection
         self.model = model
 
+    def _to_model(self, document: dict) -> T:
+        """
+        Convierte un documento leído de MongoDB en el modelo. Los repositorios que guardan
+        campos en otra representación (p. ej. comprimidos) lo sobrescriben.
+        """
+        return self.model(**document)
+
+    async def _prepare(self, documents: list[dict]):
+        """
+        Se llama con los documentos leídos antes de convertirlos con `_to_model`, para cargar
+        lo que necesiten (p. ej. diccionarios de compresión). Por defecto no hace nada.
+        """
+
     async def find_one(self, query: dict) -> T | None:
         """
         Busca un único documento en la colección según el filtro proporcionado.
@@ -59,7 +80,10 @@ class BaseRepository(Generic[T]):
         """
         try:
             doc = await self.collection.find_one(query)
-            return self.model(**doc) if doc else None
+            if not doc:
+                return None
+            await self._prepare([doc])
+            return self._to_model(doc)
         except PyMongoError as e:
             L.error({            
                 "error": str(e)
@@ -117,7 +141,8 @@ class BaseRepository(Generic[T]):
                 updated_doc = await self.collection.find_one(query)
                 if updated_doc:
                     updated_doc["id"] = str(updated_doc["_id"])  # opcional si usas alias
-                    return self.model(**updated_doc)
+                    await self._prepare([updated_doc])
+                    return self._to_model(updated_doc)
 
             return None
         except PyMongoError as e:
@@ -160,7 +185,9 @@ class BaseRepository(Generic[T]):
         """
         try:    
             cursor = self.collection.find()
-            return [self.model(**doc) async for doc in cursor]
+            docs = [doc async for doc in cursor]
+            await self._prepare(docs)
+            return [self._to_model(doc) for doc in docs]
         except PyMongoError as e:
             L.error({
                 "error": str(e)
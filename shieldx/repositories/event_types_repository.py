@@ -1,12 +1,19 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from shieldx.models import EventTypeModel
 from shieldx.log.logger_config import get_logger
+from shieldx.metrics import timed_repository
+from shieldx.tracing import traced
+from shieldx.cache.repository import cached_repository
+from shieldx.db.changelog import TrackedCollection
 import time as T
 from shieldx.repositories import BaseRepository
 
 L = get_logger(__name__)
 
 
+@cached_repository("event_types", reads=("find_one", "find_all", "get_by_name"))
+@traced("repository")
+@timed_repository
 class EventTypeRepository(BaseRepository[EventTypeModel]):
     """
     Repositorio responsable de realizar operaciones CRUD sobre la colección `event_types`
@@ -14,7 +21,7 @@ class EventTypeRepository(BaseRepository[EventTypeModel]):
     """
 
     def __init__(self, db: AsyncIOMotorDatabase):
-        super().__init__(collection=db["event_types"], model=EventTypeModel)
+        super().__init__(collection=TrackedCollection(db["event_types"]), model=EventTypeModel)
 
     async def get_by_name(self, name: str):
         """
@@ -28,7 +35,7 @@ class EventTypeRepository(BaseRepository[EventTypeModel]):
             doc = await self.collection.find_one({"event_type": name})
             if doc:
                 L.debug(
-                    {
+                    lambda: {
                         "event": "EVENT_TYPE.FOUND_BY_NAME",
                         "name": name,
                         "time": T.time() - t1,
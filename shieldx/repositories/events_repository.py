@@ -1,20 +1,140 @@
-from typing import List
+from typing import List, Optional
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo.errors import PyMongoError
+from pydantic import BaseModel
+from pymongo.errors import PyMongoError, DuplicateKeyError
+from pymongo.write_concern import WriteConcern
+from fastapi import HTTPException
 from shieldx.repositories import BaseRepository
 from shieldx.models import EventModel
+from shieldx.compression import COMPRESSED_FIELD, DICTIONARIES_COLLECTION, PAYLOAD_DECODE_ERRORS, PayloadCodec, PayloadCompressionError, get_payload_codec
 
 from shieldx.log.logger_config import get_logger
+from shieldx.metrics import timed_repository
+from shieldx.tracing import traced
+from shieldx import config
 import time as T
 
 L = get_logger(__name__)
 
+# Campos de un evento que se pueden pedir con `fields`; `event_id` es el `_id` del documento
+EVENT_FIELDS = ("event_id", "service_id", "microservice_id", "function_id", "event_type", "timestamp", "payload", "idempotency_key", "payload_ref")
 
 
+def _projection(fields: List[str]) -> dict:
+    # An explicit _id keeps the projection inclusive even when only event_id was requested
+    projection = {"_id": 1, **{field: 1 for field in fields if field != "event_id"}}
+    if "payload" in fields:
+        projection[COMPRESSED_FIELD] = 1
+    return projection
+
+
+def _projected(document: dict) -> dict:
+    document["event_id"] = str(document.pop("_id"))
+    return document
+
+
+@traced("repository")
+@timed_repository
 class EventsRepository(BaseRepository[EventModel]):
-    def __init__(self, db: AsyncIOMotorDatabase):
+    """
+    Repositorio de la colección `events`.
+
+    Las escrituras y lecturas puntuales usan el perfil `ingest`; los listados y búsquedas
+    van por `read_collection` (perfil `analytics`), que puede leer de secundarios.
+    """
+
+    PROFILE = "ingest"
+    READ_PROFILE = "analytics"
+
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        read_db: Optional[AsyncIOMotorDatabase] = None,
+        codec: Optional[PayloadCodec] = None,
+    ):
         super().__init__(collection=db["events"], model=EventModel)
-    
+        # Payloads grandes se guardan comprimidos y se descomprimen al leer documentos que los incluyen
+        self.codec = get_payload_codec() if codec is None else codec
+        # Diccionarios de compresión compartidos por todos los procesos
+        self.dictionaries = db[DICTIONARIES_COLLECTION]
+        self.read_collection = (db if read_db is None else read_db)["events"]
+        # w=0 solo para las inserciones: actualizar y borrar necesitan el resultado confirmado
+        self.insert_collection = (
+            self.collection.with_options(write_concern=WriteConcern(w=0))
+            if config.SHIELDX_EVENTS_UNACKNOWLEDGED_INSERTS else self.collection
+        )
+
+    async def insert_one(self, data: EventModel) -> str:
+        """
+        Inserta un evento. Si el índice único de `idempotency_key` rechaza el documento,
+        devuelve el ID del evento que ya estaba almacenado con esa llave.
+        """
+        await self.codec.sync_dictionaries(self.dictionaries)
+        try:
+            result = await self.insert_collection.insert_one(self.codec.deflate(data.model_dump(by_alias=True, exclude_none=True)))
+            return str(result.inserted_id)
+        except DuplicateKeyError as e:
+            key = getattr(data, "idempotency_key", None)
+            existing = await self.find_id_by_idempotency_key(key) if key else None
+            if existing is None:
+                L.error({"event": "EVENT.INSERT.DUPLICATE.ERROR", "error": str(e)})
+                raise HTTPException(status_code=409, detail="Duplicate event")
+            L.warning({
+                "event": "EVENT.INSERT.DUPLICATE",
+                "idempotency_key": key,
+                "event_id": existing
+            })
+            return existing
+        except PyMongoError as e:
+            L.error({"event": "EVENT.INSERT.ERROR", "error": str(e)})
+            raise HTTPException(status_code=500, detail="Database error in insert_one")
+
+    async def update_one(self, query: dict, data: EventModel | dict) -> Optional[EventModel]:
+        """
+        Actualiza un evento; un `payload` nuevo se comprime igual que al insertarlo.
+        """
+        if isinstance(data, BaseModel):
+            data = data.model_dump(by_alias=True, exclude_none=True)
+        if "payload" in data:
+            await self.codec.sync_dictionaries(self.dictionaries)
+            data = dict(data)
+            data[COMPRESSED_FIELD] = self.codec.compress(data["payload"], data.get("event_type"))
+            if data[COMPRESSED_FIELD] is not None:
+                data["payload"] = None
+        return await super().update_one(query, data)
+
+    async def _prepare(self, documents: List[dict]):
+        # Documents compressed by another process may use dictionaries this one has not loaded
+        await self.codec.load_dictionaries(self.dictionaries, documents)
+
+    def _inflate(self, document: dict, strict: bool = True) -> dict:
+        """
+        Documento con su `payload` descomprimido.
+
+        Si no se puede descomprimir, con `strict` responde 502; sin él (listados) registra el
+        error y devuelve el evento sin payload, para no perder el resto de la página.
+        """
+        try:
+            return self.codec.inflate(document)
+        except PayloadCompressionError as e:
+            PAYLOAD_DECODE_ERRORS.inc()
+            L.error({"event": "EVENT.PAYLOAD.DECODE.ERROR", "event_id": str(document.get("_id")), "error": str(e)})
+            if strict:
+                raise HTTPException(status_code=502, detail="Event payload could not be decompressed")
+            document["payload"] = None
+            return document
+
+    def _to_model(self, document: dict, strict: bool = True) -> EventModel:
+        return EventModel(**self._inflate(document, strict))
+
+    async def find_id_by_idempotency_key(self, idempotency_key: str) -> Optional[str]:
+        """
+        Obtiene el ID del evento registrado con la `idempotency_key` indicada.
+        """
+        document = await self.collection.find_one({"idempotency_key": idempotency_key}, {"_id": 1})
+        return str(document["_id"]) if document else None
+
     async def find_events(self, filters: dict, limit: int = 100, skip: int = 0) -> List[EventModel]:
             """
             Obtiene eventos aplicando filtros dinámicos.
@@ -22,11 +142,13 @@ class EventsRepository(BaseRepository[EventModel]):
             t1 = T.time()
             events = []
             try:
-                cursor = self.collection.find(filters).skip(skip).limit(limit)
-                async for document in cursor:
+                cursor = self.read_collection.find(filters).skip(skip).limit(limit)
+                documents = [document async for document in cursor]
+                await self._prepare(documents)
+                for document in documents:
                     document["id"] = str(document["_id"])
-                    events.append(EventModel(**document))
-                L.debug({
+                    events.append(self._to_model(document, strict=False))
+                L.debug(lambda: {
                     "event": "EVENT.SEARCH",
                     "filters": filters,
                     "count": len(events),
@@ -37,6 +159,47 @@ class EventsRepository(BaseRepository[EventModel]):
                         "error": str(e)})
             return events
 
+    async def find_event_fields(self, filters: dict, fields: List[str], limit: Optional[int] = None, skip: int = 0) -> List[dict]:
+        """
+        Obtiene solo los campos indicados de los eventos que cumplen los filtros.
+
+        La proyección se aplica en Mongo, así no viajan los campos omitidos (p. ej. `payload`),
+        y los documentos se devuelven como diccionarios sin pasar por EventModel.
+        `event_id` se incluye siempre.
+        """
+        t1 = T.time()
+        projection = _projection(fields)
+        documents = []
+        try:
+            cursor = self.read_collection.find(filters, projection).skip(skip)
+            if limit is not None:
+                cursor = cursor.limit(limit)
+            documents = [document async for document in cursor]
+            await self._prepare(documents)
+            documents = [_projected(self._inflate(document, strict=False)) for document in documents]
+            L.debug(lambda: {
+                "event": "EVENT.SEARCH.PROJECTED",
+                "filters": filters,
+                "fields": fields,
+                "count": len(documents),
+                "time": T.time() - t1
+            })
+        except PyMongoError as e:
+            L.error({"event": "EVENT.SEARCH.PROJECTED.ERROR",
+                    "error": str(e)})
+        return documents
+
+    async def find_event_fields_by_id(self, event_id: ObjectId, fields: List[str]) -> Optional[dict]:
+        """
+        Obtiene solo los campos indicados de un evento.
+        """
+        projection = _projection(fields)
+        document = await self.collection.find_one({"_id": event_id}, projection)
+        if not document:
+            return None
+        await self._prepare([document])
+        return _projected(self._inflate(document))
+
     async def find_events_by_service(self, service_id: str) -> List[EventModel]:
         """
         Obtiene eventos filtrados por `service_id`.
@@ -44,11 +207,13 @@ class EventsRepository(BaseRepository[EventModel]):
         t1 = T.time()
         events = []
         try:
-            cursor = self.collection.find({"service_id": service_id})
-            async for document in cursor:
+            cursor = self.read_collection.find({"service_id": service_id})
+            documents = [document async for document in cursor]
+            await self._prepare(documents)
+            for document in documents:
                 document["id"] = str(document["_id"])
-                events.append(EventModel(**document))
-            L.debug({
+                events.append(self._to_model(document, strict=False))
+            L.debug(lambda: {
                 "event": "EVENTS.FETCH.BY_SERVICE",
                 "service_id": service_id,
                 "count": len(events),
@@ -67,11 +232,13 @@ class EventsRepository(BaseRepository[EventModel]):
         t1 = T.time()
         events = []
         try:
-            cursor = self.collection.find({"microservice_id": microservice_id})
-            async for document in cursor:
+            cursor = self.read_collection.find({"microservice_id": microservice_id})
+            documents = [document async for document in cursor]
+            await self._prepare(documents)
+            for document in documents:
                 document["id"] = str(document["_id"])
-                events.append(EventModel(**document))
-            L.debug({
+                events.append(self._to_model(document, strict=False))
+            L.debug(lambda: {
                 "event": "EVENTS.FETCH.BY_MICROSERVICE",
                 "microservice_id": microservice_id,
                 "count": len(events),
@@ -90,11 +257,13 @@ class EventsRepository(BaseRepository[EventModel]):
         t1 = T.time()
         events = []
         try:
-            cursor = self.collection.find({"function_id": function_id})
-            async for document in cursor:
+            cursor = self.read_collection.find({"function_id": function_id})
+            documents = [document async for document in cursor]
+            await self._prepare(documents)
+            for document in documents:
                 document["id"] = str(document["_id"])
-                events.append(EventModel(**document))
-            L.debug({
+                events.append(self._to_model(document, strict=False))
+            L.debug(lambda: {
                 "event": "EVENTS.FETCH.BY_FUNCTION",
                 "function_id": function_id,
                 "count": len(events),
@@ -1,19 +1,32 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from shieldx.models import EventsTriggersModel
 from shieldx.log.logger_config import get_logger
+from shieldx.metrics import timed_repository
+from shieldx.tracing import traced
+from shieldx.cache.repository import cached_repository
+from shieldx.db.changelog import TrackedCollection
 import time as T
 from pymongo.errors import PyMongoError
 
 L = get_logger(__name__)
 
+@cached_repository(
+    "events_triggers",
+    reads=("get_triggers_by_event_type",),
+    writes=("link", "unlink", "replace_links"),
+)
+@traced("repository")
+@timed_repository
 class EventsTriggersRepository:
     """
     Repositorio encargado de manejar la relación muchos-a-muchos entre tipos de evento (`EventType`)
     y triggers, usando la colección `events_triggers`.
     """
 
+    PROFILE = "config"
+
     def __init__(self, db: AsyncIOMotorDatabase):
-        self.collection = db["events_triggers"]
+        self.collection = TrackedCollection(db["events_triggers"])
 
     async def link(self, event_type_id: str, trigger_id: str):
         """
@@ -94,7 +107,7 @@ class EventsTriggersRepository:
         try:
             cursor = self.collection.find({"event_type_id": event_type_id})
             triggers = [EventsTriggersModel(**doc) async for doc in cursor]
-            L.debug({
+            L.debug(lambda: {
                 "event": "EVENT_TRIGGER.FETCH.BY_EVENT_TYPE",
                 "event_type_id": event_type_id,
                 "count": len(triggers),
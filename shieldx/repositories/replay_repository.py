@@ -0,0 +1,181 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError
+from shieldx.log.logger_config import get_logger
+from shieldx.metrics import timed_repository
+from shieldx.tracing import traced
+
+L = get_logger(__name__)
+
+REPLAYS_COLLECTION = "replay_checkpoints"
+RESULTS_COLLECTION = "replay_results"
+# Estados desde los que un operador puede reanudar un replay (además de `running` sin latido reciente)
+RESUMABLE_STATUSES = ("cancelled", "failed")
+DUPLICATE_KEY = 11000
+
+
+@traced("repository")
+@timed_repository
+class ReplayRepository:
+    """
+    Persistencia del motor de replay:
+
+    - Lectura de `events` por rango de tiempo con cursores keyset `(timestamp, _id)`,
+      a través de `read_db` (perfil `analytics`, puede leer de secundarios).
+    - Checkpoints de cada replay y sus particiones en `replay_checkpoints`.
+    - Coincidencias (evento → triggers y reglas) en `replay_results`.
+    """
+
+    PROFILE = "config"
+    READ_PROFILE = "analytics"
+
+    def __init__(self, db: AsyncIOMotorDatabase, read_db: Optional[AsyncIOMotorDatabase] = None):
+        self.events = (db if read_db is None else read_db)["events"]
+        self.replays = db[REPLAYS_COLLECTION]
+        self.results = db[RESULTS_COLLECTION]
+
+    async def scan_events(
+        self,
+        filters: dict,
+        start: datetime,
+        end: datetime,
+        after: Optional[Tuple[datetime, Any]],
+        limit: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Siguiente lote de eventos en `[start, end)` ordenados por `(timestamp, _id)`, a partir
+        de la posición `after` (exclusiva). Solo trae los campos que necesita la resolución.
+        """
+        query = {**filters, "timestamp": {"$gte": start, "$lt": end}}
+        if after is not None:
+            last_timestamp, last_id = after
+            query["$or"] = [
+                {"timestamp": {"$gt": last_timestamp}},
+                {"timestamp": last_timestamp, "_id": {"$gt": last_id}},
+            ]
+        cursor = (
+            self.events.find(query, {"_id": 1, "timestamp": 1, "event_type": 1})
+            .sort([("timestamp", ASCENDING), ("_id", ASCENDING)])
+            .limit(limit)
+        )
+        return [document async for document in cursor]
+
+    async def create(self, replay: Dict[str, Any]):
+        await self.replays.insert_one(replay)
+
+    async def get(self, replay_id: str) -> Optional[Dict[str, Any]]:
+        return await self.replays.find_one({"_id": replay_id})
+
+    async def list_replays(self, limit: int = 50) -> List[Dict[str, Any]]:
+        cursor = self.replays.find({}, {"partitions": 0}).sort("created_at", DESCENDING).limit(limit)
+        return [document async for document in cursor]
+
+    async def claim(
+        self,
+        replay_id: Optional[str],
+        owner: str,
+        lease_seconds: float,
+        statuses: Iterable[str] = RESUMABLE_STATUSES,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Toma un replay para `owner` (o, sin `replay_id`, el primero que haya): uno `running`
+        sin latido reciente o uno en alguno de `statuses`. Es atómico: si varios procesos lo
+        intentan, solo uno lo obtiene.
+        """
+        stale = datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)
+        conditions: List[Dict[str, Any]] = [
+            {"status": "running", "heartbeat": None},
+            {"status": "running", "heartbeat": {"$lt": stale}},
+        ]
+        statuses = list(statuses)
+        if statuses:
+            conditions.insert(0, {"status": {"$in": statuses}})
+        query: Dict[str, Any] = {"$or": conditions}
+        if replay_id is not None:
+            query["_id"] = replay_id
+        return await self.replays.find_one_and_update(
+            query,
+            {"$set": {"status": "running", "owner": owner, "heartbeat": datetime.now(timezone.utc), "error": None}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def heartbeat(self, replay_id: str, owner: str) -> bool:
+        """
+        Renueva el latido de un replay en curso. False si ya no pertenece a `owner`.
+        """
+        result = await self.replays.update_one(
+            {"_id": replay_id, "owner": owner, "status": "running"},
+            {"$set": {"heartbeat": datetime.now(timezone.utc)}},
+        )
+        return result.matched_count > 0
+
+    async def checkpoint(
+        self,
+        replay_id: str,
+        owner: str,
+        index: int,
+        cursor: Optional[Tuple[datetime, Any]],
+        processed: int,
+        matched: int,
+        done: bool,
+    ) -> bool:
+        """
+        Guarda la posición de una partición y renueva el latido.
+
+        Returns:
+            bool: False si el replay ya no pertenece a `owner` o dejó de estar `running`
+            (se canceló o lo reclamó otro proceso): la partición debe detenerse.
+        """
+        update: Dict[str, Any] = {
+            "$set": {f"partitions.{index}.done": done, "heartbeat": datetime.now(timezone.utc)},
+            "$inc": {
+                f"partitions.{index}.processed": processed,
+                f"partitions.{index}.matched": matched,
+                "processed": processed,
+                "matched": matched,
+            },
+        }
+        if cursor is not None:
+            update["$set"][f"partitions.{index}.last_timestamp"] = cursor[0]
+            update["$set"][f"partitions.{index}.last_id"] = cursor[1]
+        result = await self.replays.update_one({"_id": replay_id, "owner": owner, "status": "running"}, update)
+        return result.matched_count > 0
+
+    async def set_status(self, replay_id: str, status: str, owner: Optional[str] = None, error: Optional[str] = None) -> bool:
+        """
+        Cambia el estado de un replay (si se indica `owner`, solo mientras le pertenezca).
+        """
+        query: Dict[str, Any] = {"_id": replay_id}
+        if owner is not None:
+            query["owner"] = owner
+            query["status"] = "running"
+        update = {"status": status, "updated_at": datetime.now(timezone.utc)}
+        if error is not None:
+            update["error"] = error
+        result = await self.replays.update_one(query, {"$set": update})
+        return result.matched_count > 0
+
+    async def release(self, replay_id: str, owner: str):
+        """
+        Suelta un replay en curso sin cambiar su estado, para que otro proceso lo reanude ya.
+        """
+        await self.replays.update_one({"_id": replay_id, "owner": owner, "status": "running"}, {"$set": {"heartbeat": None}})
+
+    async def record_matches(self, matches: List[Dict[str, Any]]):
+        """
+        Guarda coincidencias. Un lote repetido tras una reanudación no duplica resultados
+        (índice único por replay y evento).
+        """
+        if not matches:
+            return
+        try:
+            await self.results.insert_many(matches, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                raise
+
+    async def list_matches(self, replay_id: str, limit: int = 100, skip: int = 0) -> List[Dict[str, Any]]:
+        cursor = self.results.find({"replay_id": replay_id}, {"_id": 0}).sort("event_id", ASCENDING).skip(skip).limit(limit)
+        return [document async for document in cursor]
@@ -1,14 +1,21 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from shieldx.models import RuleModel
 from shieldx.log.logger_config import get_logger
+from shieldx.metrics import timed_repository
+from shieldx.tracing import traced
+from shieldx.cache.repository import cached_repository
+from shieldx.db.changelog import TrackedCollection
 from shieldx.repositories import BaseRepository
 
 L = get_logger(__name__)
 
+@cached_repository("rules")
+@traced("repository")
+@timed_repository
 class RuleRepository(BaseRepository[RuleModel]):
     """
     Repositorio encargado de realizar operaciones CRUD sobre la colección `rules`
     en la base de datos MongoDB.
     """
     def __init__(self, db: AsyncIOMotorDatabase):
-        super().__init__(collection=db["rules"], model=RuleModel)
+        super().__init__(collection=TrackedCollection(db["rules"]), model=RuleModel)
@@ -1,19 +1,28 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from shieldx.models import RulesTriggerModel
 from shieldx.log.logger_config import get_logger
+from shieldx.metrics import timed_repository
+from shieldx.tracing import traced
+from shieldx.cache.repository import cached_repository
+from shieldx.db.changelog import TrackedCollection
 import time as T
 from pymongo.errors import PyMongoError
 
 L = get_logger(__name__)
 
+@cached_repository("rules_trigger", reads=("list_by_trigger",), writes=("link", "unlink"))
+@traced("repository")
+@timed_repository
 class RulesTriggerRepository:
     """
     Repositorio encargado de manejar la relación muchos-a-muchos entre triggers y reglas,
     utilizando la colección intermedia `rules_trigger`.
     """
 
+    PROFILE = "config"
+
     def __init__(self, db: AsyncIOMotorDatabase):
-        self.collection = db["rules_trigger"]
+        self.collection = TrackedCollection(db["rules_trigger"])
 
     async def link(self, trigger_id: str, rule_id: str):
         """
@@ -94,7 +103,7 @@ class RulesTriggerRepository:
         try:
             cursor = self.collection.find({"trigger_id": trigger_id})
             rules = [RulesTriggerModel(**doc) async for doc in cursor]
-            L.debug({
+            L.debug(lambda: {
                 "event": "RULE_TRIGGER.FETCH.BY_TRIGGER",
                 "trigger_id": trigger_id,
                 "count": len(rules),
@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING
+from shieldx.cache.versions import VERSIONS_COLLECTION, GLOBAL_VERSION_ID
+from shieldx.db.changelog import CHANGELOG_COLLECTION
+from shieldx.log.logger_config import get_logger
+from shieldx.metrics import timed_repository
+from shieldx.tracing import traced
+
+L = get_logger(__name__)
+
+
+@traced("repository")
+@timed_repository
+class SyncRepository:
+    """
+    Lecturas del changelog de configuración (`config_changelog`) y de las colecciones que
+    registra, para la sincronización incremental (`/sync`).
+    """
+
+    PROFILE = "config"
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.changelog = db[CHANGELOG_COLLECTION]
+        self.versions = db[VERSIONS_COLLECTION]
+
+    async def current_version(self) -> int:
+        """
+        Último valor asignado por el contador global de versiones.
+        """
+        document = await self.versions.find_one({"_id": GLOBAL_VERSION_ID}, {"version": 1})
+        return document["version"] if document else 0
+
+    async def _edge_version(self, query: dict, direction: int) -> Optional[int]:
+        document = await self.changelog.find_one(query, {"version": 1}, sort=[("version", direction)])
+        return document["version"] if document else None
+
+    async def oldest_version(self) -> Optional[int]:
+        """
+        Versión más antigua retenida en el changelog (None si está vacío).
+        """
+        return await self._edge_version({}, ASCENDING)
+
+    async def last_version_before(self, at: datetime) -> Optional[int]:
+        """
+        Versión más reciente registrada antes de `at`.
+        """
+        return await self._edge_version({"at": {"$lte": at}}, DESCENDING)
+
+    async def first_version_after(self, at: datetime) -> Optional[int]:
+        """
+        Versión más antigua registrada después de `at`.
+        """
+        return await self._edge_version({"at": {"$gt": at}}, ASCENDING)
+
+    async def changes_between(self, since: int, until: int, collections: List[str]) -> List[Dict[str, Any]]:
+        """
+        Entradas del changelog con versión en `(since, until]`, en orden de versión.
+        """
+        cursor = self.changelog.find(
+            {"version": {"$gt": since, "$lte": until}, "collection": {"$in": collections}},
+            {"_id": 0, "version": 1, "collection": 1, "op": 1, "document_id": 1},
+        ).sort("version", ASCENDING)
+        return [entry async for entry in cursor]
+
+    async def find_documents(self, collection: str, ids: Optional[List[Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Documentos de `collection` con los `_id` indicados (todos si `ids` es None).
+        """
+        query = {} if ids is None else {"_id": {"$in": ids}}
+        return [document async for document in self.db[collection].find(query)]
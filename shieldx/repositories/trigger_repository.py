@@ -3,6 +3,10 @@ from typing import Optional
 from pymongo.errors import PyMongoError
 from shieldx.models import TriggerModel
 from shieldx.log.logger_config import get_logger
+from shieldx.metrics import timed_repository
+from shieldx.tracing import traced
+from shieldx.cache.repository import cached_repository
+from shieldx.db.changelog import TrackedCollection
 import time as T
 from shieldx.repositories import BaseRepository
 
@@ -11,6 +15,9 @@ L = get_logger(__name__)  # Logger específico para este módulo
 
 
 
+@cached_repository("triggers", reads=("find_one", "find_all", "get_trigger_by_name"))
+@traced("repository")
+@timed_repository
 class TriggersRepository(BaseRepository[TriggerModel]):
     """
     Repositorio encargado de realizar operaciones CRUD sobre la colección de `triggers`
@@ -18,7 +25,7 @@ class TriggersRepository(BaseRepository[TriggerModel]):
     """
 
     def __init__(self, db: AsyncIOMotorDatabase):
-        super().__init__(collection=db["triggers"], model=TriggerModel)
+        super().__init__(collection=TrackedCollection(db["triggers"]), model=TriggerModel)
 
 
     
@@ -35,7 +42,7 @@ class TriggersRepository(BaseRepository[TriggerModel]):
             if document:
                 document["id"] = str(document["_id"])
                 # Log de éxito en la consulta
-                L.debug({
+                L.debug(lambda: {
                     "event": "TRIGGER.FETCH.BY_NAME",
                     "name": name,
                     "time": T.time() - t1
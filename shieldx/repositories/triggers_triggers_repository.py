@@ -1,11 +1,22 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from shieldx.models import TriggersTriggersModel
 from shieldx.log.logger_config import get_logger
+from shieldx.metrics import timed_repository
+from shieldx.tracing import traced
+from shieldx.cache.repository import cached_repository
+from shieldx.db.changelog import TrackedCollection
 import time as T
 from pymongo.errors import PyMongoError
 
 L = get_logger(__name__)
 
+@cached_repository(
+    "triggers_triggers",
+    reads=("get_children", "get_parents"),
+    writes=("link", "unlink"),
+)
+@traced("repository")
+@timed_repository
 class TriggersTriggersRepository:
     """
     Repositorio encargado de manejar relaciones jerárquicas entre triggers,
@@ -13,13 +24,15 @@ class TriggersTriggersRepository:
     mediante la colección `triggers_triggers`.
     """
 
+    PROFILE = "config"
+
     def __init__(self, db: AsyncIOMotorDatabase):
         """
         Inicializa el repositorio y selecciona la colección `triggers_triggers`.
 
         :param db: Instancia de la base de datos MongoDB.
         """
-        self.collection = db["triggers_triggers"]
+        self.collection = TrackedCollection(db["triggers_triggers"])
 
     async def link(self, parent_id: str, child_id: str):
         """
@@ -100,7 +113,7 @@ class TriggersTriggersRepository:
         try:
             cursor = self.collection.find({"trigger_parent_id": parent_id})
             children = [TriggersTriggersModel(**doc) async for doc in cursor]
-            L.debug({
+            L.debug(lambda: {
                 "event": "TRIGGERS_TRIGGERS.FETCH.CHILDREN",
                 "parent_id": parent_id,
                 "count": len(children),
@@ -123,7 +136,7 @@ class TriggersTriggersRepository:
         try:
             cursor = self.collection.find({"trigger_child_id": child_id})
             parents = [TriggersTriggersModel(**doc) async for doc in cursor]
-            L.debug({
+            L.debug(lambda: {
                 "event": "TRIGGERS_TRIGGERS.FETCH.PARENTS",
                 "child_id": child_id,
                 "count": len(parents),
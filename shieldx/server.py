@@ -5,8 +5,15 @@ import uvicorn
 import asyncio
 from contextlib import asynccontextmanager
 from shieldx.db.indexes import create_indexes
+from shieldx.container import build_container, get_container, reset_container
 from shieldx.log import Log
 from shieldx.log.logger_config import get_logger
+from shieldx.metrics import MetricsMiddleware
+from shieldx.tracing import TracingMiddleware
+from shieldx.metrics.loop import LoopMonitor
+from shieldx.cache.invalidation import InvalidationBus
+from shieldx.live import LiveEventHub
+from shieldx.blobstore import check_blob_store
 # import LogRecord,INFO,ERROR,DEBUG,WARNING
 import time as T
 from shieldx import config
@@ -26,10 +33,12 @@ L =  get_logger("shieldx-server")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     t1 = T.time()
-    L.debug({
+    L.debug(lambda: {
         "event":"CONNECTING.DB",
     })
     await connect_to_mongo()
+    # Antes de construir el contenedor: un almacén sin permisos de escritura se desactiva
+    await check_blob_store()
         
     # Esperar hasta que la base de datos esté disponible
     for attempt in range(SHIELDX_MONGODB_MAX_RETRIES):  # Intentos máximos
@@ -37,6 +46,8 @@ async def lifespan(app: FastAPI):
             db = get_database()
             if db is not None:
                 await create_indexes()
+                # Repositorios y servicios compartidos por todas las peticiones
+                build_container()
                 L.info({
                     "event":"CONNECT.DB",
                     "attempt":attempt,
@@ -50,14 +61,35 @@ async def lifespan(app: FastAPI):
             })
             
         except RuntimeError:
-            L.debug({
+            L.debug(lambda: {
                 "event":"CONNECTING.DB.WAITING",
             })
             await asyncio.sleep(1)  # Esperar un segundo antes de intentar nuevamente
     
+    loop_monitor = LoopMonitor()
+    if config.SHIELDX_LOOP_MONITOR:
+        loop_monitor.start()
+    # Cambios hechos por otros workers y consumidores invalidan las cachés de este proceso
+    invalidation_bus = InvalidationBus(get_database())
+    if config.SHIELDX_CACHE_INVALIDATION:
+        invalidation_bus.start()
+    # Suscripciones a eventos en vivo: el change stream se abre con el primer suscriptor
+    live_hub = LiveEventHub(get_database("analytics"))
+    if config.SHIELDX_LIVE_EVENTS:
+        live_hub.start()
+    # Replays que quedaron a medias (reinicio, caída de otro worker) continúan desde su checkpoint
+    replay_service = get_container().replay_service
+    if config.SHIELDX_REPLAY_AUTO_RESUME:
+        await replay_service.resume_interrupted()
+
     yield 
+    await replay_service.shutdown()
+    await live_hub.stop()
+    await invalidation_bus.stop()
+    await loop_monitor.stop()
+    reset_container()
     await close_mongo_connection()
-    L.debug({
+    L.debug(lambda: {
         "event":"CLOSE.MONGODB.CONNECTION",
         "time":T.time() - t1 
     })
@@ -74,6 +106,11 @@ app = FastAPI(
     })
 
 
+# Latencia por ruta para /metrics
+app.add_middleware(MetricsMiddleware)
+# Una traza (X-Trace-Id) por petición que enlaza controlador, servicio y repositorio
+app.add_middleware(TracingMiddleware)
+
 # Include API routes from the service controller under /api/v1
 # Rutas para la gestión de eventos generados por servicios
 app.include_router(Controllers.events_router, prefix=SHIELDX_API_PREFIX,tags=["Eventos"],)
@@ -89,6 +126,12 @@ app.include_router(Controllers.triggers_triggers_router, prefix=SHIELDX_API_PREF
 app.include_router(Controllers.rules_trigger_router, prefix=SHIELDX_API_PREFIX, tags=["Trigger - Rule"])
 # Rutas para CRUD de reglas
 app.include_router(Controllers.rules_router, prefix=SHIELDX_API_PREFIX,  tags=["Rules"])
+# Sincronización incremental de la configuración para agentes con copia local
+app.include_router(Controllers.sync_router, prefix=SHIELDX_API_PREFIX, tags=["Sincronización"])
+# Endpoints de diagnóstico protegidos por SHIELDX_ADMIN_TOKEN
+app.include_router(Controllers.admin_router, prefix=SHIELDX_API_PREFIX, tags=["Administración"])
+# Métricas para Prometheus (sin prefijo, en /metrics)
+app.include_router(Controllers.metrics_router, tags=["Métricas"])
 
 
 if __name__ == "__main__":
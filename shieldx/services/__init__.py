@@ -4,4 +4,7 @@ from shieldx.services.events_triggers_service import EventsTriggersService
 from shieldx.services.rules_service import RuleService
 from shieldx.services.rules_trigger_service import RulesTriggerService
 from shieldx.services.trigger_service import TriggerService
-from shieldx.services.triggers_triggers_service import TriggersTriggersService
\ No newline at end of file
+from shieldx.services.triggers_triggers_service import TriggersTriggersService
+from shieldx.services.sync_service import SyncService
+from shieldx.services.trigger_resolution_service import TriggerResolutionService
+from shieldx.services.replay_service import ReplayService
\ No newline at end of file
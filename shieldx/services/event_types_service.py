@@ -2,12 +2,14 @@ from fastapi import HTTPException
 from shieldx.repositories import EventTypeRepository
 from shieldx.models import EventTypeModel
 from shieldx.log.logger_config import get_logger
+from shieldx.tracing import traced
 import time as T
 from bson import ObjectId
 
 L = get_logger(__name__)  # Logger específico para este módulo
 
 
+@traced("service")
 class EventTypeService:
     """
     Servicio encargado de gestionar la lógica relacionada con los tipos de evento (`EventType`),
@@ -59,7 +61,7 @@ class EventTypeService:
             event_types = await self.repository.find_all()
             # Log de depuración con cantidad de resultados
             L.debug(
-                {
+                lambda: {
                     "event": "EVENT_TYPE.LIST",
                     "count": len(event_types),
                     "time": T.time() - t1,
@@ -106,7 +108,7 @@ class EventTypeService:
 
         # Log de éxito en la consulta
         L.debug(
-            {
+            lambda: {
                 "event": "EVENT_TYPE.FETCHED",
                 "event_type_id": event_type_id,
                 "time": T.time() - t1,
@@ -1,15 +1,49 @@
 from fastapi import HTTPException
 from shieldx.models import EventModel
 from shieldx.repositories import EventsRepository
+from shieldx.repositories.events_repository import EVENT_FIELDS
 from bson import ObjectId
-from typing import List, Optional
+from typing import Any, List, Optional
 from shieldx.log.logger_config import get_logger
+from shieldx.tracing import traced
 import time as T
 from shieldx.repositories.event_types_repository import EventTypeRepository
+from shieldx.cache import TTLCache
+from shieldx.blobstore import BlobStore, BlobNotFound
+from shieldx.blobstore.payloads import PayloadIntegrityError, fetch_payload, offload_payload
+from shieldx.metrics import register_cache
+from shieldx import config
 
 L = get_logger(__name__)
 
+# Caché de deduplicación compartida por todas las instancias del servicio en el proceso
+DEDUP_CACHE = TTLCache(
+    maxsize=config.SHIELDX_DEDUP_CACHE_SIZE,
+    ttl=config.SHIELDX_DEDUP_CACHE_TTL,
+)
+register_cache("dedup", DEDUP_CACHE)
 
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Convierte el parámetro `fields` ("event_id,timestamp") en la lista de campos a proyectar.
+
+    :return: Lista de campos sin repetir, o None si no se pidió proyección.
+    :raises HTTPException: 400 si algún campo no existe en el evento.
+    """
+    if fields is None:
+        return None
+    requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in EVENT_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(EVENT_FIELDS)}",
+        )
+    return requested or ["event_id"]
+
+
+@traced("service")
 class EventsService:
     """
     Servicio encargado de la lógica de negocio para gestionar eventos,
@@ -17,22 +51,49 @@ class EventsService:
     """
 
     def __init__(
-        self, repository: EventsRepository, event_type_repo: EventTypeRepository
+        self,
+        repository: EventsRepository,
+        event_type_repo: EventTypeRepository,
+        dedup_cache: Optional[TTLCache] = None,
+        blob_store: Optional[BlobStore] = None,
+        offload_threshold: int = config.SHIELDX_PAYLOAD_OFFLOAD_BYTES,
     ):
         """
         Inicializa el servicio con una instancia del repositorio de eventos.
 
         :param repository: Instancia de EventsRepository.
         :param event_type_repo: Instancia de EventTypeRepository.
+        :param dedup_cache: Caché de `idempotency_key` ya ingeridas (por defecto, la del proceso).
+        :param blob_store: Almacén de objetos para payloads grandes (None: siempre en el documento).
+        :param offload_threshold: Bytes de JSON a partir de los que el payload va al almacén.
         """
         self.repository = repository
         self.event_type_repo = event_type_repo
+        self.dedup_cache = DEDUP_CACHE if dedup_cache is None else dedup_cache
+        self.blob_store = blob_store
+        self.offload_threshold = offload_threshold
 
     async def create_event(self, event: EventModel) -> Optional[dict]:
         """
         Crea un evento en MongoDB validando que el EventType exista.
+
+        Si el evento trae `idempotency_key` y ya fue ingerido recientemente, se devuelve
+        el ID original sin volver a consultar MongoDB.
         """
         t1 = T.time()
+        idempotency_key = getattr(event, "idempotency_key", None)
+        if idempotency_key:
+            duplicated_id = self.dedup_cache.get(idempotency_key)
+            if duplicated_id:
+                L.debug(
+                    lambda: {
+                        "event": "EVENT.CREATE.DUPLICATE",
+                        "idempotency_key": idempotency_key,
+                        "event_id": duplicated_id,
+                        "time": T.time() - t1,
+                    }
+                )
+                return duplicated_id
         try:
             # Validar existencia del event_type por nombre
             event_type_doc = await self.event_type_repo.get_by_name(event.event_type)
@@ -49,10 +110,18 @@ class EventsService:
                     status_code=404, detail=f"Event type '{event.event_type}' not found"
                 )
 
+            # Payloads grandes van al almacén de objetos; el evento guarda la referencia.
+            # Una `payload_ref` que venga en el evento se descarta: solo la pone el offload
+            payload, payload_ref = await offload_payload(event.payload, self.blob_store, self.offload_threshold)
+            if payload_ref is not None or event.payload_ref is not None:
+                event = EventModel.model_validate({**event.model_dump(), "payload": payload, "payload_ref": payload_ref})
+
             # Crear el evento
             # created_event = await self.repository.create_event(event)
             created_event = await self.repository.insert_one(event)
             if created_event:
+                if idempotency_key:
+                    self.dedup_cache.set(idempotency_key, created_event)
                 L.info(
                     {
                         "event": "EVENT.CREATED",
@@ -80,7 +149,7 @@ class EventsService:
             events = await self.repository.find_all()
 
             L.debug(
-                {"event": "EVENT.LIST.ALL", "count": len(events), "time": T.time() - t1}
+                lambda: {"event": "EVENT.LIST.ALL", "count": len(events), "time": T.time() - t1}
             )
             return events
         except Exception as e:
@@ -106,18 +175,12 @@ class EventsService:
         :return: Lista de objetos EventModel filtrados.
         """
         t1 = T.time()
-        filters = {}
-        if service_id:
-            filters["service_id"] = service_id
-        if microservice_id:
-            filters["microservice_id"] = microservice_id
-        if function_id:
-            filters["function_id"] = function_id
+        filters = self._filters(service_id, microservice_id, function_id)
 
         try:
             events = await self.repository.find_events(filters, limit, skip)
             L.debug(
-                {
+                lambda: {
                     "event": "EVENT.LIST.FILTERED",
                     "filters": filters,
                     "count": len(events),
@@ -135,6 +198,95 @@ class EventsService:
             )
             return []
 
+    async def get_event_fields_filtered(
+        self,
+        fields: List[str],
+        service_id: Optional[str] = None,
+        microservice_id: Optional[str] = None,
+        function_id: Optional[str] = None,
+        limit: int = 100,
+        skip: int = 0,
+    ) -> List[dict]:
+        """
+        Igual que `get_events_filtered`, pero devuelve solo `fields` de cada evento.
+
+        :param fields: Campos a devolver (ver `parse_fields`).
+        :return: Lista de diccionarios con `event_id` y los campos pedidos.
+        """
+        t1 = T.time()
+        filters = self._filters(service_id, microservice_id, function_id)
+        events = await self.repository.find_event_fields(filters, fields, limit, skip)
+        L.debug(
+            lambda: {
+                "event": "EVENT.LIST.FILTERED.PROJECTED",
+                "filters": filters,
+                "fields": fields,
+                "count": len(events),
+                "time": T.time() - t1,
+            }
+        )
+        return events
+
+    async def get_event_fields_by_id(self, event_id: str, fields: List[str]) -> Optional[dict]:
+        """
+        Obtiene solo `fields` de un evento por `event_id`.
+        """
+        if not ObjectId.is_valid(event_id):
+            return None
+        return await self.repository.find_event_fields_by_id(ObjectId(event_id), fields)
+
+    async def get_event_payload(self, event_id: str) -> Any:
+        """
+        Payload de un evento. Si se guardó en el almacén de objetos se descarga y se verifica
+        su digest solo ahora, cuando un cliente lo pide.
+
+        :raises HTTPException: 404 si el evento no existe, 502 si el almacén no lo tiene o no
+            coincide con el digest.
+        """
+        t1 = T.time()
+        event = await self.get_event_fields_by_id(event_id, ["payload", "payload_ref"])
+        if event is None:
+            raise HTTPException(status_code=404, detail="Evento no encontrado")
+        ref = event.get("payload_ref")
+        if ref and self.blob_store is None:
+            raise HTTPException(status_code=502, detail="Payload is stored externally but no blob store is configured")
+        try:
+            payload = await fetch_payload(event.get("payload"), ref, self.blob_store)
+        except (BlobNotFound, PayloadIntegrityError) as e:
+            L.error({"event": "EVENT.PAYLOAD.FETCH.FAILED", "event_id": event_id, "error": type(e).__name__})
+            raise HTTPException(status_code=502, detail="Payload could not be fetched from the blob store")
+        L.debug(lambda: {
+            "event": "EVENT.PAYLOAD.FETCHED",
+            "event_id": event_id,
+            "external": bool(ref),
+            "time": T.time() - t1,
+        })
+        return payload
+
+    async def _offload_update(self, update_data):
+        # A new payload replaces the old reference, even when it stays inline (`$set: null`)
+        if getattr(update_data, "payload", None) is None:
+            return update_data
+        data = update_data.model_dump(by_alias=True, exclude_none=True)
+        data["payload"], payload_ref = await offload_payload(data["payload"], self.blob_store, self.offload_threshold)
+        data["payload_ref"] = payload_ref
+        return data
+
+    def _filters(
+        self,
+        service_id: Optional[str],
+        microservice_id: Optional[str],
+        function_id: Optional[str],
+    ) -> dict:
+        filters = {}
+        if service_id:
+            filters["service_id"] = service_id
+        if microservice_id:
+            filters["microservice_id"] = microservice_id
+        if function_id:
+            filters["function_id"] = function_id
+        return filters
+
     async def get_event_by_id(self, event_id: str) -> Optional[EventModel]:
         """
         Obtiene un evento específico por `event_id`.
@@ -145,7 +297,7 @@ class EventsService:
             event = await self.repository.find_one({"_id": ObjectId(event_id)})
             if event:
                 L.debug(
-                    {
+                    lambda: {
                         "event": "EVENT.FETCH.BY_ID",
                         "event_id": str(event.event_id),
                         "time": T.time() - t1,
@@ -183,6 +335,7 @@ class EventsService:
         t1 = T.time()
         # updated_event = await self.repository.update_event(event_id, update_data)
         try:
+            update_data = await self._offload_update(update_data)
             updated_event = await self.repository.update_one(
                 {"_id": ObjectId(event_id)}, update_data
             )
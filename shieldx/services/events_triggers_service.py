@@ -1,10 +1,12 @@
 from shieldx.repositories import EventsTriggersRepository
 from shieldx.log.logger_config import get_logger
+from shieldx.tracing import traced
 from fastapi import HTTPException
 import time as T
 
 L = get_logger(__name__)
 
+@traced("service")
 class EventsTriggersService:
     """
     Servicio encargado de gestionar la relación entre tipos de evento (`EventType`) y triggers,
@@ -89,7 +91,7 @@ class EventsTriggersService:
         try:
             triggers = await self.repository.get_triggers_by_event_type(event_type_id)
             # Log de consulta
-            L.debug({
+            L.debug(lambda: {
                 "event": "EVENT_TRIGGER.LIST.FOR_EVENT_TYPE",
                 "event_type_id": event_type_id,
                 "count": len(triggers),
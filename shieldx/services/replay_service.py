@@ -0,0 +1,262 @@
+import asyncio
+import contextvars
+import os
+import socket
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException
+from shieldx.log.logger_config import get_logger
+from shieldx.tracing import traced
+from shieldx.models import ReplayRequestModel
+from shieldx.repositories.replay_repository import ReplayRepository
+from shieldx.services.trigger_resolution_service import TriggerResolutionService
+from shieldx import config
+import time as T
+
+L = get_logger(__name__)
+
+
+class _RateLimiter:
+    """
+    Token bucket compartido por las particiones de un replay.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = T.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, n: int):
+        async with self._lock:
+            now = T.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= n
+            if self.tokens < 0:
+                # Holding the lock while waiting keeps the other partitions queued behind this one
+                await asyncio.sleep(-self.tokens / self.rate)
+
+
+@traced("service")
+class ReplayService:
+    """
+    Motor de replay: vuelve a pasar eventos almacenados por la resolución de triggers y
+    reglas, p. ej. para aplicar un trigger o una regla nuevos a eventos históricos.
+
+    - El rango `[start, end)` se divide en particiones que se recorren en paralelo con
+      cursores keyset `(timestamp, _id)`, a un ritmo total limitado (`rate` eventos/s).
+    - Tras cada lote se guarda la posición de la partición (checkpoint); un replay
+      interrumpido se reanuda desde ahí, en este u otro proceso. El latido se renueva cada
+      `lease_seconds / 3` mientras el replay corre, aunque espere por el límite de ritmo.
+    - Las coincidencias se guardan en `replay_results`.
+
+    Cada proceso se identifica como `owner`; solo el dueño avanza un replay y lo pierde si
+    se cancela o si otro proceso lo reclama tras `lease_seconds` sin latido.
+    """
+
+    def __init__(
+        self,
+        repository: ReplayRepository,
+        resolver: TriggerResolutionService,
+        lease_seconds: float = config.SHIELDX_REPLAY_LEASE_SECONDS,
+    ):
+        """
+        :param repository: Instancia de ReplayRepository.
+        :param resolver: Resolución de triggers y reglas por tipo de evento.
+        :param lease_seconds: Segundos sin latido tras los que otro proceso puede reclamar el replay.
+        """
+        self.repository = repository
+        self.resolver = resolver
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def start_replay(self, request: ReplayRequestModel) -> Dict[str, Any]:
+        """
+        Registra un replay y lo inicia en segundo plano.
+        """
+        span = (request.end - request.start) / request.partitions
+        now = datetime.now(timezone.utc)
+        replay = {
+            "_id": uuid.uuid4().hex,
+            "status": "running",
+            "owner": self.owner,
+            "heartbeat": now,
+            "created_at": now,
+            "updated_at": now,
+            "request": request.model_dump(),
+            "processed": 0,
+            "matched": 0,
+            "error": None,
+            "partitions": [
+                {
+                    "index": i,
+                    "start": request.start + span * i,
+                    "end": request.end if i == request.partitions - 1 else request.start + span * (i + 1),
+                    "last_timestamp": None,
+                    "last_id": None,
+                    "processed": 0,
+                    "matched": 0,
+                    "done": False,
+                }
+                for i in range(request.partitions)
+            ],
+        }
+        await self.repository.create(replay)
+        self._launch(replay)
+        L.info({"event": "REPLAY.STARTED", "replay_id": replay["_id"], "partitions": request.partitions, "rate": request.rate})
+        return replay
+
+    async def resume_replay(self, replay_id: str) -> Dict[str, Any]:
+        """
+        Reanuda un replay cancelado, fallido o interrumpido desde su último checkpoint.
+        """
+        replay = await self.repository.claim(replay_id, self.owner, self.lease_seconds)
+        if replay is None:
+            if await self.repository.get(replay_id) is None:
+                raise HTTPException(status_code=404, detail="Replay not found")
+            raise HTTPException(status_code=409, detail="Replay is not resumable (completed or running elsewhere)")
+        self._launch(replay)
+        L.info({"event": "REPLAY.RESUMED", "replay_id": replay_id, "processed": replay["processed"]})
+        return replay
+
+    async def resume_interrupted(self) -> List[str]:
+        """
+        Reclama y reanuda los replays que quedaron `running` sin latido (p. ej. tras un reinicio).
+        Los cancelados o fallidos solo se reanudan a petición (`resume_replay`).
+        """
+        resumed = []
+        while True:
+            replay = await self.repository.claim(None, self.owner, self.lease_seconds, statuses=())
+            if replay is None:
+                return resumed
+            self._launch(replay)
+            resumed.append(replay["_id"])
+            L.info({"event": "REPLAY.RESUMED", "replay_id": replay["_id"], "processed": replay["processed"]})
+
+    async def cancel_replay(self, replay_id: str):
+        """
+        Cancela un replay. Si corre en otro proceso, se detiene en su siguiente checkpoint.
+        """
+        if await self.repository.get(replay_id) is None:
+            raise HTTPException(status_code=404, detail="Replay not found")
+        await self.repository.set_status(replay_id, "cancelled")
+        task = self._tasks.get(replay_id)
+        if task is not None:
+            task.cancel()
+        L.info({"event": "REPLAY.CANCELLED", "replay_id": replay_id})
+
+    async def get_replay(self, replay_id: str) -> Dict[str, Any]:
+        replay = await self.repository.get(replay_id)
+        if replay is None:
+            raise HTTPException(status_code=404, detail="Replay not found")
+        return replay
+
+    async def list_replays(self, limit: int = 50) -> List[Dict[str, Any]]:
+        return await self.repository.list_replays(limit)
+
+    async def list_matches(self, replay_id: str, limit: int = 100, skip: int = 0) -> List[Dict[str, Any]]:
+        return await self.repository.list_matches(replay_id, limit, skip)
+
+    async def shutdown(self):
+        """
+        Detiene los replays de este proceso y los suelta para que otro proceso los reanude.
+        """
+        for replay_id, task in list(self._tasks.items()):
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await self.repository.release(replay_id, self.owner)
+
+    def _launch(self, replay: Dict[str, Any]):
+        # Created in an empty context: the task outlives the request that started it and must
+        # not keep adding spans to that request's trace
+        loop = asyncio.get_running_loop()
+        task = contextvars.Context().run(loop.create_task, self._run(replay), name=f"shieldx-replay-{replay['_id']}")
+        self._tasks[replay["_id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(replay["_id"], None))
+
+    async def _run(self, replay: Dict[str, Any]):
+        t1 = T.time()
+        replay_id = replay["_id"]
+        request = ReplayRequestModel(**replay["request"])
+        limiter = _RateLimiter(request.rate)
+        resolutions: Dict[str, Optional[Dict[str, Any]]] = {}
+        # Checkpoints alone may be further apart than the lease (rate limit waits, slow batches)
+        heartbeat = asyncio.get_running_loop().create_task(self._heartbeat(replay_id))
+        try:
+            owned = await asyncio.gather(*(
+                self._run_partition(replay_id, request, partition, limiter, resolutions)
+                for partition in replay["partitions"] if not partition["done"]
+            ))
+            if all(owned) and await self.repository.set_status(replay_id, "completed", owner=self.owner):
+                L.info({"event": "REPLAY.COMPLETED", "replay_id": replay_id, "time": T.time() - t1})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            L.error({"event": "REPLAY.FAILED", "replay_id": replay_id, "error": str(e)})
+            await self.repository.set_status(replay_id, "failed", owner=self.owner, error=str(e))
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, replay_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                if not await self.repository.heartbeat(replay_id, self.owner):
+                    return
+            except Exception as e:
+                L.warning({"event": "REPLAY.HEARTBEAT.ERROR", "replay_id": replay_id, "error": str(e)})
+
+    def _filters(self, request: ReplayRequestModel) -> dict:
+        fields = ("service_id", "microservice_id", "function_id", "event_type")
+        return {field: getattr(request, field) for field in fields if getattr(request, field) is not None}
+
+    async def _run_partition(
+        self,
+        replay_id: str,
+        request: ReplayRequestModel,
+        partition: Dict[str, Any],
+        limiter: _RateLimiter,
+        resolutions: Dict[str, Optional[Dict[str, Any]]],
+    ) -> bool:
+        """
+        Recorre una partición hasta el final. Devuelve False si el replay dejó de pertenecer
+        a este proceso (cancelado o reclamado por otro).
+        """
+        filters = self._filters(request)
+        wanted_triggers = set(request.trigger_ids)
+        wanted_rules = set(request.rule_ids)
+        cursor = (partition["last_timestamp"], partition["last_id"]) if partition["last_id"] is not None else None
+        while True:
+            events = await self.repository.scan_events(filters, partition["start"], partition["end"], cursor, request.batch_size)
+            if not events:
+                return await self.repository.checkpoint(replay_id, self.owner, partition["index"], None, 0, 0, done=True)
+            await limiter.acquire(len(events))
+
+            matches = []
+            for event in events:
+                event_type = event.get("event_type")
+                if event_type not in resolutions:
+                    resolutions[event_type] = await self.resolver.resolve(event_type)
+                resolution = resolutions[event_type]
+                if not resolution or not resolution["trigger_ids"]:
+                    continue
+                if wanted_triggers or wanted_rules:
+                    if not (wanted_triggers & set(resolution["trigger_ids"]) or wanted_rules & set(resolution["rule_ids"])):
+                        continue
+                matches.append({
+                    "replay_id": replay_id,
+                    "event_id": str(event["_id"]),
+                    "event_type": event_type,
+                    "timestamp": event.get("timestamp"),
+                    "trigger_ids": resolution["trigger_ids"],
+                    "rule_ids": resolution["rule_ids"],
+                })
+            await self.repository.record_matches(matches)
+
+            cursor = (events[-1]["timestamp"], events[-1]["_id"])
+            if not await self.repository.checkpoint(replay_id, self.owner, partition["index"], cursor, len(events), len(matches), done=False):
+                L.info({"event": "REPLAY.PARTITION.STOPPED", "replay_id": replay_id, "partition": partition["index"]})
+                return False
@@ -2,11 +2,13 @@ from fastapi import HTTPException
 from shieldx.repositories import RuleRepository
 from shieldx.models import RuleModel
 from shieldx.log.logger_config import get_logger
+from shieldx.tracing import traced
 from bson import ObjectId
 import time as T
 
 L = get_logger(__name__)
 
+@traced("service")
 class RuleService:
     """
     Servicio encargado de gestionar la lógica relacionada con las reglas (`Rule`),
@@ -52,7 +54,7 @@ class RuleService:
         t1 = T.time()
         try:
             rules = await self.repository.find_all()
-            L.debug({
+            L.debug(lambda: {
                 "event": "RULE.LIST",
                 "count": len(rules),
                 "time": T.time() - t1
@@ -86,7 +88,7 @@ class RuleService:
                 "time": T.time() - t1
             })
             raise HTTPException(status_code=404, detail="Rule not found")
-        L.debug({
+        L.debug(lambda: {
             "event": "RULE.FETCHED",
             "rule_id": rule_id,
             "time": T.time() - t1
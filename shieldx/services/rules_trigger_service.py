@@ -1,10 +1,12 @@
 from fastapi import HTTPException
 from shieldx.log.logger_config import get_logger
+from shieldx.tracing import traced
 from shieldx.repositories import RulesTriggerRepository
 import time as T
 
 L = get_logger(__name__)
 
+@traced("service")
 class RulesTriggerService:
     """
     Servicio encargado de gestionar la relación entre triggers y reglas,
@@ -86,7 +88,7 @@ class RulesTriggerService:
         try:
             rules = await self.repository.list_by_trigger(trigger_id)
             # Log de consulta
-            L.debug({
+            L.debug(lambda: {
                 "event": "RULE_TRIGGER.LIST.BY_TRIGGER",
                 "trigger_id": trigger_id,
                 "count": len(rules),
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+from fastapi import HTTPException
+from shieldx.log.logger_config import get_logger
+from shieldx.tracing import traced
+from shieldx.repositories.sync_repository import SyncRepository
+from shieldx.db.changelog import DELETE
+from shieldx import config
+import time as T
+
+L = get_logger(__name__)
+
+# Colecciones de configuración que registran sus cambios en el changelog
+SYNC_COLLECTIONS = ("event_types", "triggers", "rules", "events_triggers", "triggers_triggers", "rules_trigger")
+
+
+def _document(document: Dict[str, Any]) -> Dict[str, Any]:
+    document["_id"] = str(document["_id"])
+    return document
+
+
+@traced("service")
+class SyncService:
+    """
+    Sincronización incremental de la configuración (triggers, reglas, tipos de evento y
+    relaciones) para agentes que mantienen una copia local.
+
+    El cliente envía la versión de su última sincronización y recibe los documentos
+    insertados o modificados y los `_id` borrados desde entonces. Si su versión ya salió del
+    changelog (retención vencida) recibe una copia completa con `reset: true`.
+
+    La versión devuelta nunca incluye cambios registrados hace menos de
+    `SHIELDX_SYNC_SETTLE_SECONDS`: una escritura toma su versión antes de insertar su
+    entrada en el changelog, y así una entrada que llega tarde no queda detrás de la versión
+    que ya recibió el cliente.
+    """
+
+    def __init__(self, repository: SyncRepository, settle_seconds: float = config.SHIELDX_SYNC_SETTLE_SECONDS):
+        """
+        :param repository: Instancia de SyncRepository.
+        :param settle_seconds: Antigüedad mínima de un cambio para incluirlo en la versión devuelta.
+        """
+        self.repository = repository
+        self.settle_seconds = settle_seconds
+
+    async def _settled_version(self, current: int) -> int:
+        """
+        Versión más alta cuyos cambios ya están todos en el changelog.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.settle_seconds)
+        pending = await self.repository.first_version_after(cutoff)
+        if pending is not None:
+            return pending - 1
+        settled = await self.repository.last_version_before(cutoff)
+        # Changelog empty: nothing changed within the retention window
+        return current if settled is None else settled
+
+    async def sync(self, since: int, collections: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Cambios de configuración desde la versión `since`.
+
+        :param since: Versión de la última sincronización del cliente (0 para una copia completa).
+        :param collections: Colecciones a sincronizar (todas si es None).
+        :return: `{"version", "reset", "changes": {colección: {"upserted": [...], "deleted": [...]}}}`.
+        """
+        t1 = T.time()
+        collections = list(collections or SYNC_COLLECTIONS)
+        unknown = set(collections) - set(SYNC_COLLECTIONS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown collections: {', '.join(sorted(unknown))}")
+
+        current = await self.repository.current_version()
+        oldest = await self.repository.oldest_version()
+        horizon = current if oldest is None else oldest - 1
+        settled = await self._settled_version(current)
+        reset = since <= 0 or since > current or since < horizon
+
+        if reset:
+            changes = {
+                collection: {
+                    "upserted": [_document(d) for d in await self.repository.find_documents(collection)],
+                    "deleted": [],
+                }
+                for collection in collections
+            }
+            version = settled
+        else:
+            version = max(since, settled)
+            changes = await self._changes(since, version, collections)
+
+        L.debug(lambda: {
+            "event": "SYNC.SERVED",
+            "since": since,
+            "version": version,
+            "reset": reset,
+            "changes": {collection: len(c["upserted"]) + len(c["deleted"]) for collection, c in changes.items()},
+            "time": T.time() - t1
+        })
+        return {"version": version, "reset": reset, "changes": changes}
+
+    async def _changes(self, since: int, until: int, collections: List[str]) -> Dict[str, Dict[str, list]]:
+        # Last operation per document wins
+        latest: Dict[str, Dict[Any, str]] = {collection: {} for collection in collections}
+        for entry in await self.repository.changes_between(since, until, collections):
+            latest[entry["collection"]][entry["document_id"]] = entry["op"]
+
+        changes = {}
+        for collection, operations in latest.items():
+            deleted = [document_id for document_id, op in operations.items() if op == DELETE]
+            upserted_ids = [document_id for document_id, op in operations.items() if op != DELETE]
+            upserted = await self.repository.find_documents(collection, upserted_ids) if upserted_ids else []
+            # Upserted, then deleted by a later change: report it as deleted already
+            found = {document["_id"] for document in upserted}
+            deleted += [document_id for document_id in upserted_ids if document_id not in found]
+            changes[collection] = {
+                "upserted": [_document(document) for document in upserted],
+                "deleted": [str(document_id) if isinstance(document_id, ObjectId) else document_id for document_id in deleted],
+            }
+        return changes
@@ -0,0 +1,78 @@
+from typing import Dict, List, Optional
+from shieldx.log.logger_config import get_logger
+from shieldx.tracing import traced
+from shieldx.repositories import (
+    EventTypeRepository,
+    EventsTriggersRepository,
+    TriggersTriggersRepository,
+    RulesTriggerRepository,
+)
+import time as T
+
+L = get_logger(__name__)
+
+
+@traced("service")
+class TriggerResolutionService:
+    """
+    Resuelve qué triggers y reglas aplican a un tipo de evento:
+
+    `event_type` → `events_triggers` → triggers hijos (`triggers_triggers`, transitivamente)
+    → `rules_trigger` → reglas.
+
+    Las lecturas pasan por los repositorios cacheados, así resolver el mismo tipo de evento
+    muchas veces no vuelve a Mongo.
+    """
+
+    def __init__(
+        self,
+        event_type_repo: EventTypeRepository,
+        events_triggers_repo: EventsTriggersRepository,
+        triggers_triggers_repo: TriggersTriggersRepository,
+        rules_trigger_repo: RulesTriggerRepository,
+    ):
+        self.event_type_repo = event_type_repo
+        self.events_triggers_repo = events_triggers_repo
+        self.triggers_triggers_repo = triggers_triggers_repo
+        self.rules_trigger_repo = rules_trigger_repo
+
+    async def resolve(self, event_type: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Triggers y reglas de un tipo de evento.
+
+        :param event_type: Nombre del tipo de evento.
+        :return: `{"event_type_id", "trigger_ids", "rule_ids"}` o None si el tipo no existe.
+        """
+        t1 = T.time()
+        event_type_doc = await self.event_type_repo.get_by_name(event_type)
+        if event_type_doc is None:
+            return None
+
+        links = await self.events_triggers_repo.get_triggers_by_event_type(event_type_doc.event_type_id)
+        trigger_ids: List[str] = []
+        pending = [link.trigger_id for link in links]
+        # Breadth-first over parent -> child links; `seen` also guards against cycles
+        seen = set()
+        while pending:
+            trigger_id = pending.pop(0)
+            if trigger_id in seen:
+                continue
+            seen.add(trigger_id)
+            trigger_ids.append(trigger_id)
+            children = await self.triggers_triggers_repo.get_children(trigger_id)
+            pending.extend(child.trigger_child_id for child in children)
+
+        rule_ids: List[str] = []
+        for trigger_id in trigger_ids:
+            for link in await self.rules_trigger_repo.list_by_trigger(trigger_id):
+                if link.rule_id not in rule_ids:
+                    rule_ids.append(link.rule_id)
+
+        L.debug(lambda: {
+            "event": "TRIGGER.RESOLVED",
+            "event_type": event_type,
+            "triggers": len(trigger_ids),
+            "rules": len(rule_ids),
+            "time": T.time() - t1
+        })
+        return {"event_type_id": event_type_doc.event_type_id, "trigger_ids": trigger_ids, "rule_ids": rule_ids}
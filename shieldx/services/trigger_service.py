@@ -2,12 +2,14 @@ from fastapi import HTTPException
 from shieldx.models import TriggerModel
 from shieldx.repositories import TriggersRepository
 from shieldx.log.logger_config import get_logger
+from shieldx.tracing import traced
 from bson import ObjectId
 import time as T
 
 L = get_logger(__name__)
 
 
+@traced("service")
 class TriggerService:
     """
     Servicio encargado de gestionar la lógica relacionada con los triggers,
@@ -66,7 +68,7 @@ class TriggerService:
         try:
             triggers = await self.repository.find_all()
             L.debug(
-                {
+                lambda: {
                     "event": "TRIGGER.LIST.ALL",
                     "count": len(triggers),
                     "time": T.time() - t1,
@@ -89,7 +91,7 @@ class TriggerService:
                     {"event": "TRIGGER.NOT_FOUND", "name": name, "time": T.time() - t1}
                 )
                 raise HTTPException(status_code=404, detail="Trigger not found")
-            L.debug({"event": "TRIGGER.FETCHED", "name": name, "time": T.time() - t1})
+            L.debug(lambda: {"event": "TRIGGER.FETCHED", "name": name, "time": T.time() - t1})
             return trigger
         except HTTPException:
             raise
@@ -1,11 +1,13 @@
 from fastapi import HTTPException
 from shieldx.repositories import TriggersTriggersRepository
 from shieldx.log.logger_config import get_logger
+from shieldx.tracing import traced
 import time as T
 
 L = get_logger(__name__)
 
 
+@traced("service")
 class TriggersTriggersService:
     """
     Servicio encargado de gestionar la relación jerárquica entre triggers,
@@ -106,7 +108,7 @@ class TriggersTriggersService:
             children = await self.repository.get_children(parent_id)
             # Log de consulta de hijos
             L.debug(
-                {
+                lambda: {
                     "event": "TRIGGERS_TRIGGERS.LIST.CHILDREN",
                     "parent_id": parent_id,
                     "count": len(children),
@@ -136,7 +138,7 @@ class TriggersTriggersService:
             parents = await self.repository.get_parents(child_id)
             # Log de consulta de padres
             L.debug(
-                {
+                lambda: {
                     "event": "TRIGGERS_TRIGGERS.LIST.PARENTS",
                     "child_id": child_id,
                     "count": len(parents),
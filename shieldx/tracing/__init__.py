@@ -0,0 +1,268 @@
+import functools
+import inspect
+import itertools
+import time as T
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from shieldx import config
+
+TRACE_HEADER = "X-Trace-Id"
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("shieldx_trace", default=None)
+_span: ContextVar[Optional["Span"]] = ContextVar("shieldx_span", default=None)
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """
+    Tramo cronometrado de una traza (controlador, servicio, repositorio...).
+
+    Atributos:
+        name (str): Nombre del tramo, p. ej. `EventsService.create_event`.
+        layer (str): Capa a la que pertenece (`controller`, `service`, `repository`, `consumer`).
+        span_id (int): Identificador dentro del proceso.
+        parent_id (int | None): Tramo que lo contiene.
+        offset_ms (float): Inicio relativo al comienzo de la traza.
+        duration_ms (float): Duración total del tramo.
+        children_ms (float): Tiempo pasado en tramos hijos (para calcular el tiempo propio).
+    """
+
+    __slots__ = ("name", "layer", "span_id", "parent_id", "start", "offset_ms", "duration_ms", "children_ms")
+
+    def __init__(self, name: str, layer: str, parent_id: Optional[int], start: float, offset_ms: float):
+        self.name = name
+        self.layer = layer
+        self.span_id = next(_span_ids)
+        self.parent_id = parent_id
+        self.start = start
+        self.offset_ms = offset_ms
+        self.duration_ms = 0.0
+        self.children_ms = 0.0
+
+    @property
+    def self_ms(self) -> float:
+        return max(0.0, self.duration_ms - self.children_ms)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "layer": self.layer,
+            "offset_ms": self.offset_ms,
+            "duration_ms": self.duration_ms,
+            "self_ms": self.self_ms,
+        }
+
+
+class Trace:
+    """
+    Conjunto de tramos de una petición HTTP o de un mensaje consumido.
+    """
+
+    __slots__ = ("trace_id", "name", "started_at", "start", "duration_ms", "spans")
+
+    def __init__(self, trace_id: str, name: str):
+        self.trace_id = trace_id
+        self.name = name
+        self.started_at = T.time()
+        self.start = T.perf_counter()
+        self.duration_ms = 0.0
+        self.spans: List[Span] = []
+
+    def layers(self) -> Dict[str, float]:
+        """
+        Tiempo propio (sin contar hijos) acumulado por capa.
+        """
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.layer] = totals.get(span.layer, 0.0) + span.self_ms
+        return totals
+
+    def to_dict(self, spans: bool = True) -> Dict[str, Any]:
+        document = {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "layers": self.layers(),
+        }
+        if spans:
+            document["spans"] = [span.to_dict() for span in sorted(self.spans, key=lambda s: s.offset_ms)]
+        return document
+
+
+class TraceStore:
+    """
+    Buffer circular con las trazas terminadas más recientes.
+    """
+
+    def __init__(self, capacity: int = config.SHIELDX_TRACE_BUFFER):
+        self.capacity = capacity
+        self.traces: deque = deque(maxlen=capacity)
+
+    def add(self, trace: Trace):
+        self.traces.append(trace)
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        return next((trace for trace in reversed(self.traces) if trace.trace_id == trace_id), None)
+
+    def find(self, name: Optional[str] = None, min_ms: float = 0.0, limit: int = 50) -> List[Trace]:
+        """
+        Trazas que coinciden con `name` y duran al menos `min_ms`, de la más lenta a la más rápida.
+        """
+        traces = [
+            trace for trace in list(self.traces)
+            if (name is None or trace.name == name) and trace.duration_ms >= min_ms
+        ]
+        traces.sort(key=lambda trace: trace.duration_ms, reverse=True)
+        return traces[:limit]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        Por nombre de traza (ruta o cola): número de trazas, duración media y máxima y tiempo
+        propio medio por capa, ordenado de la capa más lenta a la más rápida.
+        """
+        groups: Dict[str, List[Trace]] = {}
+        for trace in list(self.traces):
+            groups.setdefault(trace.name, []).append(trace)
+        rows = []
+        for name, traces in groups.items():
+            layers: Dict[str, float] = {}
+            for trace in traces:
+                for layer, ms in trace.layers().items():
+                    layers[layer] = layers.get(layer, 0.0) + ms
+            count = len(traces)
+            rows.append({
+                "name": name,
+                "count": count,
+                "mean_ms": sum(trace.duration_ms for trace in traces) / count,
+                "max_ms": max(trace.duration_ms for trace in traces),
+                "layers_mean_ms": dict(sorted(((layer, ms / count) for layer, ms in layers.items()), key=lambda item: item[1], reverse=True)),
+            })
+        return sorted(rows, key=lambda row: row["mean_ms"], reverse=True)
+
+    def clear(self):
+        self.traces.clear()
+
+
+STORE = TraceStore()
+
+
+def current_trace_id() -> Optional[str]:
+    """
+    ID de la traza activa en el contexto actual, o None.
+    """
+    trace = _trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+@contextmanager
+def start_trace(name: str, layer: str, trace_id: Optional[str] = None):
+    """
+    Abre una traza con su tramo raíz. Los tramos abiertos dentro del bloque (incluidas las
+    tareas de asyncio creadas en él, que copian el contexto) quedan asociados a la traza.
+    """
+    if not config.SHIELDX_TRACING:
+        yield None
+        return
+    trace = Trace(trace_id or uuid.uuid4().hex, name)
+    token = _trace.set(trace)
+    try:
+        with span(name, layer):
+            yield trace
+    finally:
+        trace.duration_ms = (T.perf_counter() - trace.start) * 1e3
+        _trace.reset(token)
+        STORE.add(trace)
+
+
+@contextmanager
+def span(name: str, layer: str):
+    """
+    Cronometra un tramo dentro de la traza activa. Sin traza activa no hace nada.
+    """
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _span.get()
+    start = T.perf_counter()
+    current = Span(name, layer, parent.span_id if parent is not None else None, start, (start - trace.start) * 1e3)
+    token = _span.set(current)
+    try:
+        yield current
+    finally:
+        current.duration_ms = (T.perf_counter() - start) * 1e3
+        _span.reset(token)
+        if parent is not None:
+            parent.children_ms += current.duration_ms
+        trace.spans.append(current)
+
+
+def traced(layer: str):
+    """
+    Decorador de clase: abre un tramo `Clase.metodo` en la capa `layer` por cada llamada a
+    un método público asíncrono definido en la clase.
+    """
+    def decorate(cls):
+        for attr, fn in list(vars(cls).items()):
+            if attr.startswith("_") or not inspect.iscoroutinefunction(fn):
+                continue
+            setattr(cls, attr, _traced_method(fn, layer))
+        return cls
+    return decorate
+
+
+def _traced_method(fn, layer: str):
+    method = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        if _trace.get() is None:
+            return await fn(self, *args, **kwargs)
+        with span(f"{type(self).__name__}.{method}", layer):
+            return await fn(self, *args, **kwargs)
+
+    return wrapper
+
+
+class TracingMiddleware:
+    """
+    Middleware ASGI que abre una traza por petición HTTP.
+
+    Respeta el header `X-Trace-Id` entrante y lo devuelve en la respuesta. El tramo raíz
+    pertenece a la capa `controller` y la traza se nombra con el método y la plantilla de la ruta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.SHIELDX_TRACING:
+            await self.app(scope, receive, send)
+            return
+        incoming = None
+        for key, value in scope.get("headers", []):
+            if key == b"x-trace-id":
+                incoming = value.decode("latin-1")[:64]
+                break
+
+        with start_trace(f"{scope['method']} {scope['path']}", "controller", trace_id=incoming) as trace:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(TRACE_HEADER.lower().encode(), trace.trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = scope.get("route")
+                if route is not None:
+                    # Name by route template so traces of the same endpoint group together
+                    trace.name = _span.get().name = f"{scope['method']} {route.path}"
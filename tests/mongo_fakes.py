@@ -0,0 +1,168 @@
+"""
+Dobles en memoria de Motor (colecciones, cursores, base de datos y change streams)
+compartidos por las pruebas. Cubren solo lo que usan los repositorios de ShieldX.
+"""
+import itertools
+from types import SimpleNamespace
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+DUPLICATE_KEY = 11000
+
+
+def matches(document: dict, query: dict) -> bool:
+    """
+    Filtro de Mongo reducido: igualdad, `$in` y `$and`.
+    """
+    for key, value in query.items():
+        if key == "$and":
+            if not all(matches(document, part) for part in value):
+                return False
+        elif isinstance(value, dict) and "$in" in value:
+            if document.get(key) not in value["$in"]:
+                return False
+        elif document.get(key) != value:
+            return False
+    return True
+
+
+def project(document: dict, projection: dict = None) -> dict:
+    """
+    Copia del documento con una proyección de inclusión (`{"campo": 1}`) o de exclusión (`{"campo": 0}`).
+    """
+    if not projection:
+        return dict(document)
+    if any(projection.values()):
+        return {key: value for key, value in document.items() if projection.get(key)}
+    return {key: value for key, value in document.items() if key not in projection}
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = list(documents)
+
+    def sort(self, key, direction=1):
+        keys = [(key, direction)] if isinstance(key, str) else list(key)
+        for field, order in reversed(keys):
+            self.documents.sort(key=lambda document: document[field], reverse=order < 0)
+        return self
+
+    def skip(self, n):
+        self.documents = self.documents[n:]
+        return self
+
+    def limit(self, n):
+        self.documents = self.documents[:n]
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self.documents)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    """
+    Colección en memoria. Guarda las proyecciones pedidas en `projections` y, como Mongo,
+    rechaza `_id` repetidos (también en `insert_many`, ordenado o no).
+    """
+
+    def __init__(self, name: str = "collection", documents=(), ids=None):
+        """
+        :param documents: Documentos iniciales (deben traer `_id`).
+        :param ids: Iterador de `_id` para los documentos insertados sin uno (1, 2, 3... por defecto).
+        """
+        self.name = name
+        self.documents = {document["_id"]: document for document in documents}
+        self.ids = ids if ids is not None else itertools.count(1)
+        self.projections = []
+
+    def _select(self, query):
+        return [document for document in list(self.documents.values()) if matches(document, query)]
+
+    async def insert_one(self, document):
+        document.setdefault("_id", next(self.ids))
+        if document["_id"] in self.documents:
+            raise DuplicateKeyError("duplicate key", DUPLICATE_KEY)
+        self.documents[document["_id"]] = document
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def insert_many(self, documents, ordered=True):
+        inserted, errors = [], []
+        for index, document in enumerate(documents):
+            try:
+                inserted.append((await self.insert_one(document)).inserted_id)
+            except DuplicateKeyError:
+                errors.append({"index": index, "code": DUPLICATE_KEY, "errmsg": "duplicate key"})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return SimpleNamespace(inserted_ids=inserted)
+
+    async def find_one(self, query, projection=None):
+        self.projections.append(projection)
+        selected = self._select(query)
+        return project(selected[0], projection) if selected else None
+
+    def find(self, query=None, projection=None):
+        self.projections.append(projection)
+        return FakeCursor(project(document, projection) for document in self._select(query or {}))
+
+    async def update_one(self, query, update):
+        selected = self._select(query)
+        if not selected:
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+        selected[0].update(update["$set"])
+        return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+
+    async def delete_one(self, query):
+        selected = self._select(query)
+        if selected:
+            del self.documents[selected[0]["_id"]]
+        return SimpleNamespace(deleted_count=len(selected[:1]))
+
+    async def delete_many(self, query):
+        selected = self._select(query)
+        for document in selected:
+            del self.documents[document["_id"]]
+        return SimpleNamespace(deleted_count=len(selected))
+
+
+class FakeDatabase(dict):
+    """
+    Base de datos que crea cada colección vacía la primera vez que se pide (`db["events"]`).
+    """
+
+    def __missing__(self, name):
+        return self.setdefault(name, FakeCollection(name))
+
+
+class FakeChangeStream:
+    """
+    Change stream alimentado por una `asyncio.Queue`; una excepción en la cola se lanza al leerla.
+    """
+
+    def __init__(self, changes):
+        self.changes = changes
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        change = await self.changes.get()
+        if isinstance(change, Exception):
+            raise change
+        self.resume_token = change["_id"]
+        return change
@@ -0,0 +1,159 @@
+import asyncio
+import pytest
+from collections import Counter
+from shieldx.broker import AsyncRabbitMQService, InMemoryTransport
+from shieldx.broker.sharding import shard_for, shard_queue_name, claim_shards, jump_hash
+from shieldx.models import EventModel
+
+# ---------- FIXTURES ----------
+
+class RecordingEventsService:
+    """
+    Servicio de eventos en memoria que registra los eventos consumidos en orden.
+    """
+    def __init__(self):
+        self.events = []
+
+    async def create_event(self, event):
+        self.events.append(event)
+        return str(len(self.events))
+
+async def consume_one(transport, queue, **kwargs):
+    async for message in transport.consume(queue, **kwargs):
+        return message
+
+# ---------- TESTS ----------
+
+def test_shard_for_is_stable():
+    """
+    ✅ Verifica que un mismo service_id siempre se enrute al mismo shard.
+    """
+    assert shard_for("service-a", 16) == shard_for("service-a", 16)
+    assert 0 <= shard_for("service-a", 16) < 16
+
+
+def test_shards_spread_services():
+    """
+    📊 Verifica que los servicios se repartan entre todos los shards.
+    """
+    counts = Counter(shard_for(f"service-{i}", 8) for i in range(8000))
+    assert len(counts) == 8
+    assert min(counts.values()) > 800
+
+
+def test_jump_hash_moves_few_keys():
+    """
+    🔄 Verifica que agregar un shard solo reasigne una fracción pequeña de las llaves.
+    """
+    moved = sum(jump_hash(key, 10) != jump_hash(key, 11) for key in range(10000))
+    assert moved < 1500
+
+
+def test_claim_shards_partitions_all_shards():
+    """
+    ✅ Verifica que los workers reclamen shards disjuntos que cubren todos los shards.
+    """
+    claimed = [claim_shards(i, 3, 16) for i in range(3)]
+    flat = [shard for shards in claimed for shard in shards]
+    assert sorted(flat) == list(range(16))
+
+
+@pytest.mark.asyncio
+async def test_in_memory_ack_and_requeue():
+    """
+    📥 Verifica que un mensaje rechazado con requeue se vuelva a entregar marcado como reentregado.
+    """
+    transport = InMemoryTransport()
+    await transport.connect()
+    await transport.declare_queue("q")
+    await transport.publish("", "q", b"hello")
+
+    message = await consume_one(transport, "q")
+    assert message.body == b"hello"
+    await message.reject(requeue=True)
+
+    message = await consume_one(transport, "q")
+    assert message.redelivered
+    await message.ack()
+    assert transport.queues["q"].acked == 2
+    assert not transport.queues["q"].unacked
+
+
+@pytest.mark.asyncio
+async def test_in_memory_process_rejects_on_error():
+    """
+    ❌ Verifica que `process()` rechace el mensaje y propague el error, como aio-pika.
+    """
+    transport = InMemoryTransport()
+    await transport.connect()
+    await transport.declare_queue("q")
+    await transport.publish("", "q", b"boom")
+
+    message = await consume_one(transport, "q")
+    with pytest.raises(ValueError):
+        async with message.process():
+            raise ValueError("boom")
+    assert message.processed
+    assert len(transport.queues["q"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_in_memory_unroutable_is_dropped():
+    """
+    🚫 Verifica que un mensaje sin cola enlazada se descarte y se contabilice.
+    """
+    transport = InMemoryTransport()
+    await transport.connect()
+    await transport.declare_exchange("ex")
+    await transport.publish("ex", "nowhere", b"lost")
+    assert transport.unroutable == 1
+
+
+@pytest.mark.asyncio
+async def test_only_publishers_declare_every_shard_queue():
+    """
+    🧱 Verifica que solo el publicador declare todas las colas de shard; un consumidor, las suyas.
+    """
+    legacy = InMemoryTransport()
+    await AsyncRabbitMQService(queues=["q"], shard_count=4, transport=legacy).connect()
+    assert set(legacy.queues) == {"q"}
+
+    sharded = InMemoryTransport()
+    await AsyncRabbitMQService(shards=[1], shard_count=4, transport=sharded).connect()
+    assert set(sharded.queues) == {shard_queue_name(1)}
+
+    publishing = InMemoryTransport()
+    await AsyncRabbitMQService(shard_count=4, transport=publishing, publisher=True).connect()
+    assert {shard_queue_name(shard) for shard in range(4)} <= set(publishing.queues)
+
+
+@pytest.mark.asyncio
+async def test_sharded_consumption_keeps_service_order():
+    """
+    🔀 Verifica el flujo publish_event → shard → consumidor y que se conserve el orden por servicio.
+    """
+    transport = InMemoryTransport()
+    publisher = AsyncRabbitMQService(shard_count=4, transport=transport, publisher=True)
+    await publisher.connect()
+    for i in range(20):
+        await publisher.publish_event(EventModel(
+            service_id=f"service-{i % 3}",
+            microservice_id="micro",
+            function_id="func",
+            event_type="EncryptStart",
+            payload={"seq": i}
+        ))
+
+    recorder = RecordingEventsService()
+    consumer = AsyncRabbitMQService(shards=list(range(4)), shard_count=4, transport=transport, events_service=recorder)
+    task = asyncio.create_task(consumer.start_consuming())
+    await asyncio.wait_for(transport.join(), timeout=5)
+    await consumer.close()
+    await task
+
+    assert len(recorder.events) == 20
+    for service in ("service-0", "service-1", "service-2"):
+        seqs = [e.payload["seq"] for e in recorder.events if e.service_id == service]
+        assert seqs == sorted(seqs)
+        queue = transport.queues[shard_queue_name(shard_for(service, 4))]
+        assert queue.acked >= len(seqs)
@@ -0,0 +1,42 @@
+import time as T
+from shieldx.cache import TTLCache
+
+# ---------- TESTS ----------
+
+def test_cache_hit_and_miss():
+    """
+    ✅ Verifica que la caché devuelva valores vigentes y contabilice aciertos y fallos.
+    """
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """
+    🔄 Verifica que al exceder `maxsize` se desaloje la entrada usada hace más tiempo.
+    """
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert len(cache) == 2
+
+
+def test_cache_expires_entries():
+    """
+    ⏱️ Verifica que las entradas expiren después de su TTL.
+    """
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    T.sleep(0.02)
+    assert cache.get("a") is None
+    assert "a" not in cache
@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from pymongo.errors import OperationFailure
+from shieldx.cache.invalidation import InvalidationBus
+from shieldx.cache.repository import get_repository_cache
+from shieldx.cache.versions import VERSIONS
+from tests.mongo_fakes import FakeChangeStream
+
+# ---------- HELPERS ----------
+
+class FakeDatabase:
+    def __init__(self, error=None):
+        self.changes = asyncio.Queue()
+        self.error = error
+        self.watch_calls = []
+
+    def watch(self, pipeline, resume_after=None):
+        self.watch_calls.append(resume_after)
+        if self.error is not None:
+            raise self.error
+        return FakeChangeStream(self.changes)
+
+# ---------- TESTS ----------
+
+@pytest.mark.asyncio
+async def test_changes_invalidate_their_collection():
+    """
+    🔄 Verifica que un cambio recibido por el stream vacíe la caché de su colección.
+    """
+    db = FakeDatabase()
+    bus = InvalidationBus(db, retry_delay=0)
+    rules = get_repository_cache("rules")
+    triggers = get_repository_cache("triggers")
+    rules.set("k", 1)
+    triggers.set("k", 1)
+
+    bus.start()
+    try:
+        await db.changes.put({"_id": {"token": 1}, "operationType": "update", "ns": {"db": "shieldx", "coll": "rules"}})
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert "k" not in rules
+        assert "k" in triggers
+        assert bus.active
+        assert bus.resume_token == {"token": 1}
+    finally:
+        await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_resumes_and_flushes():
+    """
+    🔁 Verifica que tras un error se reanude con el resume token y se vacíen todas las cachés.
+    """
+    db = FakeDatabase()
+    bus = InvalidationBus(db, retry_delay=0)
+    triggers = get_repository_cache("triggers")
+
+    bus.start()
+    try:
+        await db.changes.put({"_id": {"token": 7}, "operationType": "insert", "ns": {"db": "shieldx", "coll": "rules"}})
+        for _ in range(10):
+            await asyncio.sleep(0)
+        triggers.set("k", 1)
+        await db.changes.put(OperationFailure("connection lost", code=6))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert db.watch_calls == [None, {"token": 7}]
+        assert "k" not in triggers
+        assert bus.reconnects == 1
+    finally:
+        await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_standalone_server_disables_bus():
+    """
+    🚫 Verifica que sin replica set el bus se detenga y las cachés dependan solo del TTL.
+    """
+    db = FakeDatabase(error=OperationFailure("The $changeStream stage is only supported on replica sets", code=40573))
+    bus = InvalidationBus(db, retry_delay=0)
+    bus.start()
+    await asyncio.sleep(0.01)
+    assert not bus.supported
+    assert not bus.active
+    assert len(db.watch_calls) == 1
+    await bus.stop()
+
+
+def test_version_changes_forget_known_version():
+    """
+    🏷️ Verifica que un cambio en `collection_versions` olvide la versión recordada de esa colección.
+    """
+    bus = InvalidationBus(FakeDatabase())
+    VERSIONS._known["rules"] = (3, 0.0)
+    VERSIONS._known["triggers"] = (4, 0.0)
+    bus.apply({"operationType": "update", "ns": {"coll": "collection_versions"}, "documentKey": {"_id": "rules"}})
+    assert "rules" not in VERSIONS._known
+    assert "triggers" in VERSIONS._known
+    VERSIONS.forget_all()
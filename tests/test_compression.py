@@ -0,0 +1,153 @@
+import itertools
+import json
+import pytest
+from fastapi import HTTPException
+from shieldx.compression import COMPRESSED_FIELD, DICTIONARIES_COLLECTION, PayloadCodec, PayloadCompressionError, ZLIB, ZSTD, train_dictionary
+from shieldx.models import EventModel
+from shieldx.repositories.events_repository import EventsRepository
+from tests.mongo_fakes import FakeCollection, FakeDatabase
+
+# ---------- HELPERS ----------
+
+def make_payload(i: int) -> dict:
+    return {
+        "bucket_id": "shieldx-bucket",
+        "key": f"object-{i}",
+        "replication_factor": 3,
+        "chunks": [{"index": n, "size": 1024 * n, "node": f"peer-{n % 4}"} for n in range(8)],
+        "tags": {"source": "encrypt", "attempt": i % 3},
+    }
+
+
+def make_db():
+    db = FakeDatabase()
+    db["events"] = FakeCollection("events", ids=(f"{n:024x}" for n in itertools.count(1)))
+    return db
+
+
+def make_event(payload):
+    return EventModel(service_id="s1", microservice_id="m1", function_id="f1", event_type="EncryptStart", payload=payload)
+
+
+def store_dictionary(db, codec, data, created_at=1):
+    dict_id = PayloadCodec(codec=codec, dictionary_path="").add_dictionary("EncryptStart", codec, data)
+    db[DICTIONARIES_COLLECTION].documents[dict_id] = {
+        "_id": dict_id, "event_type": "EncryptStart", "codec": codec, "data": data, "created_at": created_at,
+    }
+    return dict_id
+
+# ---------- TESTS ----------
+
+@pytest.mark.parametrize("codec", [ZSTD, ZLIB])
+def test_payload_roundtrip(codec):
+    """
+    🗜️ Verifica que un payload comprimido se recupere idéntico con cada códec.
+    """
+    codecs = PayloadCodec(codec=codec, threshold=64)
+    payload = make_payload(1)
+
+    compressed = codecs.compress(payload, "EncryptStart")
+
+    assert compressed["codec"] == codec
+    assert compressed["size"] == len(json.dumps(payload, separators=(",", ":")))
+    assert len(compressed["data"]) < compressed["size"]
+    assert codecs.decompress(compressed) == payload
+
+
+def test_small_payloads_are_not_compressed():
+    """
+    📏 Verifica que los payloads bajo el umbral (o con umbral 0) se guarden tal cual.
+    """
+    assert PayloadCodec(threshold=10_000).compress(make_payload(1)) is None
+    assert PayloadCodec(threshold=0).compress(make_payload(1)) is None
+    document = {"event_type": "EncryptStart", "payload": {"a": 1}}
+    assert PayloadCodec(threshold=64).deflate(dict(document)) == document
+
+
+@pytest.mark.parametrize("codec", [ZSTD, ZLIB])
+def test_dictionary_per_event_type(codec):
+    """
+    📚 Verifica que el diccionario del tipo de evento mejore la compresión y sea necesario para leer.
+    """
+    samples = [json.dumps(make_payload(i), separators=(",", ":")).encode() for i in range(200)]
+    plain = PayloadCodec(codec=codec, threshold=64)
+    trained = PayloadCodec(codec=codec, threshold=64)
+    trained.add_dictionary("EncryptStart", codec, train_dictionary(samples, codec, size=4096))
+    payload = make_payload(500)
+
+    with_dictionary = trained.compress(payload, "EncryptStart")
+    without_dictionary = plain.compress(payload, "EncryptStart")
+
+    assert with_dictionary["dict"] is not None
+    assert len(with_dictionary["data"]) < len(without_dictionary["data"])
+    assert trained.decompress(with_dictionary) == payload
+    assert trained.compress(payload, "OtherType")["dict"] is None
+    with pytest.raises(PayloadCompressionError):
+        plain.decompress(with_dictionary)
+
+
+@pytest.mark.asyncio
+async def test_repository_stores_compressed_payload():
+    """
+    💽 Verifica que el repositorio guarde el payload comprimido y lo devuelva descomprimido.
+    """
+    db = make_db()
+    repository = EventsRepository(db, codec=PayloadCodec(threshold=64))
+    payload = make_payload(1)
+
+    event_id = await repository.insert_one(make_event(payload))
+
+    stored = db["events"].documents[event_id]
+    assert "payload" not in stored
+    assert stored[COMPRESSED_FIELD]["size"] > len(stored[COMPRESSED_FIELD]["data"])
+    assert (await repository.find_one({"_id": event_id})).payload == payload
+    projected = await repository.find_event_fields_by_id(event_id, ["payload"])
+    assert projected == {"event_id": event_id, "payload": payload}
+    # Without `payload` in the projection the compressed bytes are neither read nor decoded
+    assert await repository.find_event_fields_by_id(event_id, ["event_type"]) == {"event_id": event_id, "event_type": "EncryptStart"}
+
+
+@pytest.mark.asyncio
+async def test_dictionaries_are_shared_through_mongo():
+    """
+    🤝 Verifica que un payload comprimido con un diccionario de Mongo se lea en otro proceso que no lo tenía.
+    """
+    db = make_db()
+    samples = [json.dumps(make_payload(i), separators=(",", ":")).encode() for i in range(200)]
+    dict_id = store_dictionary(db, ZLIB, train_dictionary(samples, ZLIB, size=4096))
+    consumer = EventsRepository(db, codec=PayloadCodec(codec=ZLIB, threshold=64, dictionary_path=""))
+    api = EventsRepository(db, codec=PayloadCodec(codec=ZLIB, threshold=64, dictionary_path=""))
+
+    event_id = await consumer.insert_one(make_event(make_payload(1)))
+
+    assert db["events"].documents[event_id][COMPRESSED_FIELD]["dict"] == dict_id
+    assert dict_id not in api.codec.dictionaries
+    assert (await api.find_one({"_id": event_id})).payload == make_payload(1)
+    assert (await api.find_events({}))[0].payload == make_payload(1)
+
+
+@pytest.mark.asyncio
+async def test_undecodable_payload_does_not_drop_the_page():
+    """
+    🩹 Verifica que un payload que no se puede descomprimir no vacíe el listado y sí falle al pedir ese evento.
+    """
+    db = make_db()
+    repository = EventsRepository(db, codec=PayloadCodec(codec=ZLIB, threshold=64, dictionary_path=""))
+    good = await repository.insert_one(make_event(make_payload(1)))
+    bad = await repository.insert_one(make_event(make_payload(2)))
+    db["events"].documents[bad][COMPRESSED_FIELD]["dict"] = "missing"
+
+    events = {event.event_id: event for event in await repository.find_events({})}
+
+    assert events[good].payload == make_payload(1)
+    assert events[bad].payload is None
+    with pytest.raises(HTTPException) as error:
+        await repository.find_event_fields_by_id(bad, ["payload"])
+    assert error.value.status_code == 502
+
+
+def test_default_codec_is_zlib():
+    """
+    ⚙️ Verifica que sin configuración se use zlib, que no necesita dependencias extra.
+    """
+    assert PayloadCodec(dictionary_path="").codec == ZLIB
@@ -0,0 +1,53 @@
+import pytest
+import shieldx.db as DB
+from shieldx.container import get_container, reset_container, build_container
+from shieldx.db import connect_to_mongo, close_mongo_connection
+
+# ---------- TESTS ----------
+
+@pytest.mark.asyncio
+async def test_container_shares_instances_until_client_changes():
+    """
+    ♻️ Verifica que el contenedor entregue las mismas instancias mientras no cambie el cliente de MongoDB.
+    """
+    await connect_to_mongo()
+    try:
+        container = get_container()
+        assert get_container() is container
+        assert container.events_service.repository is container.events_repository
+        assert container.events_service.event_type_repo is container.event_type_repository
+        assert container.rules_trigger_service is get_container().rules_trigger_service
+
+        await connect_to_mongo()
+        assert get_container() is not container
+        assert get_container().client is DB.client
+    finally:
+        reset_container()
+        await close_mongo_connection()
+
+
+def test_build_container_requires_connection(monkeypatch):
+    """
+    🚫 Verifica que no se construya el contenedor sin conexión a MongoDB.
+    """
+    monkeypatch.setattr(DB, "client", None)
+    reset_container()
+    with pytest.raises(RuntimeError):
+        build_container()
+
+
+@pytest.mark.asyncio
+async def test_container_uses_each_repository_profile():
+    """
+    🔌 Verifica que cada repositorio use el cliente de su perfil de conexión.
+    """
+    await connect_to_mongo()
+    try:
+        container = get_container()
+        assert container.events_repository.collection.database.client is DB.clients["ingest"]
+        assert container.events_repository.read_collection.database.client is DB.clients["analytics"]
+        assert container.rule_repository.collection.database.client is DB.clients["config"]
+        assert container.rules_trigger_repository.collection.database.client is DB.clients["config"]
+    finally:
+        reset_container()
+        await close_mongo_connection()
@@ -0,0 +1,49 @@
+import pytest
+from pymongo import ReadPreference
+import shieldx.db as DB
+from shieldx import config
+from shieldx.db import connect_to_mongo, close_mongo_connection, get_database
+
+# ---------- TESTS ----------
+
+@pytest.mark.asyncio
+async def test_profiles_get_their_own_client_and_options():
+    """
+    🔌 Verifica que cada perfil tenga su propio cliente con su pool, write concern y read preference.
+    """
+    await connect_to_mongo()
+    try:
+        assert set(DB.clients) >= set(config.SHIELDX_MONGO_PROFILES)
+        assert DB.client is DB.clients["default"]
+        assert len({id(client) for client in DB.clients.values()}) == len(DB.clients)
+
+        assert DB.clients["config"].write_concern.document == {"w": "majority"}
+        assert DB.clients["ingest"].write_concern.document == {"w": 1}
+        assert DB.clients["analytics"].read_preference == ReadPreference.SECONDARY_PREFERRED
+        assert DB.clients["ingest"].options.pool_options.max_pool_size == config.SHIELDX_MONGO_PROFILES["ingest"]["maxPoolSize"]
+    finally:
+        await close_mongo_connection()
+
+
+@pytest.mark.asyncio
+async def test_unknown_profile_falls_back_to_default():
+    """
+    ↩️ Verifica que un perfil desconocido use el cliente por defecto.
+    """
+    await connect_to_mongo()
+    try:
+        assert get_database("missing").client is DB.client
+        assert get_database("analytics").client is DB.clients["analytics"]
+    finally:
+        await close_mongo_connection()
+
+
+def test_profile_options_from_environment(monkeypatch):
+    """
+    ⚙️ Verifica que las opciones de un perfil se puedan sobrescribir por variables de entorno.
+    """
+    monkeypatch.setenv("SHIELDX_MONGO_INGEST_W", "0")
+    monkeypatch.setenv("SHIELDX_MONGO_INGEST_POOL_SIZE", "250")
+    options = config._mongo_profile("ingest", 100, "1", "primary")
+    assert options["w"] == 0
+    assert options["maxPoolSize"] == 250
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from shieldx.repositories.events_repository import EventsRepository
+from shieldx.services.events_service import EventsService, parse_fields
+from tests.mongo_fakes import FakeCollection, FakeDatabase
+
+# ---------- HELPERS ----------
+
+def make_service():
+    documents = [
+        {
+            "_id": ObjectId(),
+            "service_id": "s1" if i < 3 else "s2",
+            "microservice_id": "m1",
+            "function_id": "f1",
+            "event_type": "EncryptStart",
+            "timestamp": datetime(2025, 1, 1, i, tzinfo=timezone.utc),
+            "payload": {"blob": "x" * 1000},
+        }
+        for i in range(5)
+    ]
+    collection = FakeCollection("events", documents)
+    repository = EventsRepository(FakeDatabase(events=collection))
+    return EventsService(repository, event_type_repo=None), collection, documents
+
+# ---------- TESTS ----------
+
+def test_parse_fields():
+    """
+    🧾 Verifica que `fields` se normalice y que los campos desconocidos se rechacen con 400.
+    """
+    assert parse_fields(None) is None
+    assert parse_fields(" timestamp, event_id ,timestamp") == ["timestamp", "event_id"]
+    assert parse_fields(",") == ["event_id"]
+    with pytest.raises(HTTPException) as error:
+        parse_fields("timestamp,secret")
+    assert error.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_projection_is_pushed_down_to_mongo():
+    """
+    🎯 Verifica que la proyección llegue a Mongo y que la respuesta no incluya `payload`.
+    """
+    service, collection, documents = make_service()
+
+    events = await service.get_event_fields_filtered(["timestamp"], service_id="s1", limit=2)
+
+    assert collection.projections == [{"_id": 1, "timestamp": 1}]
+    assert events == [
+        {"event_id": str(d["_id"]), "timestamp": d["timestamp"]} for d in documents[:2]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_projection_by_id():
+    """
+    🔎 Verifica la proyección al consultar un evento por ID y un ID inválido.
+    """
+    service, collection, documents = make_service()
+
+    event = await service.get_event_fields_by_id(str(documents[4]["_id"]), ["event_id", "service_id"])
+    assert event == {"event_id": str(documents[4]["_id"]), "service_id": "s2"}
+    assert collection.projections == [{"_id": 1, "service_id": 1}]
+    assert await service.get_event_fields_by_id("not-an-id", ["service_id"]) is None
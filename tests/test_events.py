@@ -1,3 +1,4 @@
+import uuid
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
@@ -154,3 +155,24 @@ async def test_delete_event(client):
     delete_response = await client.delete(f"/api/v1/events/{event_id}")
     assert delete_response.status_code == 204
     
+
+# 🔸 IDEMPOTENCY KEY
+@pytest.mark.asyncio
+async def test_create_event_idempotency_key(client):
+    """
+    🔁 Verifica que reintentar con el mismo `Idempotency-Key` devuelva el evento original.
+    """
+    await client.post("/api/v1/event-types", json={"event_type": "TestEventType"})
+    payload = {
+        "service_id": "service_test",
+        "microservice_id": "micro_test",
+        "function_id": "func_test",
+        "event_type": "TestEventType",
+        "payload": {}
+    }
+    key = f"retry-{uuid.uuid4().hex}"
+    first = await client.post("/api/v1/events", json=payload, headers={"Idempotency-Key": key})
+    second = await client.post("/api/v1/events", json=payload, headers={"Idempotency-Key": key})
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert first.json()["id"] == second.json()["id"]
@@ -0,0 +1,200 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+import pytest
+from pymongo.errors import OperationFailure
+from shieldx.live import LiveEventHub, LiveUnavailable
+from tests.mongo_fakes import FakeChangeStream, FakeCollection
+
+# ---------- HELPERS ----------
+
+class FakeDatabase:
+    def __init__(self, error=None):
+        self.dictionaries = FakeCollection("payload_dictionaries")
+        self.changes = asyncio.Queue()
+        self.error = error
+        self.watch_calls = 0
+
+    def __getitem__(self, name):
+        return self.dictionaries
+
+    def watch(self, pipeline, resume_after=None):
+        self.watch_calls += 1
+        if self.error is not None:
+            raise self.error
+        return FakeChangeStream(self.changes)
+
+    async def insert(self, n, **fields):
+        document = {
+            "_id": f"e{n}",
+            "service_id": "s1",
+            "microservice_id": "m1",
+            "function_id": "f1",
+            "event_type": "EncryptStart",
+            "timestamp": datetime(2025, 1, 1, tzinfo=timezone.utc),
+            **fields,
+        }
+        await self.changes.put({"_id": {"token": n}, "operationType": "insert", "fullDocument": document})
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def drain(subscription):
+    items = []
+    while not subscription.queue.empty():
+        item = subscription.queue.get_nowait()
+        items.append(json.loads(item) if item is not None else None)
+    return items
+
+# ---------- TESTS ----------
+
+@pytest.mark.asyncio
+async def test_one_stream_fans_out_to_matching_subscribers():
+    """
+    📡 Verifica que un único change stream reparta cada evento solo a los suscriptores cuyo filtro coincide.
+    """
+    db = FakeDatabase()
+    hub = LiveEventHub(db, retry_delay=0)
+    hub.start()
+    try:
+        everything = hub.subscribe({})
+        service = hub.subscribe({"service_id": "s2", "event_type": None})
+        await settle()
+        await db.insert(1)
+        await db.insert(2, service_id="s2")
+        await settle()
+
+        assert db.watch_calls == 1
+        assert [e["event_id"] for e in drain(everything)] == ["e1", "e2"]
+        assert [e["event_id"] for e in drain(service)] == ["e2"]
+        assert hub.stats()["delivered"] == 3
+    finally:
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_drops_oldest_events():
+    """
+    🪣 Verifica que un suscriptor lento descarte sus eventos más antiguos sin afectar a los demás.
+    """
+    db = FakeDatabase()
+    hub = LiveEventHub(db, buffer_size=2, retry_delay=0)
+    hub.start()
+    try:
+        slow = hub.subscribe({})
+        await settle()
+        for n in range(5):
+            await db.insert(n)
+        await settle()
+
+        assert slow.dropped == 3
+        assert [e["event_id"] for e in drain(slow)] == ["e3", "e4"]
+    finally:
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_stream_closes_with_last_subscriber():
+    """
+    🔌 Verifica que el change stream se cierre al irse el último suscriptor y se reabra con el siguiente.
+    """
+    db = FakeDatabase()
+    hub = LiveEventHub(db, retry_delay=0)
+    hub.start()
+    try:
+        subscription = hub.subscribe({})
+        await settle()
+        hub.unsubscribe(subscription)
+        await settle()
+        assert hub._task is None
+        assert not hub.active
+
+        hub.subscribe({})
+        await settle()
+        assert db.watch_calls == 2
+    finally:
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_standalone_server_rejects_subscribers():
+    """
+    🚫 Verifica que sin replica set se cierren los suscriptores y se rechacen los nuevos.
+    """
+    db = FakeDatabase(error=OperationFailure("The $changeStream stage is only supported on replica sets", code=40573))
+    hub = LiveEventHub(db, retry_delay=0)
+    hub.start()
+    try:
+        subscription = hub.subscribe({})
+        await settle()
+        assert subscription.closed
+        assert drain(subscription) == [None]
+        with pytest.raises(LiveUnavailable):
+            hub.subscribe({})
+    finally:
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_subscriber_limit():
+    """
+    🧮 Verifica que se rechacen suscriptores por encima del límite.
+    """
+    hub = LiveEventHub(FakeDatabase(), max_subscribers=1, retry_delay=0)
+    try:
+        hub.subscribe({})
+        with pytest.raises(LiveUnavailable):
+            hub.subscribe({})
+    finally:
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_undecodable_event_is_skipped():
+    """
+    🧩 Verifica que un evento que no se puede decodificar se omita sin detener el stream.
+    """
+    db = FakeDatabase()
+    hub = LiveEventHub(db, retry_delay=0)
+    hub.start()
+    try:
+        subscription = hub.subscribe({})
+        await settle()
+        await db.insert(1, payload_compressed={"codec": "zlib", "dict": "unknown", "size": 2, "data": b"x"})
+        await db.insert(2)
+        await settle()
+
+        assert [e["event_id"] for e in drain(subscription)] == ["e2"]
+        assert hub._task is not None and not hub._task.done()
+        assert "unknown" in hub.stats()["last_error"]
+    finally:
+        await hub.stop()
+
+
+@pytest.mark.asyncio
+async def test_dead_stream_restarts_with_next_subscriber():
+    """
+    ♻️ Verifica que si la tarea del stream termina por un error, el siguiente suscriptor abra otro.
+    """
+    db = FakeDatabase()
+    hub = LiveEventHub(db, retry_delay=0)
+    hub.start()
+    try:
+        first = hub.subscribe({})
+        await settle()
+        await db.changes.put(RuntimeError("boom"))
+        await settle()
+        assert hub._task is None
+
+        second = hub.subscribe({})
+        await settle()
+        await db.insert(1)
+        await settle()
+        assert db.watch_calls == 2
+        assert [e["event_id"] for e in drain(second)] == ["e1"]
+        hub.unsubscribe(first)
+    finally:
+        await hub.stop()
@@ -0,0 +1,186 @@
+import logging
+import threading
+from shieldx.log import AsyncLogPipeline, AsyncQueueHandler
+
+# ---------- FIXTURES ----------
+
+class ListHandler(logging.Handler):
+    """
+    Handler en memoria que guarda los registros y el hilo que los escribió.
+    """
+    def __init__(self, gate: threading.Event = None):
+        super().__init__()
+        self.records = []
+        self.threads = []
+        self.gate = gate
+
+    def emit(self, record):
+        if self.gate is not None:
+            self.gate.wait(1)
+        self.records.append(record)
+        self.threads.append(threading.current_thread().name)
+
+def make_logger(name, handler, pipeline):
+    logger = logging.Logger(name)
+    logger.addHandler(AsyncQueueHandler([handler], pipeline=pipeline))
+    return logger
+
+# ---------- TESTS ----------
+
+def test_async_handler_writes_on_background_thread():
+    """
+    ✅ Verifica que los registros se escriban en el hilo de fondo y en orden.
+    """
+    pipeline = AsyncLogPipeline(maxsize=100)
+    handler = ListHandler()
+    logger = make_logger("test.async", handler, pipeline)
+    for i in range(10):
+        logger.info({"event": "TEST", "i": i})
+    pipeline.stop()
+    assert [r.msg["i"] for r in handler.records] == list(range(10))
+    assert set(handler.threads) == {"shieldx-log-writer"}
+    assert all(r.threadName == threading.current_thread().name for r in handler.records)
+    assert pipeline.stats()["written"] == 10
+
+
+def test_async_pipeline_drops_when_full():
+    """
+    🚫 Verifica que con la política "drop" se descarten y contabilicen los registros que no caben.
+    """
+    gate = threading.Event()
+    pipeline = AsyncLogPipeline(maxsize=2, policy="drop")
+    handler = ListHandler(gate=gate)
+    logger = make_logger("test.drop", handler, pipeline)
+    for i in range(20):
+        logger.info({"event": "TEST", "i": i})
+    gate.set()
+    pipeline.stop()
+    stats = pipeline.stats()
+    assert stats["dropped"] > 0
+    assert stats["enqueued"] + stats["dropped"] == 20
+    assert len(handler.records) == stats["enqueued"]
+
+
+def test_async_pipeline_respects_handler_level():
+    """
+    🔍 Verifica que el hilo de fondo respete el nivel de cada handler.
+    """
+    pipeline = AsyncLogPipeline(maxsize=10)
+    handler = ListHandler()
+    handler.setLevel(logging.ERROR)
+    logger = make_logger("test.level", handler, pipeline)
+    logger.info("ignored")
+    logger.error("kept")
+    pipeline.stop()
+    assert [r.getMessage() for r in handler.records] == ["kept"]
+
+
+def test_get_logger_shares_handlers():
+    """
+    🔗 Verifica que todos los loggers de módulo compartan los mismos handlers.
+    """
+    from shieldx.log.logger_config import get_logger, RUNTIME
+    a = get_logger("shieldx.test.a")
+    b = get_logger("shieldx.test.b")
+    assert get_logger("shieldx.test.a") is a
+    assert a.handlers == b.handlers
+    assert len(a.handlers) == (1 if RUNTIME.async_mode else len(RUNTIME.handlers))
+
+
+def test_compact_formatter_is_single_line():
+    """
+    📏 Verifica que el formato compacto produzca una sola línea de JSON válido.
+    """
+    import json
+    from shieldx.log import JsonFormatter
+    record = logging.LogRecord("test", logging.INFO, __file__, 0, {"event": "TEST", "n": 1}, None, None)
+    line = JsonFormatter(compact=True).format(record)
+    assert "\n" not in line
+    assert json.loads(line)["event"] == "TEST"
+
+
+def test_lazy_message_only_built_when_enabled():
+    """
+    💤 Verifica que los mensajes perezosos solo se construyan si el nivel está habilitado.
+    """
+    from shieldx.log import Log
+    handler = ListHandler()
+    logger = Log(name="test.lazy", level=logging.INFO, disabled=True)
+    logger.addHandler(handler)
+    calls = []
+    logger.debug(lambda: calls.append("debug") or {"event": "DEBUG"})
+    logger.info(lambda: calls.append("info") or {"event": "INFO"})
+    assert calls == ["info"]
+    assert handler.records[0].msg == {"event": "INFO"}
+
+
+def test_sampler_keeps_one_in_n_and_reports_summary():
+    """
+    🎯 Verifica el muestreo 1 de cada N y el registro de resumen con los suprimidos.
+    """
+    from shieldx.log import Log, LogSampler
+    handler = ListHandler()
+    sampler = LogSampler(LogSampler.parse("EVENT.CREATED=1/10"), summary_interval=0)
+    logger = Log(name="test.sampling", level=logging.DEBUG, disabled=True, sampler=sampler)
+    logger.addHandler(handler)
+    for i in range(30):
+        logger.info({"event": "EVENT.CREATED", "i": i})
+    logger.info({"event": "OTHER"})
+    created = [r.msg["i"] for r in handler.records if r.msg["event"] == "EVENT.CREATED"]
+    summaries = [r.msg for r in handler.records if r.msg["event"] == "LOG.SAMPLING.SUMMARY"]
+    assert created == [0, 10, 20]
+    assert sum(s["suppressed"]["EVENT.CREATED"] for s in summaries) == 27
+    assert handler.records[-1].msg == {"event": "OTHER"}
+
+
+def test_sampling_summary_respects_logger_level():
+    """
+    🔇 Verifica que con el logger en WARNING el resumen no salga como INFO.
+    """
+    from shieldx.log import Log, LogSampler
+    handler = ListHandler()
+    sampler = LogSampler(LogSampler.parse("DISK.LOW=1/10"), summary_interval=0)
+    logger = Log(name="test.sampling.level", level=logging.WARNING, disabled=True, sampler=sampler)
+    logger.addHandler(handler)
+    for _ in range(20):
+        logger.warning({"event": "DISK.LOW"})
+    assert all(record.levelno >= logging.WARNING for record in handler.records)
+    assert any(record.msg["event"] == "LOG.SAMPLING.SUMMARY" for record in handler.records)
+
+
+def test_sampler_rate_limit_per_second():
+    """
+    ⏱️ Verifica que la regla X/s deje pasar como máximo X registros por segundo.
+    """
+    from shieldx.log import LogSampler
+    sampler = LogSampler(LogSampler.parse("API.EVENT.CREATED=5/s"), summary_interval=3600)
+    allowed = [sampler.check("API.EVENT.CREATED")[0] for _ in range(50)]
+    assert 5 <= sum(allowed) <= 10
+
+
+def test_sampling_summary_flushed_after_traffic_stops():
+    """
+    🧾 Verifica que los suprimidos se reporten desde el hilo de escritura aunque no llegue más tráfico, y al parar.
+    """
+    from shieldx.log import LogSampler
+    handler = ListHandler()
+    pipeline = AsyncLogPipeline(maxsize=100, tick_interval=0.01)
+    logger = make_logger("test.sampling.flush", handler, pipeline)
+    sampler = LogSampler(LogSampler.parse("EVENT.CREATED=1/10"), summary_interval=0.05)
+    flushed = threading.Event()
+
+    def flush(final):
+        summary = sampler.flush(force=final)
+        if summary is not None:
+            logger.info(summary)
+            flushed.set()
+
+    pipeline.add_periodic(flush)
+    for _ in range(15):
+        sampler.check("EVENT.CREATED")
+    assert flushed.wait(2)
+    for _ in range(5):
+        sampler.check("EVENT.CREATED")
+    pipeline.stop()
+    summaries = [r.msg["suppressed"]["EVENT.CREATED"] for r in handler.records]
+    assert summaries == [13, 5]
@@ -0,0 +1,46 @@
+import asyncio
+import time as T
+from shieldx.metrics.loop import LoopMonitor, get_loop_monitor
+
+# ---------- FIXTURES ----------
+
+def blocking_handler():
+    T.sleep(0.3)
+
+# ---------- TESTS ----------
+
+def test_loop_monitor_reports_blocking_callback_with_stack():
+    """
+    🧱 Verifica que un callback bloqueante se detecte con su pila y eleve el lag medido.
+    """
+    async def run():
+        monitor = LoopMonitor(interval=0.02, blocked_ms=50)
+        monitor.start()
+        assert get_loop_monitor() is monitor
+        await asyncio.sleep(0.05)
+        blocking_handler()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(run())
+    stats = monitor.stats()
+    assert get_loop_monitor() is None
+    assert stats["max_lag_ms"] >= 200
+    assert stats["pending_tasks"] >= 1
+    assert len(stats["blocked"]) == 1
+    assert any("blocking_handler" in line for line in stats["blocked"][0]["stack"])
+
+
+def test_loop_monitor_quiet_loop_has_no_reports():
+    """
+    ✅ Verifica que un loop sin bloqueos no genere reportes.
+    """
+    async def run():
+        monitor = LoopMonitor(interval=0.01, blocked_ms=200)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor
+
+    assert asyncio.run(run()).stats()["blocked"] == []
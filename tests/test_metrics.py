@@ -0,0 +1,115 @@
+import asyncio
+from shieldx.metrics import Histogram, Registry, MetricsMiddleware, timed_repository, REGISTRY, start_metrics_server
+
+# ---------- TESTS ----------
+
+def test_histogram_renders_cumulative_buckets():
+    """
+    📊 Verifica que el histograma acumule las cubetas y exporte `_sum` y `_count`.
+    """
+    registry = Registry()
+    histogram = registry.register(Histogram("test_latency_seconds", "Latencia", ["route"], buckets=(0.1, 1.0)))
+    child = histogram.labels("/events")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+    text = registry.render()
+    assert 'test_latency_seconds_bucket{route="/events",le="0.1"} 2' in text
+    assert 'test_latency_seconds_bucket{route="/events",le="1.0"} 3' in text
+    assert 'test_latency_seconds_bucket{route="/events",le="+Inf"} 4' in text
+    assert 'test_latency_seconds_count{route="/events"} 4' in text
+
+
+def test_counter_labels_and_registry_reuse():
+    """
+    🔢 Verifica que los contadores acumulen por etiqueta y que el registro reutilice métricas por nombre.
+    """
+    registry = Registry()
+    counter = registry.counter("test_messages_total", "Mensajes", ["queue"])
+    assert registry.counter("test_messages_total", "Mensajes", ["queue"]) is counter
+    counter.labels("a").inc()
+    counter.labels("a").inc(2)
+    counter.labels("b").inc()
+    text = registry.render()
+    assert 'test_messages_total{queue="a"} 3' in text
+    assert 'test_messages_total{queue="b"} 1' in text
+    assert "# TYPE test_messages_total counter" in text
+
+
+def test_timed_repository_records_per_method():
+    """
+    ⏱️ Verifica que los métodos de repositorio se midan con el nombre de la clase concreta.
+    """
+    @timed_repository
+    class FakeRepository:
+        async def find_thing(self):
+            return 42
+
+    assert asyncio.run(FakeRepository().find_thing()) == 42
+    assert 'shieldx_mongo_operation_duration_seconds_count{repository="FakeRepository",method="find_thing"} 1' in REGISTRY.render()
+
+
+def test_timed_repository_counts_super_calls_once():
+    """
+    🔁 Verifica que un método sobrescrito que llama a super() se mida una sola vez.
+    """
+    @timed_repository
+    class BaseThings:
+        async def update_thing(self):
+            return 1
+
+        async def find_thing(self):
+            return 2
+
+    @timed_repository
+    class Things(BaseThings):
+        async def update_thing(self):
+            return await super().update_thing() + await self.find_thing()
+
+    assert asyncio.run(Things().update_thing()) == 3
+    text = REGISTRY.render()
+    assert 'shieldx_mongo_operation_duration_seconds_count{repository="Things",method="update_thing"} 1' in text
+    assert 'shieldx_mongo_operation_duration_seconds_count{repository="Things",method="find_thing"} 1' in text
+
+
+def test_metrics_middleware_uses_route_template():
+    """
+    🛣️ Verifica que la latencia HTTP se etiquete con la plantilla de la ruta y no con la URL.
+    """
+    from fastapi import FastAPI
+    from httpx import AsyncClient, ASGITransport
+
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/things/{thing_id}")
+    async def get_thing(thing_id: str):
+        return {"id": thing_id}
+
+    async def call():
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/things/1")
+            await client.get("/things/2")
+
+    asyncio.run(call())
+    assert 'shieldx_http_request_duration_seconds_count{method="GET",route="/things/{thing_id}",status="200"} 2' in REGISTRY.render()
+
+
+def test_metrics_server_serves_registry():
+    """
+    🌐 Verifica que el servidor mínimo del consumidor responda /metrics.
+    """
+    async def scrape():
+        server = await start_metrics_server(host="127.0.0.1", port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: test\r\n\r\n")
+        await writer.drain()
+        response = await reader.read()
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return response.decode()
+
+    response = asyncio.run(scrape())
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert "shieldx_consumer_messages_total" in response
@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+from shieldx.db.monitoring import CommandMonitor, explain_command
+
+# ---------- FIXTURES ----------
+
+def run_command(monitor, request_id, command_name, command, duration_ms, failed=False):
+    started = SimpleNamespace(
+        command_name=command_name, command=command, connection_id=("localhost", 27017),
+        request_id=request_id, database_name="shieldx",
+    )
+    finished = SimpleNamespace(
+        command_name=command_name, connection_id=("localhost", 27017),
+        request_id=request_id, duration_micros=int(duration_ms * 1000),
+    )
+    monitor.started(started)
+    (monitor.failed if failed else monitor.succeeded)(finished)
+
+# ---------- TESTS ----------
+
+def test_monitor_keeps_slow_operations_with_filter():
+    """
+    🐢 Verifica que solo se retengan las operaciones lentas, con su filtro, de la más lenta a la más rápida.
+    """
+    monitor = CommandMonitor(slow_ms=50, capacity=10)
+    run_command(monitor, 1, "find", {"find": "triggers_triggers", "filter": {"trigger_child_id": "abc"}}, 120)
+    run_command(monitor, 2, "find", {"find": "events", "filter": {"service_id": "s"}}, 5)
+    run_command(monitor, 3, "aggregate", {"aggregate": "events", "pipeline": [{"$match": {}}]}, 300)
+
+    slow = monitor.slow_operations()
+    assert [op["collection"] for op in slow] == ["events", "triggers_triggers"]
+    assert slow[1]["query"] == {"filter": {"trigger_child_id": "abc"}}
+    assert monitor.slow_operations(command="find")[0]["duration_ms"] == 120
+
+    stats = {(row["command"], row["collection"]): row for row in monitor.command_stats()}
+    assert stats[("find", "events")]["count"] == 1
+    assert stats[("aggregate", "events")]["max_ms"] == 300
+
+
+def test_monitor_ring_buffer_is_bounded():
+    """
+    🔄 Verifica que el buffer circular descarte las operaciones lentas más antiguas.
+    """
+    monitor = CommandMonitor(slow_ms=0, capacity=3)
+    for i in range(5):
+        run_command(monitor, i, "find", {"find": f"c{i}", "filter": {}}, 10 + i)
+    assert sorted(op["collection"] for op in monitor.slow_operations()) == ["c2", "c3", "c4"]
+
+
+def test_explain_command_rebuilds_find():
+    """
+    🔍 Verifica que se reconstruya el comando a explicar y que los no explicables se rechacen.
+    """
+    monitor = CommandMonitor(slow_ms=0)
+    run_command(monitor, 1, "find", {"find": "triggers_triggers", "filter": {"trigger_child_id": "abc"}, "limit": 5}, 10)
+    run_command(monitor, 2, "insert", {"insert": "events", "documents": [{}]}, 10)
+    find_op, insert_op = sorted(monitor.slow, key=lambda op: op["id"])
+    assert explain_command(find_op) == {"find": "triggers_triggers", "filter": {"trigger_child_id": "abc"}, "limit": 5}
+    assert explain_command(insert_op) is None
+
+
+def test_admin_endpoints_require_token(monkeypatch):
+    """
+    🔐 Verifica que los endpoints de administración exijan el token configurado.
+    """
+    from fastapi import FastAPI
+    from httpx import AsyncClient, ASGITransport
+    from shieldx import config
+    from shieldx.controllers.admin_controller import router
+
+    app = FastAPI()
+    app.include_router(router)
+
+    async def call(headers):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            return (await client.get("/admin/mongo/slow", headers=headers)).status_code
+
+    monkeypatch.setattr(config, "SHIELDX_ADMIN_TOKEN", "")
+    assert asyncio.run(call({})) == 403
+    monkeypatch.setattr(config, "SHIELDX_ADMIN_TOKEN", "secret")
+    assert asyncio.run(call({"X-Admin-Token": "wrong"})) == 401
+    assert asyncio.run(call({"X-Admin-Token": "secret"})) == 200
@@ -0,0 +1,224 @@
+import hashlib
+import pytest
+from typing import Any, Optional
+from pydantic import BaseModel
+import shieldx.blobstore as BLOBSTORE
+from fastapi import HTTPException
+from shieldx.blobstore import BlobNotFound, BlobStore, LocalBlobStore, check_blob_store, get_blob_store
+from shieldx.blobstore.payloads import encode_payload, offload_payload
+from shieldx.cache import TTLCache
+from shieldx.models import EventModel
+from shieldx.services.events_service import EventsService
+
+# ---------- HELPERS ----------
+
+class FakeEventsRepository:
+    def __init__(self):
+        self.documents = {}
+
+    async def insert_one(self, event):
+        event_id = f"{len(self.documents) + 1:024x}"
+        self.documents[event_id] = event.model_dump(by_alias=True, exclude_none=True)
+        return event_id
+
+    async def find_event_fields_by_id(self, event_id, fields):
+        document = self.documents.get(str(event_id))
+        if document is None:
+            return None
+        return {"event_id": str(event_id), **{f: document[f] for f in fields if f in document}}
+
+    async def update_one(self, query, data):
+        self.documents[str(query["_id"])].update(data)
+        return self.documents[str(query["_id"])]
+
+
+class FakeEventTypeRepository:
+    async def get_by_name(self, name):
+        return {"event_type": name}
+
+
+class BrokenBlobStore(BlobStore):
+    name = "broken"
+
+    async def put(self, key, data):
+        raise OSError("disk full")
+
+    async def get(self, key):
+        raise BlobNotFound(key)
+
+
+class PayloadUpdate(BaseModel):
+    payload: Optional[Any] = None
+
+
+@pytest.fixture
+def configured_store(monkeypatch):
+    def configure(store):
+        monkeypatch.setattr(BLOBSTORE.config, "SHIELDX_BLOBSTORE", store)
+        monkeypatch.setattr(BLOBSTORE, "_store", None)
+        monkeypatch.setattr(BLOBSTORE, "_resolved", False)
+    return configure
+
+
+def make_event(payload):
+    return EventModel(service_id="s1", microservice_id="m1", function_id="f1", event_type="EncryptStart", payload=payload)
+
+
+def make_service(store, threshold=100):
+    repository = FakeEventsRepository()
+    service = EventsService(repository, FakeEventTypeRepository(), dedup_cache=TTLCache(), blob_store=store, offload_threshold=threshold)
+    return service, repository
+
+# ---------- TESTS ----------
+
+@pytest.mark.asyncio
+async def test_local_blob_store_roundtrip(tmp_path):
+    """
+    💾 Verifica que el almacén local guarde y devuelva objetos, y avise si no existen.
+    """
+    store = LocalBlobStore(str(tmp_path))
+    key = hashlib.sha256(b"data").hexdigest()
+    await store.put(key, b"data")
+    await store.put(key, b"data")
+    assert await store.get(key) == b"data"
+    assert (tmp_path / key[:2] / key[2:4] / key).exists()
+    with pytest.raises(BlobNotFound):
+        await store.get("0" * 64)
+
+
+@pytest.mark.asyncio
+async def test_small_payloads_stay_inline(tmp_path):
+    """
+    📦 Verifica que los payloads por debajo del umbral se queden en el documento.
+    """
+    store = LocalBlobStore(str(tmp_path))
+    assert await offload_payload({"a": 1}, store, 100) == ({"a": 1}, None)
+    assert await offload_payload({"a": "x" * 200}, store, 0) == ({"a": "x" * 200}, None)
+    assert await offload_payload({"a": "x" * 200}, None, 100) == ({"a": "x" * 200}, None)
+    assert not any(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_large_payload_is_offloaded_and_fetched_lazily(tmp_path):
+    """
+    🚚 Verifica que un payload grande se guarde fuera con su digest y se descargue al pedirlo.
+    """
+    store = LocalBlobStore(str(tmp_path))
+    service, repository = make_service(store)
+    payload = {"matrix": list(range(100))}
+
+    event_id = await service.create_event(make_event(payload))
+
+    stored = repository.documents[event_id]
+    digest = hashlib.sha256(encode_payload(payload)).hexdigest()
+    assert "payload" not in stored
+    assert stored["payload_ref"] == {"store": "local", "key": digest, "digest": f"sha256:{digest}", "size": len(encode_payload(payload))}
+    assert await service.get_event_payload(event_id) == payload
+
+
+@pytest.mark.asyncio
+async def test_corrupted_blob_is_rejected(tmp_path):
+    """
+    🛡️ Verifica que un objeto que no coincide con su digest no se entregue.
+    """
+    store = LocalBlobStore(str(tmp_path))
+    service, repository = make_service(store)
+    event_id = await service.create_event(make_event({"matrix": list(range(100))}))
+    key = repository.documents[event_id]["payload_ref"]["key"]
+    (tmp_path / key[:2] / key[2:4] / key).write_bytes(b'{"matrix": []}')
+
+    with pytest.raises(HTTPException) as error:
+        await service.get_event_payload(event_id)
+    assert error.value.status_code == 502
+
+
+@pytest.mark.asyncio
+async def test_blob_store_failure_keeps_payload_inline():
+    """
+    🧯 Verifica que si el almacén falla el payload se guarde en el documento.
+    """
+    service, repository = make_service(BrokenBlobStore())
+    payload = {"matrix": list(range(100))}
+
+    event_id = await service.create_event(make_event(payload))
+
+    assert repository.documents[event_id]["payload"] == payload
+    assert "payload_ref" not in repository.documents[event_id]
+    assert await service.get_event_payload(event_id) == payload
+
+
+def test_no_blob_store_by_default(configured_store):
+    """
+    🚦 Verifica que sin `SHIELDX_BLOBSTORE` no haya almacén y los payloads se queden en el documento.
+    """
+    configured_store("")
+    assert get_blob_store() is None
+
+
+@pytest.mark.asyncio
+async def test_unwritable_blob_store_is_disabled(configured_store, tmp_path, monkeypatch):
+    """
+    🔒 Verifica que un almacén local en el que no se puede escribir se desactive al arrancar.
+    """
+    configured_store("local")
+    monkeypatch.setattr(get_blob_store(), "root", str(tmp_path / "blobs"))
+    assert isinstance(await check_blob_store(), LocalBlobStore)
+
+    configured_store("local")
+    # A file where the folder should be: creating it fails even when running as root
+    (tmp_path / "not-a-folder").write_text("")
+    monkeypatch.setattr(get_blob_store(), "root", str(tmp_path / "not-a-folder" / "blobs"))
+    assert await check_blob_store() is None
+    assert get_blob_store() is None
+
+
+@pytest.mark.asyncio
+async def test_blob_keys_cannot_leave_the_store(tmp_path):
+    """
+    🚧 Verifica que el almacén solo acepte digests como llave y no lea fuera de su carpeta.
+    """
+    (tmp_path / "secret").write_bytes(b"secret")
+    store = LocalBlobStore(str(tmp_path / "blobs"))
+    for key in (str(tmp_path / "secret"), "../../../secret", "ABC"):
+        with pytest.raises(BlobNotFound):
+            await store.get(key)
+        with pytest.raises(ValueError):
+            await store.put(key, b"data")
+    with pytest.raises(TypeError):
+        type("IncompleteStore", (BlobStore,), {"put": BrokenBlobStore.put})()
+
+
+@pytest.mark.asyncio
+async def test_incoming_payload_ref_is_ignored(tmp_path):
+    """
+    🕵️ Verifica que una `payload_ref` enviada con el evento no se guarde ni se pueda seguir.
+    """
+    (tmp_path / "secret").write_bytes(b'{"password": "x"}')
+    service, repository = make_service(LocalBlobStore(str(tmp_path / "blobs")))
+    forged = {"store": "local", "key": str(tmp_path / "secret"), "digest": "sha256:x", "size": 1}
+    event = EventModel.model_validate({**make_event({"a": 1}).model_dump(), "payload_ref": forged})
+
+    event_id = await service.create_event(event)
+
+    assert "payload_ref" not in repository.documents[event_id]
+    assert await service.get_event_payload(event_id) == {"a": 1}
+    repository.documents[event_id]["payload_ref"] = forged
+    with pytest.raises(HTTPException) as error:
+        await service.get_event_payload(event_id)
+    assert error.value.status_code == 502
+
+
+@pytest.mark.asyncio
+async def test_inline_update_clears_old_reference(tmp_path):
+    """
+    🔄 Verifica que al actualizar el payload se borre la referencia anterior aunque ya no haya almacén.
+    """
+    service, repository = make_service(LocalBlobStore(str(tmp_path)))
+    event_id = await service.create_event(make_event({"matrix": list(range(100))}))
+    assert repository.documents[event_id]["payload_ref"] is not None
+    service.blob_store = None
+
+    await service.update_event(event_id, PayloadUpdate(payload={"a": 1}))
+
+    assert repository.documents[event_id]["payload_ref"] is None
+    assert await service.get_event_payload(event_id) == {"a": 1}
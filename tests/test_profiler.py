@@ -0,0 +1,49 @@
+import time as T
+import threading
+import pytest
+from shieldx.metrics.profiler import SamplingProfiler, ProfilerBusy, is_profiling
+
+# ---------- FIXTURES ----------
+
+def busy_work(stop: threading.Event):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+# ---------- TESTS ----------
+
+def test_profiler_collects_collapsed_stacks():
+    """
+    🔥 Verifica que el perfilador devuelva pilas colapsadas que incluyan la función activa.
+    """
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_work, args=(stop,), name="busy-worker")
+    worker.start()
+    profiler = SamplingProfiler(interval=0.002, thread_ids={worker.ident})
+    profiler.start()
+    T.sleep(0.2)
+    profiler.stop()
+    stop.set()
+    worker.join()
+
+    lines = profiler.collapsed().splitlines()
+    assert profiler.samples > 0
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert stack.startswith("busy-worker;")
+    assert any("busy_work" in line for line in lines)
+
+
+def test_profiler_allows_one_session():
+    """
+    🔒 Verifica que solo pueda haber una sesión de perfilado a la vez.
+    """
+    first = SamplingProfiler(interval=0.01)
+    first.start()
+    try:
+        assert is_profiling()
+        with pytest.raises(ProfilerBusy):
+            SamplingProfiler(interval=0.01).start()
+    finally:
+        first.stop()
+    assert not is_profiling()
@@ -0,0 +1,326 @@
+import asyncio
+import copy
+from datetime import datetime, timedelta, timezone
+import pytest
+from types import SimpleNamespace
+from shieldx import tracing
+from shieldx.models import ReplayRequestModel
+from shieldx.services.replay_service import ReplayService
+from shieldx.services.trigger_resolution_service import TriggerResolutionService
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# ---------- HELPERS ----------
+
+class FakeResolutionRepository:
+    """
+    Hace las veces de los cuatro repositorios de configuración que usa la resolución.
+    """
+
+    def __init__(self, event_types, events_triggers, children, rules):
+        self.event_types = event_types
+        self.events_triggers = events_triggers
+        self.children = children
+        self.rules = rules
+        self.lookups = 0
+
+    async def get_by_name(self, name):
+        self.lookups += 1
+        event_type_id = self.event_types.get(name)
+        return SimpleNamespace(event_type_id=event_type_id) if event_type_id else None
+
+    async def get_triggers_by_event_type(self, event_type_id):
+        return [SimpleNamespace(trigger_id=t) for t in self.events_triggers.get(event_type_id, [])]
+
+    async def get_children(self, trigger_id):
+        return [SimpleNamespace(trigger_child_id=t) for t in self.children.get(trigger_id, [])]
+
+    async def list_by_trigger(self, trigger_id):
+        return [SimpleNamespace(rule_id=r) for r in self.rules.get(trigger_id, [])]
+
+
+def make_resolver():
+    repo = FakeResolutionRepository(
+        event_types={"Encrypt": "et1", "Decrypt": "et2", "Idle": "et3"},
+        events_triggers={"et1": ["t1"], "et2": ["t3"]},
+        # t1 -> t2 -> t1 forms a cycle
+        children={"t1": ["t2"], "t2": ["t1"]},
+        rules={"t1": ["r1"], "t2": ["r2", "r1"], "t3": ["r3"]},
+    )
+    return TriggerResolutionService(repo, repo, repo, repo), repo
+
+
+class FakeReplayRepository:
+    def __init__(self, events):
+        self.events = sorted(events, key=lambda e: (e["timestamp"], e["_id"]))
+        self.replays = {}
+        self.results = {}
+        self.scans = 0
+        self.stop_after_checkpoints = None
+
+    async def scan_events(self, filters, start, end, after, limit):
+        self.scans += 1
+        await asyncio.sleep(0)
+        selected = [
+            e for e in self.events
+            if start <= e["timestamp"] < end
+            and all(e.get(k) == v for k, v in filters.items())
+            and (after is None or (e["timestamp"], e["_id"]) > after)
+        ]
+        return [dict(e) for e in selected[:limit]]
+
+    async def create(self, replay):
+        self.replays[replay["_id"]] = copy.deepcopy(replay)
+
+    async def get(self, replay_id):
+        return copy.deepcopy(self.replays.get(replay_id))
+
+    async def list_replays(self, limit=50):
+        return list(self.replays.values())[:limit]
+
+    async def claim(self, replay_id, owner, lease_seconds, statuses=("cancelled", "failed")):
+        stale = datetime.now(timezone.utc) - timedelta(seconds=lease_seconds)
+        for replay in self.replays.values():
+            if replay_id is not None and replay["_id"] != replay_id:
+                continue
+            expired = replay["status"] == "running" and (replay["heartbeat"] is None or replay["heartbeat"] < stale)
+            if replay["status"] in statuses or expired:
+                replay.update(status="running", owner=owner, heartbeat=datetime.now(timezone.utc), error=None)
+                return copy.deepcopy(replay)
+        return None
+
+    async def heartbeat(self, replay_id, owner):
+        replay = self.replays[replay_id]
+        if replay["owner"] != owner or replay["status"] != "running":
+            return False
+        replay["heartbeat"] = datetime.now(timezone.utc)
+        return True
+
+    async def checkpoint(self, replay_id, owner, index, cursor, processed, matched, done):
+        replay = self.replays[replay_id]
+        if replay["owner"] != owner or replay["status"] != "running":
+            return False
+        partition = replay["partitions"][index]
+        partition["done"] = done
+        partition["processed"] += processed
+        partition["matched"] += matched
+        replay["processed"] += processed
+        replay["matched"] += matched
+        replay["heartbeat"] = datetime.now(timezone.utc)
+        if cursor is not None:
+            partition["last_timestamp"], partition["last_id"] = cursor
+        if self.stop_after_checkpoints is not None:
+            self.stop_after_checkpoints -= 1
+            if self.stop_after_checkpoints == 0:
+                # Simulates the process dying: the replay keeps `running` without a heartbeat
+                replay["owner"] = "dead"
+                replay["heartbeat"] = None
+        return True
+
+    async def set_status(self, replay_id, status, owner=None, error=None):
+        replay = self.replays[replay_id]
+        if owner is not None and (replay["owner"] != owner or replay["status"] != "running"):
+            return False
+        replay["status"] = status
+        if error is not None:
+            replay["error"] = error
+        return True
+
+    async def release(self, replay_id, owner):
+        replay = self.replays[replay_id]
+        if replay["owner"] == owner and replay["status"] == "running":
+            replay["heartbeat"] = None
+
+    async def record_matches(self, matches):
+        for match in matches:
+            self.results.setdefault((match["replay_id"], match["event_id"]), match)
+
+    async def list_matches(self, replay_id, limit=100, skip=0):
+        return [m for (r, _), m in sorted(self.results.items()) if r == replay_id][skip:skip + limit]
+
+
+def make_events(n, event_types=("Encrypt", "Decrypt", "Idle")):
+    return [
+        {"_id": f"e{i:03d}", "timestamp": START + timedelta(minutes=i), "event_type": event_types[i % len(event_types)]}
+        for i in range(n)
+    ]
+
+
+def request(**kwargs):
+    base = {"start": START, "end": START + timedelta(hours=1), "partitions": 3, "rate": 1e6, "batch_size": 4}
+    return ReplayRequestModel(**{**base, **kwargs})
+
+
+async def wait_replay(service):
+    await asyncio.gather(*list(service._tasks.values()), return_exceptions=True)
+
+# ---------- TESTS ----------
+
+@pytest.mark.asyncio
+async def test_resolution_follows_child_triggers_without_cycles():
+    """
+    🧭 Verifica que la resolución recorra triggers hijos transitivamente, sin repetir ante ciclos.
+    """
+    resolver, _ = make_resolver()
+    assert await resolver.resolve("Encrypt") == {"event_type_id": "et1", "trigger_ids": ["t1", "t2"], "rule_ids": ["r1", "r2"]}
+    assert await resolver.resolve("Idle") == {"event_type_id": "et3", "trigger_ids": [], "rule_ids": []}
+    assert await resolver.resolve("Unknown") is None
+
+
+def test_replay_request_rejects_empty_range():
+    """
+    🚫 Verifica que un replay sin rango de tiempo sea rechazado.
+    """
+    with pytest.raises(ValueError):
+        ReplayRequestModel(start=START, end=START)
+
+
+@pytest.mark.asyncio
+async def test_replay_matches_every_event_across_partitions():
+    """
+    🔁 Verifica que el replay recorra todas las particiones y guarde una coincidencia por evento con triggers.
+    """
+    repository = FakeReplayRepository(make_events(60))
+    resolver, resolution_repo = make_resolver()
+    service = ReplayService(repository, resolver)
+
+    replay = await service.start_replay(request())
+    assert [(p["start"], p["end"]) for p in replay["partitions"]] == [
+        (START, START + timedelta(minutes=20)),
+        (START + timedelta(minutes=20), START + timedelta(minutes=40)),
+        (START + timedelta(minutes=40), START + timedelta(hours=1)),
+    ]
+    await wait_replay(service)
+
+    stored = await service.get_replay(replay["_id"])
+    assert stored["status"] == "completed"
+    assert stored["processed"] == 60
+    assert stored["matched"] == 40  # "Idle" events resolve to no triggers
+    assert all(p["done"] for p in stored["partitions"])
+    matches = await service.list_matches(replay["_id"], limit=1000)
+    assert {m["event_id"] for m in matches} == {f"e{i:03d}" for i in range(60) if i % 3 != 2}
+    # Resolution is memoized per replay: one lookup per event type
+    assert resolution_repo.lookups == 3
+
+
+@pytest.mark.asyncio
+async def test_replay_filters_by_trigger():
+    """
+    🎯 Verifica que con `trigger_ids` solo se guarden los eventos que activan esos triggers.
+    """
+    repository = FakeReplayRepository(make_events(30))
+    resolver, _ = make_resolver()
+    service = ReplayService(repository, resolver)
+
+    replay = await service.start_replay(request(trigger_ids=["t3"], partitions=2))
+    await wait_replay(service)
+
+    matches = await service.list_matches(replay["_id"], limit=1000)
+    assert matches and all(m["event_type"] == "Decrypt" and m["rule_ids"] == ["r3"] for m in matches)
+    assert len(matches) == 10
+
+
+@pytest.mark.asyncio
+async def test_interrupted_replay_resumes_from_checkpoint():
+    """
+    💾 Verifica que un replay interrumpido se reanude desde su checkpoint sin volver a leer lo procesado.
+    """
+    repository = FakeReplayRepository(make_events(40))
+    repository.stop_after_checkpoints = 3
+    resolver, _ = make_resolver()
+    service = ReplayService(repository, resolver)
+
+    replay = await service.start_replay(request(partitions=1))
+    await wait_replay(service)
+    interrupted = await service.get_replay(replay["_id"])
+    assert interrupted["status"] == "running"
+    assert interrupted["processed"] == 12
+
+    scans_before = repository.scans
+    other = ReplayService(repository, resolver)
+    assert await other.resume_interrupted() == [replay["_id"]]
+    await wait_replay(other)
+
+    stored = await other.get_replay(replay["_id"])
+    assert stored["status"] == "completed"
+    assert stored["processed"] == 40
+    # 28 remaining events in batches of 4, plus the final empty scan
+    assert repository.scans - scans_before == 8
+    assert len(await other.list_matches(replay["_id"], limit=1000)) == 27
+
+
+@pytest.mark.asyncio
+async def test_cancelled_replay_can_be_resumed():
+    """
+    ⏹️ Verifica que cancelar detenga el replay y que luego pueda reanudarse hasta completarse.
+    """
+    repository = FakeReplayRepository(make_events(60))
+    resolver, _ = make_resolver()
+    service = ReplayService(repository, resolver)
+
+    replay = await service.start_replay(request(rate=20, batch_size=10))
+    await asyncio.sleep(0.05)
+    await service.cancel_replay(replay["_id"])
+    await wait_replay(service)
+    cancelled = await service.get_replay(replay["_id"])
+    assert cancelled["status"] == "cancelled"
+    assert cancelled["processed"] < 60
+
+    await service.resume_replay(replay["_id"])
+    await wait_replay(service)
+    assert (await service.get_replay(replay["_id"]))["status"] == "completed"
+    assert len(await service.list_matches(replay["_id"], limit=1000)) == 40
+
+
+@pytest.mark.asyncio
+async def test_cancelled_replay_is_not_auto_resumed():
+    """
+    🛑 Verifica que al arrancar otro proceso no reanude replays cancelados por un operador.
+    """
+    repository = FakeReplayRepository(make_events(60))
+    resolver, _ = make_resolver()
+    service = ReplayService(repository, resolver)
+    replay = await service.start_replay(request(rate=20, batch_size=10))
+    await asyncio.sleep(0.05)
+    await service.cancel_replay(replay["_id"])
+    await wait_replay(service)
+
+    other = ReplayService(repository, resolver)
+    assert await other.resume_interrupted() == []
+    assert (await other.get_replay(replay["_id"]))["status"] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_replay_keeps_its_lease():
+    """
+    💓 Verifica que un replay que espera por el límite de ritmo renueve su latido y no sea reclamado.
+    """
+    repository = FakeReplayRepository(make_events(60))
+    resolver, _ = make_resolver()
+    service = ReplayService(repository, resolver, lease_seconds=0.06)
+    # The second batch waits 0.5 s for tokens, far longer than the lease
+    replay = await service.start_replay(request(partitions=1, rate=20, batch_size=10))
+    await asyncio.sleep(0.3)
+
+    other = ReplayService(repository, resolver, lease_seconds=0.06)
+    assert await other.resume_interrupted() == []
+    assert (await service.get_replay(replay["_id"]))["owner"] == service.owner
+    await service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_replay_does_not_extend_the_request_trace():
+    """
+    🧵 Verifica que el replay no añada tramos a la traza de la petición que lo inició.
+    """
+    repository = FakeReplayRepository(make_events(30))
+    resolver, _ = make_resolver()
+    service = ReplayService(repository, resolver)
+
+    with tracing.start_trace("POST /admin/replays", "controller") as trace:
+        await service.start_replay(request())
+    spans = len(trace.spans)
+    await wait_replay(service)
+
+    assert len(trace.spans) == spans
+    assert not any(span.name.startswith("TriggerResolutionService") for span in trace.spans)
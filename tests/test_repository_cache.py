@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from shieldx.cache.repository import cached_repository, get_repository_cache, invalidate, parse_limits
+
+# ---------- HELPERS ----------
+
+@cached_repository("test_things", reads=("find_one", "find_all"), writes=("insert_one",))
+class FakeRepository:
+    def __init__(self):
+        self.documents = {}
+        self.reads = 0
+
+    async def find_one(self, query: dict):
+        self.reads += 1
+        return self.documents.get(query["name"])
+
+    async def find_all(self):
+        self.reads += 1
+        documents = list(self.documents.values())
+        await asyncio.sleep(0)
+        return documents
+
+    async def insert_one(self, data: dict):
+        self.documents[data["name"]] = data
+        return data["name"]
+
+
+@pytest.fixture
+def repository():
+    invalidate("test_things")
+    return FakeRepository()
+
+# ---------- TESTS ----------
+
+@pytest.mark.asyncio
+async def test_reads_are_served_from_cache(repository):
+    """
+    ✅ Verifica que una lectura repetida no vuelva a consultar el repositorio.
+    """
+    await repository.insert_one({"name": "a"})
+    assert await repository.find_one({"name": "a"}) == {"name": "a"}
+    assert await repository.find_one({"name": "a"}) == {"name": "a"}
+    assert repository.reads == 1
+    assert get_repository_cache("test_things").stats()["hits"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_collection(repository):
+    """
+    🔄 Verifica que una escritura descarte las lecturas cacheadas de la colección.
+    """
+    await repository.insert_one({"name": "a"})
+    assert len(await repository.find_all()) == 1
+    await repository.insert_one({"name": "b"})
+    assert len(await repository.find_all()) == 2
+    assert repository.reads == 2
+
+
+@pytest.mark.asyncio
+async def test_empty_results_are_not_cached(repository):
+    """
+    🚫 Verifica que los resultados vacíos no se guarden en la caché.
+    """
+    assert await repository.find_one({"name": "missing"}) is None
+    assert await repository.find_one({"name": "missing"}) is None
+    assert repository.reads == 2
+
+
+@pytest.mark.asyncio
+async def test_read_racing_a_write_is_not_cached(repository):
+    """
+    🏁 Verifica que una lectura que termina después de una escritura no deje datos obsoletos.
+    """
+    await repository.insert_one({"name": "a"})
+    read = asyncio.create_task(repository.find_all())
+    await asyncio.sleep(0)
+    await repository.insert_one({"name": "b"})
+    assert len(await read) == 1
+    assert len(await repository.find_all()) == 2
+
+
+def test_parse_limits():
+    """
+    ⚙️ Verifica el formato de límites por colección.
+    """
+    assert parse_limits("triggers=120/2048, rules=60/512") == {"triggers": (120.0, 2048), "rules": (60.0, 512)}
+    with pytest.raises(ValueError):
+        parse_limits("triggers=120")
@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from pymongo.errors import BulkWriteError
+import shieldx.db.changelog as CHANGELOG
+from shieldx.db.changelog import TrackedCollection, UPSERT, DELETE
+from shieldx.services.sync_service import SyncService
+from tests.mongo_fakes import FakeCollection
+
+# ---------- HELPERS ----------
+
+@pytest.fixture
+def recorded(monkeypatch):
+    changes = []
+
+    async def record_changes(collection, entries):
+        entries = list(entries)
+        if entries:
+            changes.append((collection, entries))
+
+    monkeypatch.setattr(CHANGELOG, "record_changes", record_changes)
+    return changes
+
+
+class FakeSyncRepository:
+    def __init__(self):
+        self.version = 0
+        self.changelog = []
+        self.collections = {"rules": FakeCollection("rules"), "triggers": FakeCollection("triggers")}
+
+    def write(self, collection, op, document=None, document_id=None, age=60):
+        self.version += 1
+        target = self.collections[collection]
+        if op == UPSERT:
+            document_id = document["_id"]
+            target.documents[document_id] = document
+        else:
+            target.documents.pop(document_id, None)
+        self.changelog.append({
+            "version": self.version, "collection": collection, "op": op, "document_id": document_id,
+            "at": datetime.now(timezone.utc) - timedelta(seconds=age),
+        })
+
+    async def current_version(self):
+        return self.version
+
+    async def oldest_version(self):
+        return min((e["version"] for e in self.changelog), default=None)
+
+    async def last_version_before(self, at):
+        return max((e["version"] for e in self.changelog if e["at"] <= at), default=None)
+
+    async def first_version_after(self, at):
+        return min((e["version"] for e in self.changelog if e["at"] > at), default=None)
+
+    async def changes_between(self, since, until, collections):
+        return [e for e in self.changelog if since < e["version"] <= until and e["collection"] in collections]
+
+    async def find_documents(self, collection, ids=None):
+        documents = self.collections[collection].documents
+        return [dict(d) for i, d in documents.items() if ids is None or i in ids]
+
+# ---------- TESTS ----------
+
+@pytest.mark.asyncio
+async def test_tracked_collection_records_changes(recorded):
+    """
+    📝 Verifica que las escrituras registren en el changelog los documentos afectados.
+    """
+    collection = TrackedCollection(FakeCollection("rules"))
+    first = (await collection.insert_one({"target": "a"})).inserted_id
+    await collection.insert_many([{"target": "b"}, {"target": "c"}])
+    await collection.update_one({"target": "a"}, {"$set": {"target": "z"}})
+    await collection.update_one({"target": "missing"}, {"$set": {"target": "z"}})
+    await collection.delete_one({"target": "b"})
+    await collection.delete_many({"target": {"$in": ["c", "z"]}})
+
+    assert recorded == [
+        ("rules", [(UPSERT, first)]),
+        ("rules", [(UPSERT, 2), (UPSERT, 3)]),
+        ("rules", [(UPSERT, first)]),
+        ("rules", [(DELETE, 2)]),
+        ("rules", [(DELETE, 1), (DELETE, 3)]),
+    ]
+    assert collection.name == "rules"
+
+
+@pytest.mark.asyncio
+async def test_sync_returns_delta_since_version():
+    """
+    🔄 Verifica que /sync devuelva solo los cambios posteriores a `since`, con el último estado por documento.
+    """
+    repository = FakeSyncRepository()
+    repository.write("rules", UPSERT, {"_id": "r1", "target": "a"})
+    repository.write("triggers", UPSERT, {"_id": "t1", "name": "t"})
+    repository.write("rules", UPSERT, {"_id": "r2", "target": "b"})
+    repository.write("rules", DELETE, document_id="r1")
+    service = SyncService(repository, settle_seconds=2)
+
+    result = await service.sync(2, ["rules", "triggers"])
+    assert result["reset"] is False
+    assert result["version"] == 4
+    assert result["changes"]["rules"] == {"upserted": [{"_id": "r2", "target": "b"}], "deleted": ["r1"]}
+    assert result["changes"]["triggers"] == {"upserted": [], "deleted": []}
+
+
+@pytest.mark.asyncio
+async def test_sync_resets_past_retention():
+    """
+    ♻️ Verifica que un cliente más atrasado que la retención reciba una copia completa.
+    """
+    repository = FakeSyncRepository()
+    for i in range(5):
+        repository.write("rules", UPSERT, {"_id": f"r{i}", "target": "a"})
+    repository.changelog = repository.changelog[3:]  # versions 1-3 expired
+    service = SyncService(repository, settle_seconds=2)
+
+    assert (await service.sync(1, ["rules"]))["reset"] is True
+    assert (await service.sync(0, ["rules"]))["reset"] is True
+    delta = await service.sync(3, ["rules"])
+    assert delta["reset"] is False
+    assert [d["_id"] for d in delta["changes"]["rules"]["upserted"]] == ["r3", "r4"]
+    full = await service.sync(1, ["rules"])
+    assert len(full["changes"]["rules"]["upserted"]) == 5
+    assert full["version"] == 5
+
+
+@pytest.mark.asyncio
+async def test_sync_version_excludes_unsettled_changes():
+    """
+    ⏳ Verifica que la versión devuelta no incluya cambios demasiado recientes.
+    """
+    repository = FakeSyncRepository()
+    repository.write("rules", UPSERT, {"_id": "r1", "target": "a"})
+    repository.write("rules", UPSERT, {"_id": "r2", "target": "b"}, age=0)
+    service = SyncService(repository, settle_seconds=2)
+
+    result = await service.sync(1, ["rules"])
+    assert result["version"] == 1
+    assert result["changes"]["rules"]["upserted"] == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ordered, expected", [(True, ["a"]), (False, ["a", "c"])])
+async def test_tracked_insert_many_records_partial_inserts(recorded, ordered, expected):
+    """
+    🧩 Verifica que un insert_many que falla a medias registre los documentos que sí insertó.
+    """
+    target = FakeCollection("events_triggers")
+    target.documents["b"] = {"_id": "b"}
+    collection = TrackedCollection(target)
+
+    with pytest.raises(BulkWriteError):
+        await collection.insert_many([{"_id": "a"}, {"_id": "b"}, {"_id": "c"}], ordered=ordered)
+
+    assert recorded == [("events_triggers", [(UPSERT, document_id) for document_id in expected])]
+
+
+@pytest.mark.asyncio
+async def test_tracked_delete_one_without_match_is_noop(recorded):
+    """
+    🚫 Verifica que delete_one no borre nada si la búsqueda previa no encontró el documento.
+    """
+    target = FakeCollection("rules")
+    target.documents[1] = {"_id": 1, "target": "a"}
+    collection = TrackedCollection(target)
+
+    result = await collection.delete_one({"target": "missing"})
+
+    assert result.deleted_count == 0
+    assert 1 in target.documents
+    assert recorded == []
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from shieldx.tracing import TraceStore, start_trace, span, traced, current_trace_id, TracingMiddleware
+import shieldx.tracing as tracing
+
+# ---------- FIXTURES ----------
+
+@traced("repository")
+class FakeRepository:
+    async def find(self):
+        await asyncio.sleep(0.01)
+        return current_trace_id()
+
+
+@traced("service")
+class FakeService:
+    def __init__(self):
+        self.repository = FakeRepository()
+
+    async def get(self):
+        return await self.repository.find()
+
+# ---------- TESTS ----------
+
+def test_spans_link_layers_under_one_trace(monkeypatch):
+    """
+    🧵 Verifica que servicio y repositorio queden enlazados bajo una misma traza.
+    """
+    store = TraceStore(capacity=10)
+    monkeypatch.setattr(tracing, "STORE", store)
+
+    async def handle():
+        with start_trace("GET /things", "controller") as trace:
+            trace_id = await FakeService().get()
+        return trace, trace_id
+
+    trace, trace_id = asyncio.run(handle())
+    assert trace_id == trace.trace_id
+    assert store.get(trace.trace_id) is trace
+    by_name = {s.name: s for s in trace.spans}
+    assert set(by_name) == {"GET /things", "FakeService.get", "FakeRepository.find"}
+    assert by_name["FakeRepository.find"].parent_id == by_name["FakeService.get"].span_id
+    assert by_name["FakeService.get"].parent_id == by_name["GET /things"].span_id
+    layers = trace.layers()
+    assert max(layers, key=layers.get) == "repository"
+    assert store.summary()[0]["name"] == "GET /things"
+
+
+def test_methods_without_trace_are_not_recorded():
+    """
+    💤 Verifica que sin traza activa los métodos instrumentados no registren tramos.
+    """
+    assert asyncio.run(FakeService().get()) is None
+    with span("orphan", "service") as orphan:
+        assert orphan is None
+
+
+def test_log_records_carry_trace_id():
+    """
+    🔗 Verifica que los logs emitidos dentro de una traza incluyan su trace id.
+    """
+    from shieldx.log import Log, JsonFormatter
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = Log(name="test.tracing", level=logging.DEBUG, disabled=True)
+    logger.addHandler(handler)
+    with start_trace("consume q", "consumer") as trace:
+        logger.info({"event": "TEST"})
+    assert records[0].trace_id == trace.trace_id
+    assert trace.trace_id in JsonFormatter(compact=True).format(records[0])
+
+
+def test_middleware_names_trace_by_route_and_returns_header(monkeypatch):
+    """
+    🛣️ Verifica que el middleware respete el X-Trace-Id entrante y nombre la traza por la plantilla de la ruta.
+    """
+    from fastapi import FastAPI
+    from httpx import AsyncClient, ASGITransport
+
+    store = TraceStore(capacity=10)
+    monkeypatch.setattr(tracing, "STORE", store)
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware)
+
+    @app.get("/things/{thing_id}")
+    async def get_thing(thing_id: str):
+        return {"id": thing_id}
+
+    async def call():
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            return await client.get("/things/1", headers={"X-Trace-Id": "abc123"})
+
+    response = asyncio.run(call())
+    assert response.headers["X-Trace-Id"] == "abc123"
+    trace = store.get("abc123")
+    assert trace.name == "GET /things/{thing_id}"
+    assert trace.spans[-1].name == "GET /things/{thing_id}"
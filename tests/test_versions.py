@@ -0,0 +1,138 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from shieldx.cache.repository import get_repository_cache
+from shieldx.cache.versions import VERSIONS, CollectionVersions, conditional_get, etag_matches, make_etag
+
+# ---------- HELPERS ----------
+
+class FakeVersionsCollection:
+    def __init__(self):
+        self.documents = {}
+
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        document = self.documents.setdefault(query["_id"], {"_id": query["_id"], "version": 0})
+        document["version"] += update["$inc"]["version"]
+        return dict(document)
+
+    async def update_one(self, query, update, upsert=False):
+        document = self.documents.setdefault(query["_id"], {"_id": query["_id"], "version": 0})
+        document["version"] = max(document["version"], update["$max"]["version"])
+
+    async def find_one(self, query, projection=None):
+        return self.documents.get(query["_id"])
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    collection = FakeVersionsCollection()
+    monkeypatch.setattr(VERSIONS, "_collection", lambda: collection)
+    monkeypatch.setattr(VERSIONS, "ttl", 60)
+    VERSIONS.forget_all()
+    yield collection
+    VERSIONS.forget_all()
+
+
+@pytest.fixture
+def client(versions):
+    app = FastAPI()
+    calls = []
+
+    @app.get("/rules", dependencies=[conditional_get("rules")])
+    async def list_rules():
+        calls.append(1)
+        return [{"name": "r1"}]
+
+    test_client = TestClient(app)
+    test_client.calls = calls
+    return test_client
+
+# ---------- TESTS ----------
+
+@pytest.mark.asyncio
+async def test_bump_uses_global_counter(versions):
+    """
+    🔢 Verifica que cada escritura tome el siguiente valor del contador global.
+    """
+    assert await VERSIONS.bump("rules") == 1
+    assert await VERSIONS.bump("triggers") == 2
+    assert await VERSIONS.bump("rules") == 3
+    assert await VERSIONS.current("triggers") == 2
+    VERSIONS.forget("rules")
+    assert await VERSIONS.current("rules") == 3
+
+
+@pytest.mark.asyncio
+async def test_current_is_remembered(versions):
+    """
+    🧠 Verifica que la versión se recuerde sin volver a consultar Mongo mientras esté vigente.
+    """
+    await VERSIONS.bump("rules")
+    versions.documents["rules"]["version"] = 99
+    assert await VERSIONS.current("rules") == 1
+    fresh = CollectionVersions(ttl=0)
+    fresh._collection = lambda: versions
+    assert await fresh.current("rules") == 99
+
+
+def test_etag_matching():
+    """
+    🏷️ Verifica la comparación débil de If-None-Match.
+    """
+    etag = make_etag({"rules": 3})
+    assert etag == 'W/"rules-3"'
+    assert etag_matches('W/"rules-3"', etag)
+    assert etag_matches('"rules-3"', etag)
+    assert etag_matches('"x", W/"rules-3"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"rules-2"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_conditional_get_returns_304(client):
+    """
+    ✅ Verifica que un If-None-Match vigente responda 304 sin ejecutar el endpoint.
+    """
+    first = client.get("/rules")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    second = client.get("/rules", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    assert second.content == b""
+    assert len(client.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_after_write(client):
+    """
+    🔄 Verifica que tras una escritura cambie el ETag y se devuelva el contenido.
+    """
+    etag = client.get("/rules").headers["ETag"]
+    await VERSIONS.bump("rules")
+    response = client.get("/rules", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_write_from_other_process_drops_repository_cache(versions):
+    """
+    🔀 Verifica que una versión nueva escrita por otro proceso descarte la caché de repositorio.
+    """
+    cache = get_repository_cache("rules")
+    fresh = CollectionVersions(ttl=0)
+    fresh._collection = lambda: versions
+    versions.documents["rules"] = {"_id": "rules", "version": 1}
+    assert await fresh.current("rules") == 1
+    cache.set(("find_all", "()", "[]"), ["r1"])
+
+    # Same version: the cached body is still valid
+    assert await fresh.current("rules") == 1
+    assert cache.get(("find_all", "()", "[]")) == ["r1"]
+
+    # Another worker wrote (no invalidation bus on standalone Mongo)
+    versions.documents["rules"]["version"] = 2
+    assert await fresh.current("rules") == 2
+    assert cache.get(("find_all", "()", "[]")) is None